@@ -29,7 +29,7 @@ class Task(Base):
     __tablename__ = "tasks"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
+    name = Column(String, index=True, unique=True)
     category = Column(String)
     total_duration_ms = Column(Integer, default=0)
     session_count = Column(Integer, default=0)
@@ -63,8 +63,52 @@ CATEGORIES = {
     "distraction": ["youtube.com", "reddit.com", "twitter.com", "instagram.com"]
 }
 
+def _ensure_unique_task_names():
+    """
+    Upgrade databases created before tasks.name was unique.
+
+    Duplicate rows (possible under the old read-then-insert logging) are
+    merged into the oldest one, with durations and session counts summed
+    and focus scores averaged by duration, before the index is rebuilt
+    as UNIQUE.
+    """
+    with engine.begin() as conn:
+        indexes = conn.exec_driver_sql("PRAGMA index_list('tasks')").fetchall()
+        # Rows are (seq, name, unique, origin, partial)
+        if any(row[1] == "ix_tasks_name" and row[2] for row in indexes):
+            return
+
+        conn.exec_driver_sql("""
+            UPDATE tasks SET
+                total_duration_ms = agg.total_ms,
+                session_count = agg.sessions,
+                avg_focus_score = agg.avg_focus,
+                updated_at = agg.updated_at
+            FROM (
+                SELECT name,
+                       MIN(id) AS keep_id,
+                       SUM(COALESCE(total_duration_ms, 0)) AS total_ms,
+                       SUM(COALESCE(session_count, 0)) AS sessions,
+                       COALESCE(
+                           SUM(avg_focus_score * total_duration_ms) / NULLIF(SUM(total_duration_ms), 0),
+                           AVG(avg_focus_score)
+                       ) AS avg_focus,
+                       MAX(updated_at) AS updated_at
+                FROM tasks WHERE name IS NOT NULL
+                GROUP BY name HAVING COUNT(*) > 1
+            ) AS agg
+            WHERE tasks.id = agg.keep_id
+        """)
+        conn.exec_driver_sql("""
+            DELETE FROM tasks WHERE name IS NOT NULL
+                AND id NOT IN (SELECT MIN(id) FROM tasks WHERE name IS NOT NULL GROUP BY name)
+        """)
+        conn.exec_driver_sql("DROP INDEX IF EXISTS ix_tasks_name")
+        conn.exec_driver_sql("CREATE UNIQUE INDEX ix_tasks_name ON tasks (name)")
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _ensure_unique_task_names()
     
     # Seed default settings
     db = SessionLocal()
@@ -1,4 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from sqlalchemy import case, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from backend.database import get_db, Activity, Task, CATEGORIES
 from backend.schemas import ActivityLog, ActivityResponse
@@ -6,6 +8,38 @@ from datetime import datetime
 
 router = APIRouter()
 
+def _build_task_upsert():
+    """
+    INSERT ... ON CONFLICT DO UPDATE on the unique tasks.name index.
+
+    One statement replaces the old SELECT-then-write, so concurrent uploads
+    for the same task can neither lose an update nor create duplicate rows.
+    SET expressions see the pre-update row, so the focus score becomes the
+    running duration-weighted average (avg * prev + score * duration) / total.
+    """
+    tasks = Task.__table__
+    stmt = sqlite_insert(tasks)
+    prev_duration = func.coalesce(tasks.c.total_duration_ms, 0)
+    new_duration = prev_duration + stmt.excluded.total_duration_ms
+    return stmt.on_conflict_do_update(
+        index_elements=[tasks.c.name],
+        set_={
+            "total_duration_ms": new_duration,
+            "avg_focus_score": case(
+                (
+                    new_duration > 0,
+                    (func.coalesce(tasks.c.avg_focus_score, 0.0) * prev_duration
+                     + stmt.excluded.avg_focus_score * stmt.excluded.total_duration_ms) / new_duration
+                ),
+                else_=tasks.c.avg_focus_score
+            ),
+            "updated_at": stmt.excluded.updated_at,
+        }
+    )
+
+# Built once; each upload only binds parameters
+TASK_UPSERT = _build_task_upsert()
+
 def categorize_domain(domain: str) -> str:
     for category, domains in CATEGORIES.items():
         if any(d in domain for d in domains):
@@ -33,38 +67,19 @@ def log_activity(log: ActivityLog, db: Session = Depends(get_db)):
     )
     db.add(new_activity)
     
-    # 3. Update tasks aggregate
+    # 3. Upsert tasks aggregate
     # We identify a task by 'task_name'. If not present, use domain.
     task_identifier = log.task_name if log.task_name else log.domain
-    
-    task = db.query(Task).filter(Task.name == task_identifier).first()
-    
-    if task:
-        # Update existing task
-        prev_duration = task.total_duration_ms
-        task.total_duration_ms += log.duration_ms
-        
-        # Update weighted average focus score
-        if task.total_duration_ms > 0:
-            task.avg_focus_score = (
-                (task.avg_focus_score * prev_duration) + 
-                (log.focus_score * log.duration_ms)
-            ) / task.total_duration_ms
-            
-        task.updated_at = datetime.utcnow()
-        
-    else:
-        # Create new task
-        task = Task(
-            name=task_identifier,
-            category=category,
-            total_duration_ms=log.duration_ms,
-            session_count=1, # First session
-            avg_focus_score=log.focus_score,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
-        db.add(task)
+    now = datetime.utcnow()
+    db.execute(TASK_UPSERT, {
+        "name": task_identifier,
+        "category": category,
+        "total_duration_ms": log.duration_ms,
+        "session_count": 1, # First session
+        "avg_focus_score": log.focus_score,
+        "created_at": now,
+        "updated_at": now
+    })
     
     db.commit()
     
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from backend.database import get_db, CATEGORIES
 from backend.services.calendar_service import get_upcoming_events, create_calendar_event, check_calendar_setup, get_calendar_service
-from backend.services.prediction_engine import get_prediction
+from backend.services.prediction_engine import get_prediction, get_predictions
 from backend.services.keywords_ai_service import generate_response, generate_structured_response
 from backend.schemas import CalendarEvent, CalendarEventCreate, WeekPlanEvent, WeekPlanResponse, ScheduleRequest, ScheduleResponse, ScheduledEvent
 from datetime import datetime, timezone, timedelta
@@ -193,7 +193,7 @@ def categorize_text(text: str) -> str:
 @router.get("/calendar", response_model=list[CalendarEvent])
 def get_calendar(db: Session = Depends(get_db)):
     events = get_upcoming_events()
-    result = []
+    parsed = []
     
     for event in events:
         # Parse start/end
@@ -209,16 +209,17 @@ def get_calendar(db: Session = Depends(get_db)):
         except:
             continue
 
-        summary = event.get('summary', 'No Title')
-        
+        parsed.append((event, start_dt, end_dt, event.get('summary', 'No Title')))
+
+    # Predict every event's duration in one batch
+    # Pass task_name=summary for exact match attempt
+    predictions = get_predictions(db, [(categorize_text(summary), summary) for _, _, _, summary in parsed])
+    result = []
+
+    for (event, start_dt, end_dt, summary), prediction in zip(parsed, predictions):
         # Calculate scheduled duration
         scheduled_ms = (end_dt - start_dt).total_seconds() * 1000
         
-        # Predict duration
-        category = categorize_text(summary)
-        # Pass task_name=summary for exact match attempt
-        prediction = get_prediction(db, category, task_name=summary)
-        
         predicted_ms = prediction['predicted_duration_ms']
         confidence_percent = prediction['confidence_percent']
         confidence_label = prediction['confidence_label']
@@ -286,10 +287,7 @@ async def get_week_plan(db: Session = Depends(get_db)):
     now = datetime.now(timezone.utc)
     cutoff = now + timedelta(days=7)
     
-    plan_events = []
-    prompt_lines = []
-    
-    idx = 1
+    upcoming = []
     for event in raw_events:
         start = event.get('start', {}).get('dateTime') or event.get('start', {}).get('date')
         end = event.get('end', {}).get('dateTime') or event.get('end', {}).get('date')
@@ -315,12 +313,18 @@ async def get_week_plan(db: Session = Depends(get_db)):
         except:
             continue
             
-        summary = event.get('summary', 'No Title')
-        
+        upcoming.append((start_dt, end_dt, event.get('summary', 'No Title')))
+
+    # Predict every event's duration in one batch
+    predictions = get_predictions(db, [(categorize_text(summary), summary) for _, _, summary in upcoming])
+
+    plan_events = []
+    prompt_lines = []
+    
+    idx = 1
+    for (start_dt, end_dt, summary), prediction in zip(upcoming, predictions):
         # Prediction & Insight logic (same as GET /calendar)
         scheduled_ms = (end_dt - start_dt).total_seconds() * 1000
-        category = categorize_text(summary)
-        prediction = get_prediction(db, category, task_name=summary)
         
         predicted_ms = prediction['predicted_duration_ms']
         confidence_percent = prediction['confidence_percent']
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func
 from backend.database import get_db, Activity, Task, Prediction
 from backend.schemas import StatsResponse
 from datetime import datetime, timedelta
@@ -27,10 +27,12 @@ def get_stats(db: Session = Depends(get_db)):
         today_focus_score = 0.0
         
     # 2. Prediction accuracy
-    predictions = db.query(Prediction).filter(Prediction.was_accurate != None).all()
-    if predictions:
-        accurate_count = sum(1 for p in predictions if p.was_accurate)
-        prediction_accuracy_percent = (accurate_count / len(predictions)) * 100
+    # Counted in SQL rather than loading every graded prediction
+    graded_count, accurate_count = db.query(
+        func.count(Prediction.id), func.sum(case((Prediction.was_accurate, 1), else_=0))
+    ).filter(Prediction.was_accurate != None).one()
+    if graded_count:
+        prediction_accuracy_percent = (accurate_count / graded_count) * 100
     else:
         prediction_accuracy_percent = 0.0
         
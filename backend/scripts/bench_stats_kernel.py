@@ -0,0 +1,118 @@
+"""
+Benchmark for the NumPy duration statistics kernel.
+
+At each size, fills the tasks table and computes median, p90, mean and
+standard deviation for every category two ways: the previous
+per-category path (ORM query, list comprehension, calculate_percentile
+and the statistics module) and stats_kernel (one Core query into arrays,
+every category grouped at once). The kernel is also timed alone on the
+loaded arrays. Fails if any statistic differs between the two paths.
+
+Run from the project root:
+    python backend/scripts/bench_stats_kernel.py [--sizes 1000 100000 10000000] [--orm-max 1000000]
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# The legacy backend opens ./focusflow.db, so work inside a scratch directory
+os.chdir(tempfile.mkdtemp(prefix="focusflow-stats-"))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.database import CATEGORIES, SessionLocal, Task, engine, init_db
+from backend.services import stats_kernel
+from backend.services.prediction_engine import calculate_percentile
+
+GROUPS = list(CATEGORIES) + ["uncategorized"]
+
+
+def fill_tasks(start: int, stop: int, rng: random.Random):
+    """Add tasks start..stop-1 with log-normal durations."""
+    connection = engine.raw_connection()
+    try:
+        connection.executemany(
+            "INSERT INTO tasks (name, category, total_duration_ms, session_count, avg_focus_score) "
+            "VALUES (?, ?, ?, 1, 70.0)",
+            (
+                (f"task {i}", GROUPS[i % len(GROUPS)], int(rng.lognormvariate(math.log(35 * 60_000), 0.8)))
+                for i in range(start, stop)
+            ),
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def per_category(db) -> dict:
+    """The previous path: one ORM query and Python statistics per category."""
+    result = {}
+    for category in GROUPS:
+        tasks = db.query(Task).filter(Task.category == category).all()
+        durations = [t.total_duration_ms for t in tasks if t.total_duration_ms > 0]
+        result[category] = (
+            calculate_percentile(durations, 50), calculate_percentile(durations, 90),
+            statistics.mean(durations), statistics.stdev(durations),
+        )
+    return result
+
+
+def kernel(db) -> tuple[dict, float]:
+    """Stats from stats_kernel, and the time spent in grouped_stats alone."""
+    (categories,), durations = stats_kernel.load_durations(db, [Task.category], Task.total_duration_ms)
+    started = time.perf_counter()
+    stats = stats_kernel.grouped_stats(categories, durations)
+    compute = time.perf_counter() - started
+    return {
+        category: (s.median, s.quantiles[0.9], s.mean, s.stdev) for category, s in stats.items()
+    }, compute
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 10_000_000],
+                        help="Tasks in the table at each step")
+    parser.add_argument("--orm-max", type=int, default=1_000_000,
+                        help="Largest size the per-category ORM path is run at")
+    args = parser.parse_args()
+
+    init_db()
+    rng = random.Random(24)
+    loaded = 0
+    failed = False
+    print(f"{'tasks':>11} {'per-category ms':>16} {'kernel ms':>10} {'grouping ms':>12}   match")
+    for size in sorted(args.sizes):
+        fill_tasks(loaded, size, rng)
+        loaded = size
+
+        db = SessionLocal()
+        (fast, compute), kernel_ms = timed(lambda: kernel(db))
+        if size <= args.orm_max:
+            slow, slow_ms = timed(lambda: per_category(db))
+            match = all(
+                math.isclose(a, b, rel_tol=1e-9) for category in GROUPS for a, b in zip(fast[category], slow[category])
+            )
+            failed |= not match
+            slow_label, match_label = f"{slow_ms:,.1f}", "yes" if match else "NO"
+        else:
+            slow_label, match_label = "skipped", "-"
+        db.close()
+        print(f"{size:>11,} {slow_label:>16} {kernel_ms:>10,.1f} {compute * 1000:>12,.1f}   {match_label}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Concurrency check and benchmark for the tasks aggregate upsert in
+POST /activity.
+
+Fires parallel uploads at the old SELECT-then-write logic and at the
+current single-statement INSERT ... ON CONFLICT DO UPDATE, then verifies
+that the aggregate row is exact (one row per task, summed duration,
+duration-weighted focus average) and reports uploads per second.
+
+Run from the project root:
+    python backend/scripts/bench_task_upsert.py [--uploads 50] [--workers 50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# The legacy backend opens ./focusflow.db, so work inside a scratch directory
+os.chdir(tempfile.mkdtemp(prefix="focusflow-upsert-"))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base, SessionLocal, init_db, Activity, Task
+from backend.routers.activity import categorize_domain, log_activity
+from backend.schemas import ActivityLog
+
+
+def legacy_log_activity(log: ActivityLog, db):
+    """The previous read-modify-write implementation, kept for comparison."""
+    db.add(Activity(
+        task_name=log.task_name, domain=log.domain, title=log.title,
+        duration_ms=log.duration_ms, focus_score=log.focus_score,
+        tab_switches=log.tab_switches, category=categorize_domain(log.domain),
+        created_at=log.timestamp or datetime.utcnow()
+    ))
+    task_identifier = log.task_name if log.task_name else log.domain
+    task = db.query(Task).filter(Task.name == task_identifier).first()
+    if task:
+        prev_duration = task.total_duration_ms
+        task.total_duration_ms += log.duration_ms
+        if task.total_duration_ms > 0:
+            task.avg_focus_score = (
+                (task.avg_focus_score * prev_duration) + (log.focus_score * log.duration_ms)
+            ) / task.total_duration_ms
+        task.updated_at = datetime.utcnow()
+    else:
+        db.add(Task(
+            name=task_identifier, category=categorize_domain(log.domain),
+            total_duration_ms=log.duration_ms, session_count=1,
+            avg_focus_score=log.focus_score,
+        ))
+    db.commit()
+
+
+def legacy_session_factory():
+    """A second database with the pre-upsert schema (non-unique tasks.name)."""
+    legacy_engine = create_engine("sqlite:///./legacy.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=legacy_engine)
+    with legacy_engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_tasks_name")
+        conn.exec_driver_sql("CREATE INDEX ix_tasks_name ON tasks (name)")
+    return sessionmaker(autocommit=False, autoflush=False, bind=legacy_engine)
+
+
+def reset_tables(session_factory):
+    db = session_factory()
+    db.query(Activity).delete()
+    db.query(Task).delete()
+    db.commit()
+    db.close()
+
+
+def upload(handler, session_factory, log: ActivityLog) -> bool:
+    db = session_factory()
+    try:
+        handler(log, db)
+        return True
+    except OperationalError:
+        # "database is locked" after the busy timeout; counted as a failure
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+def run(label: str, handler, session_factory, logs: list[ActivityLog], workers: int):
+    reset_tables(session_factory)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        succeeded = sum(pool.map(lambda log: upload(handler, session_factory, log), logs))
+    elapsed = time.perf_counter() - started
+
+    expected_ms = sum(log.duration_ms for log in logs)
+    expected_focus = sum(log.focus_score * log.duration_ms for log in logs) / expected_ms
+
+    db = session_factory()
+    rows = db.query(Task).filter(Task.name == logs[0].task_name).all()
+    db.close()
+    total_ms = sum(row.total_duration_ms for row in rows)
+    exact = (
+        succeeded == len(logs) and len(rows) == 1 and total_ms == expected_ms
+        and abs(rows[0].avg_focus_score - expected_focus) < 1e-9
+    )
+
+    print(f"{label:<10} {len(logs) / elapsed:>10,.0f} {succeeded:>6}/{len(logs):<6} "
+          f"{len(rows):>6} {total_ms:>12,} {expected_ms:>12,}   {'yes' if exact else 'NO'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=50, help="Uploads for the same task")
+    parser.add_argument("--workers", type=int, default=50, help="Parallel uploader threads")
+    parser.add_argument("--rounds", type=int, default=5, help="Repetitions of each run")
+    args = parser.parse_args()
+
+    init_db()
+    legacy_sessions = legacy_session_factory()
+    logs = [
+        ActivityLog(
+            task_name="Write report", domain="docs.google.com", title="Report",
+            duration_ms=1_000 + i * 37, focus_score=float(40 + i % 60), tab_switches=i % 4
+        )
+        for i in range(args.uploads)
+    ]
+
+    print(f"{'logic':<10} {'uploads/s':>10} {'ok':>13} {'rows':>6} {'total_ms':>12} {'expected':>12}   exact")
+    for _ in range(args.rounds):
+        run("select", legacy_log_activity, legacy_sessions, logs, args.workers)
+        run("upsert", log_activity, SessionLocal, logs, args.workers)
+
+
+if __name__ == "__main__":
+    main()
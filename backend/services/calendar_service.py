@@ -1,10 +1,13 @@
 import os
+import json
 import datetime
 import logging
+import threading
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 
 logger = logging.getLogger(__name__)
@@ -15,6 +18,16 @@ CREDENTIALS_FILE = os.path.join(BASE_DIR, 'credentials.json')
 TOKEN_FILE = os.path.join(BASE_DIR, 'token.json')
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+# Every request used to re-read token.json and rebuild the service, which
+# parses the ~130 KB discovery document. Credentials are now reused until
+# token.json changes, the discovery document is parsed once, and each
+# thread keeps the service built for the current credentials (the
+# underlying httplib2 connection is not thread-safe) along with its events
+# collection, which service.events() would otherwise regenerate per call.
+_token_cache = {"mtime": None, "creds": None}
+_discovery_document = None
+_services = threading.local()
+
 def check_calendar_setup():
     """
     Checks the status of the Google Calendar integration.
@@ -45,14 +58,30 @@ def check_calendar_setup():
     
     return status
 
-def get_calendar_service():
-    creds = None
-    
-    if os.path.exists(TOKEN_FILE):
+def _load_credentials():
+    """Credentials from token.json, re-read only when the file has changed."""
+    try:
+        mtime = os.stat(TOKEN_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if _token_cache["mtime"] != mtime:
         try:
-            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+            _token_cache["creds"] = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
         except Exception as e:
             logger.error(f"Error loading token.json: {e}")
+            _token_cache["creds"] = None
+        _token_cache["mtime"] = mtime
+    return _token_cache["creds"]
+
+def _calendar_discovery_document():
+    global _discovery_document
+    if _discovery_document is None:
+        _discovery_document = json.loads(get_static_doc('calendar', 'v3'))
+    return _discovery_document
+
+def get_calendar_service():
+    creds = _load_credentials()
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -61,6 +90,8 @@ def get_calendar_service():
                 creds.refresh(Request())
                 with open(TOKEN_FILE, 'w') as token:
                     token.write(creds.to_json())
+                # Refreshed in place: keep these credentials (and their service)
+                _token_cache["mtime"] = os.stat(TOKEN_FILE).st_mtime_ns
             except Exception as e:
                 logger.error(f"Error refreshing token: {e}")
                 return None
@@ -72,21 +103,32 @@ def get_calendar_service():
                 logger.warning(f"credentials.json not found at {CREDENTIALS_FILE}. Calendar integration disabled.")
                 return None
 
+    cached = getattr(_services, "entry", None)
+    if cached and cached[0] is creds:
+        return cached[1]
+
     try:
-        service = build('calendar', 'v3', credentials=creds)
+        service = build_from_document(_calendar_discovery_document(), credentials=creds)
+        _services.entry = (creds, service, service.events())
         return service
     except Exception as e:
         logger.error(f"Error building calendar service: {e}")
         return None
 
+def _calendar_events():
+    """Events collection of the current thread's service, or None."""
+    if not get_calendar_service():
+        return None
+    return _services.entry[2]
+
 def get_upcoming_events(max_results=10):
-    service = get_calendar_service()
-    if not service:
+    events_api = _calendar_events()
+    if not events_api:
         return []
 
     try:
         now = datetime.datetime.utcnow().isoformat() + 'Z'  # 'Z' indicates UTC time
-        events_result = service.events().list(calendarId='primary', timeMin=now,
+        events_result = events_api.list(calendarId='primary', timeMin=now,
                                               maxResults=max_results, singleEvents=True,
                                               orderBy='startTime').execute()
         events = events_result.get('items', [])
@@ -96,8 +138,8 @@ def get_upcoming_events(max_results=10):
         return []
 
 def create_calendar_event(summary, start_time, duration_minutes, description=None):
-    service = get_calendar_service()
-    if not service:
+    events_api = _calendar_events()
+    if not events_api:
         return None
 
     end_time = start_time + datetime.timedelta(minutes=duration_minutes)
@@ -116,7 +158,7 @@ def create_calendar_event(summary, start_time, duration_minutes, description=Non
     }
 
     try:
-        event = service.events().insert(calendarId='primary', body=event).execute()
+        event = events_api.insert(calendarId='primary', body=event).execute()
         logger.info(f"Event created: {event.get('htmlLink')}")
         return event
     except HttpError as error:
@@ -1,5 +1,7 @@
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from backend.database import Task, Settings
+from backend.services import stats_kernel
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,7 +9,8 @@ logger = logging.getLogger(__name__)
 def calculate_percentile(data, percentile):
     if not data:
         return 0
-    data.sort()
+    # Sort a copy: callers keep their list as it was
+    data = sorted(data)
     index = (len(data) - 1) * percentile / 100
     lower = int(index)
     upper = lower + 1
@@ -17,6 +20,13 @@ def calculate_percentile(data, percentile):
     return data[lower] * (1 - weight) + data[upper] * weight
 
 def get_prediction(db: Session, category: str, conservativity_override: float = None, task_name: str = None):
+    return get_predictions(db, [(category, task_name)], conservativity_override)[0]
+
+def get_predictions(db: Session, requests: list, conservativity_override: float = None):
+    """Predictions for many (category, task_name) pairs with one settings and one task query."""
+    if not requests:
+        return []
+
     # Fetch settings for conservativity if not overridden
     if conservativity_override is not None:
         conservativity = conservativity_override
@@ -24,24 +34,28 @@ def get_prediction(db: Session, category: str, conservativity_override: float =
         settings = db.query(Settings).filter(Settings.id == 1).first()
         conservativity = settings.conservativity if settings else 0.5
 
-    # Fetch historical data
-    durations = []
-    used_task_name = False
-    
-    if task_name:
-        tasks = db.query(Task).filter(Task.name == task_name).all()
-        durations = [t.total_duration_ms for t in tasks if t.total_duration_ms > 0]
-        if durations:
-            used_task_name = True
+    # Fetch historical data for every task name and category at once
+    names = {task_name for _, task_name in requests if task_name}
+    categories = {category for category, _ in requests}
+    (name_keys, category_keys), durations = stats_kernel.load_durations(
+        db, [Task.name, Task.category], Task.total_duration_ms,
+        or_(Task.name.in_(names), Task.category.in_(categories))
+    )
+    by_name = stats_kernel.grouped_stats(name_keys, durations, only=names)
+    by_category = stats_kernel.grouped_stats(category_keys, durations, only=categories)
 
-    if not durations:
-        # Fallback to category
-        tasks = db.query(Task).filter(Task.category == category).all()
-        durations = [t.total_duration_ms for t in tasks if t.total_duration_ms > 0]
+    predictions = []
+    for category, task_name in requests:
+        stats = by_name.get(task_name) if task_name else None
+        used_task_name = stats is not None
+        if not stats:
+            # Fallback to category
+            stats = by_category.get(category)
+        predictions.append(_predict_from_stats(stats, conservativity, category, task_name if used_task_name else None))
+    return predictions
 
-    count = len(durations)
-    
-    if count == 0:
+def _predict_from_stats(stats, conservativity, category, task_name=None):
+    if stats is None:
         return {
             "predicted_duration_ms": 1800000, # Default 30 mins
             "confidence_percent": 0,
@@ -49,8 +63,9 @@ def get_prediction(db: Session, category: str, conservativity_override: float =
             "explanation": "No historical data available for this category."
         }
 
-    median = calculate_percentile(durations, 50)
-    p90 = calculate_percentile(durations, 90)
+    count = stats.count
+    median = stats.median
+    p90 = stats.quantiles[0.9]
 
     # Formula: prediction = median + (p90 - median) * conservativity
     predicted_ms = median + (p90 - median) * conservativity
@@ -65,7 +80,7 @@ def get_prediction(db: Session, category: str, conservativity_override: float =
     else:
         confidence_label = "High"
 
-    if used_task_name:
+    if task_name:
         explanation = (
             f"{confidence_percent}% confident — based on {count} past sessions of '{task_name}'. "
             f"Median: {int(median/60000)}m, P90: {int(p90/60000)}m. "
@@ -0,0 +1,115 @@
+"""
+NumPy kernel for per-group duration statistics.
+
+Durations are loaded with one Core query into a float64 array next to
+integer codes for the group keys (task name or category), numbered as
+the rows are read. Every group's count, mean, sample standard deviation
+and quantiles then come out of a handful of whole-array operations: one
+np.lexsort orders the values by (group, value), so each group is a
+sorted slice, sums are np.add.reduceat over the slices, and quantiles
+are read at computed offsets into them. Python only touches each row
+once, to read it, and each group once, to build its result.
+
+Quantiles interpolate linearly between order statistics, like
+calculate_percentile and numpy.quantile's default method.
+"""
+
+from dataclasses import dataclass
+from operator import itemgetter
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+@dataclass(frozen=True)
+class DurationStats:
+    count: int
+    mean: float
+    stdev: float  # Sample standard deviation (0 for a single value)
+    quantiles: dict  # q -> value
+
+    @property
+    def median(self):
+        return self.quantiles[0.5]
+
+
+def _encode(values):
+    """Integer code of each value (first seen = 0), and the value of each code."""
+    codes = {}
+    encoded = np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int64)
+    return encoded, list(codes)
+
+
+def load_durations(db: Session, key_columns, duration_column, *criteria):
+    """
+    Positive durations of the matching rows with their keys.
+
+    Each key column comes back encoded as (codes, labels): an int64 array
+    with one code per row, and the key value of each code.
+
+    Returns:
+        (one (codes, labels) pair per key column, float64 array of durations)
+    """
+    rows = db.execute(
+        select(*key_columns, duration_column).where(duration_column > 0, *criteria)
+    ).all()
+    durations = np.fromiter(map(itemgetter(len(key_columns)), rows), dtype=np.float64, count=len(rows))
+    return [_encode(map(itemgetter(i), rows)) for i in range(len(key_columns))], durations
+
+
+def grouped_quantiles(sorted_values, starts, counts, q):
+    """Quantile q of every group, given values sorted within contiguous groups."""
+    position = (counts - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    weight = position - lower
+    upper = np.minimum(lower + 1, counts - 1)
+    return sorted_values[starts + lower] * (1 - weight) + sorted_values[starts + upper] * weight
+
+
+def grouped_stats(keys, values, quantiles=(0.5, 0.9), only=None):
+    """
+    Statistics of `values` for every key, all groups at once.
+
+    Args:
+        keys: (codes, labels) as returned by load_durations; values whose
+            label is None are left out
+        values: float64 array, one value per code
+        quantiles: Quantiles to compute, each in [0, 1]
+        only: If given, the labels to compute statistics for
+
+    Returns:
+        dict of label -> DurationStats
+    """
+    codes, labels = keys
+    if only is not None:
+        wanted = [code for code, label in enumerate(labels) if label in only]
+        present = np.isin(codes, wanted)
+        codes, values = codes[present], values[present]
+    elif None in labels:
+        present = codes != labels.index(None)
+        codes, values = codes[present], values[present]
+    if len(values) == 0:
+        return {}
+
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=len(labels))
+    groups = np.flatnonzero(counts)
+    counts = counts[groups]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    means = np.add.reduceat(sorted_values, starts) / counts
+    deviations = sorted_values - np.repeat(means, counts)
+    squares = np.add.reduceat(deviations * deviations, starts)
+    stdevs = np.sqrt(np.divide(squares, counts - 1, out=np.zeros_like(squares), where=counts > 1))
+    values_at = {q: grouped_quantiles(sorted_values, starts, counts, q) for q in quantiles}
+
+    return {
+        labels[group]: DurationStats(
+            count=int(counts[i]),
+            mean=float(means[i]),
+            stdev=float(stdevs[i]),
+            quantiles={q: float(values_at[q][i]) for q in quantiles},
+        )
+        for i, group in enumerate(groups.tolist())
+    }
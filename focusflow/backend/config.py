@@ -5,6 +5,7 @@ Loads environment variables and provides typed settings.
 
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 import os
 
 
@@ -26,10 +27,33 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "sqlite:///./data/focusflow.db"
+    sqlite_profile: Literal["default", "durable", "production"] = "production"  # Pragma set, see database.py
+    sqlite_cache_size_mb: int = 64  # Page cache per connection
+    sqlite_mmap_size_mb: int = 256  # Memory-mapped I/O window (0 disables)
+    sqlite_busy_timeout_ms: int = 5000  # Wait this long for a lock before "database is locked"
+    db_thread_pool_size: int = 8  # Threads running blocking queries for async routes; also the reader pool size
+
+    # Activity ingestion
+    activity_write_behind: bool = False  # Queue uploads and commit in batches
+    activity_queue_size: int = 1000  # Uploads buffered before returning 503
+    activity_flush_interval_ms: int = 500  # Write-behind flush window
+    activity_stream_chunk_size: int = 1000  # Rows per commit on /activity/stream
+
+    # Activity retention
+    activity_retention_days: int = 30  # Raw rows older than this become hourly rollups (0 = keep all)
+    activity_rollup_interval_minutes: int = 60  # How often the rollup job runs
+    activity_rollup_batch_size: int = 5000  # Raw rows rolled up and deleted per transaction
+
+    # Predictions
+    prediction_cache_size: int = 256  # Cached (category, conservativity) predictions (0 disables)
+
+    # History export
+    export_batch_rows: int = 65536  # Rows per Parquet row group / Arrow record batch
 
     # Server
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
+    max_request_body_mb: int = 64  # Decompressed size limit for gzip/zstd request bodies
     debug: bool = True
 
     # Frontend
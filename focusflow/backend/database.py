@@ -3,25 +3,106 @@ Database setup and utilities for FocusFlow.
 Uses SQLite with SQLAlchemy for persistence.
 """
 
+import asyncio
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional, TypeVar
+from sqlalchemy import create_engine, event, func, literal_column, make_url, text, Boolean, Column, ForeignKey, Index, Integer, String, Float, DateTime, Table, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 
 from config import settings
+from migrations import run_migrations
 
 # Ensure data directory exists
 os.makedirs("data", exist_ok=True)
 
-# Create engine
+# Writer engine: one connection, so write transactions run one at a time
+# instead of contending for SQLite's single write lock
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False},  # Needed for SQLite
+    pool_size=1,
+    max_overflow=0
 )
 
-# Session factory
+
+def _read_only_url(database_url: str):
+    """The database URL opened with mode=ro, or None for in-memory databases."""
+    url = make_url(database_url)
+    if url.database in (None, "", ":memory:"):
+        return None
+    return url.set(
+        database=f"file:{os.path.abspath(url.database)}",
+        query={**url.query, "mode": "ro", "uri": "true"}
+    )
+
+
+# Reader engine: a pool of read-only connections for dashboard queries.
+# Under WAL they read the last committed snapshot without waiting for the
+# writer; in-memory databases cannot be shared, so they reuse the writer.
+_read_url = _read_only_url(settings.database_url)
+read_engine = engine if _read_url is None else create_engine(
+    _read_url,
+    connect_args={"check_same_thread": False},
+    pool_size=settings.db_thread_pool_size
+)
+
+# Database-wide settings a read-only connection cannot (and need not) change
+WRITER_ONLY_PRAGMAS = {"journal_mode", "synchronous"}
+
+
+def sqlite_pragmas(profile: str) -> list[tuple[str, object]]:
+    """
+    PRAGMAs applied to every new connection for a SQLITE_PROFILE.
+
+    - default: SQLite's own defaults (rollback journal, synchronous=FULL)
+    - durable: WAL so readers and the writer stop blocking each other,
+      still fsyncing every commit
+    - production: WAL with synchronous=NORMAL (a power loss can drop the
+      last commits but never corrupts the database), a larger page cache,
+      memory-mapped reads and in-memory temp tables
+    """
+    if profile == "default":
+        return []
+    pragmas = [
+        ("journal_mode", "WAL"),
+        ("busy_timeout", settings.sqlite_busy_timeout_ms),
+    ]
+    if profile == "durable":
+        return pragmas + [("synchronous", "FULL")]
+    return pragmas + [
+        ("synchronous", "NORMAL"),
+        ("cache_size", -settings.sqlite_cache_size_mb * 1024),  # Negative = KiB
+        ("mmap_size", settings.sqlite_mmap_size_mb * 1024 * 1024),
+        ("temp_store", "MEMORY"),
+    ]
+
+
+@event.listens_for(engine, "connect")
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas(settings.sqlite_profile):
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+if read_engine is not engine:
+    @event.listens_for(read_engine, "connect")
+    def _apply_reader_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in sqlite_pragmas(settings.sqlite_profile):
+            if name not in WRITER_ONLY_PRAGMAS:
+                cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+# Session factories: SessionLocal writes (and reads its own writes),
+# ReadSessionLocal serves read-only endpoints
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Base class for models
 Base = declarative_base()
@@ -32,19 +113,133 @@ Base = declarative_base()
 # TODO: Person B - Expand these models as needed
 # ============================================================
 
+class Domain(Base):
+    """Interned domain strings referenced by activities.domain_id."""
+    __tablename__ = "domains"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(String, unique=True, nullable=False)
+
+
+class Url(Base):
+    """Interned URL strings referenced by activities.url_id."""
+    __tablename__ = "urls"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(String, unique=True, nullable=False)
+
+
+class Title(Base):
+    """Interned page titles referenced by activities.title_id."""
+    __tablename__ = "titles"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(String, unique=True, nullable=False)
+
+
 class Activity(Base):
-    """Stores individual activity records from the extension."""
+    """
+    Stores individual activity records from the extension.
+
+    New rows go to monthly partition tables cloned from this model (see
+    services/activity_partitions.py); `activities` itself only holds rows
+    written before partitioning until startup moves them.
+    """
     __tablename__ = "activities"
 
     id = Column(Integer, primary_key=True, index=True)
     task_name = Column(String, index=True)
-    url = Column(String)
-    domain = Column(String, index=True)
-    title = Column(String)
+    url_id = Column(Integer, ForeignKey("urls.id"))
+    domain_id = Column(Integer, ForeignKey("domains.id"), index=True)
+    title_id = Column(Integer, ForeignKey("titles.id"))
     duration_ms = Column(Integer)
     start_time = Column(DateTime)
     end_time = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Hash of (task_name, url, start_time, end_time); rejects resent batches
+    dedup_key = Column(Integer, index=True, unique=True, nullable=True)
+
+    __table_args__ = (
+        # Covers the time-range aggregates in services/activity_queries.py
+        Index("ix_activities_created_at", "created_at", "domain_id", "duration_ms"),
+    )
+
+
+class ActivityPartition(Base):
+    """Catalog of monthly activity partition tables."""
+    __tablename__ = "activity_partitions"
+
+    name = Column(String, primary_key=True)
+    range_start = Column(DateTime, nullable=False, index=True)
+    range_end = Column(DateTime, nullable=False)  # Exclusive
+    archived = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ActivityHourly(Base):
+    """
+    Hourly per-task, per-domain totals of activities older than the
+    retention window (see services/activity_rollup.py).
+    """
+    __tablename__ = "activity_hourly"
+
+    id = Column(Integer, primary_key=True)
+    hour = Column(DateTime, nullable=False)
+    task_name = Column(String)
+    domain_id = Column(Integer, ForeignKey("domains.id"))
+    activity_count = Column(Integer, nullable=False, default=0)
+    total_duration_ms = Column(Integer, nullable=False, default=0)
+
+    # NULL task or domain keys never conflict in a plain unique index, so
+    # the rollup's upsert target coalesces them (schema migration 9)
+    __table_args__ = (
+        Index(
+            "ix_activity_hourly_rollup_key",
+            hour, func.coalesce(task_name, literal_column("''")), func.coalesce(domain_id, literal_column("0")),
+            unique=True
+        ),
+    )
+
+
+class DailyStats(Base):
+    """
+    Dashboard totals per UTC day plus an all-time row, kept current in
+    the transactions that change the underlying rows (see
+    services/daily_stats.py). Sessions count toward the day they started,
+    activities the day they were stored, predictions the day they were made.
+    """
+    __tablename__ = "daily_stats"
+
+    day = Column(String, primary_key=True)  # "YYYY-MM-DD", or "all"
+    session_count = Column(Integer, nullable=False, default=0)
+    focus_score_sum = Column(Float, nullable=False, default=0.0)
+    focus_score_count = Column(Integer, nullable=False, default=0)
+    activity_count = Column(Integer, nullable=False, default=0)
+    duration_ms_sum = Column(Integer, nullable=False, default=0)
+    # MAPE numerator and denominator over predictions with an actual duration
+    prediction_error_sum = Column(Float, nullable=False, default=0.0)
+    prediction_error_count = Column(Integer, nullable=False, default=0)
+
+
+def activity_partition_table(name: str) -> Table:
+    """Table object for an activity partition, with the Activity columns and indexes."""
+    table = Base.metadata.tables.get(name)
+    if table is None:
+        table = Activity.__table__.to_metadata(Base.metadata, name=name)
+        # Keeps each partition's id high-water mark in sqlite_sequence, where
+        # for_write seeds it so ids stay unique across partitions
+        table.dialect_options["sqlite"]["autoincrement"] = True
+        # Explicitly named indexes are copied verbatim; give each partition its own
+        shared_names = {index.name for index in Activity.__table__.indexes}
+        for index in table.indexes:
+            if index.name in shared_names:
+                index.name = index.name.replace("ix_activities_", f"ix_{name}_", 1)
+    return table
+
+
+def session_category(task_name: Optional[str]) -> Optional[str]:
+    """Normalized task name (case-folded, whitespace collapsed) that sessions are grouped by."""
+    return " ".join(task_name.casefold().split()) if task_name is not None else None
 
 
 class Session(Base):
@@ -53,7 +248,8 @@ class Session(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     task_name = Column(String, index=True)
-    start_time = Column(DateTime)
+    category = Column(String, index=True)  # session_category(task_name)
+    start_time = Column(DateTime, index=True)
     end_time = Column(DateTime)
     focus_score = Column(Float)
     tab_switches = Column(Integer)
@@ -61,17 +257,59 @@ class Session(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class DurationSketch(Base):
+    """
+    Exact totals of one session category's durations; the quantile
+    sketch itself is in DurationSketchBucket (see services/duration_sketch.py).
+    """
+    __tablename__ = "duration_sketches"
+
+    category = Column(String, primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+    duration_ms_sum = Column(Integer, nullable=False, default=0)
+    duration_ms_sq_sum = Column(Float, nullable=False, default=0.0)
+
+
+class DurationSketchBucket(Base):
+    """Sessions of a category whose duration falls in one log-scale bucket."""
+    __tablename__ = "duration_sketch_buckets"
+
+    category = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
 class Prediction(Base):
     """Stores prediction history for accuracy tracking."""
     __tablename__ = "predictions"
 
     id = Column(Integer, primary_key=True, index=True)
-    task_category = Column(String, index=True)
+    task_category = Column(String)
     predicted_minutes = Column(Integer)
-    actual_minutes = Column(Integer, nullable=True)
+    actual_minutes = Column(Integer, nullable=True, index=True)
     conservativity = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Per-category accuracy over completed predictions
+        Index("ix_predictions_task_category_actual_minutes", "task_category", "actual_minutes"),
+    )
+
+
+class PredictionAccuracy(Base):
+    """
+    MAPE numerator and denominator of one prediction category, per UTC
+    day the predictions were made plus an all-time row ("all"), kept
+    current by PredictionEngine.update_actual_duration (see
+    services/prediction_accuracy.py).
+    """
+    __tablename__ = "prediction_accuracy"
+
+    task_category = Column(String, primary_key=True)
+    day = Column(String, primary_key=True)  # "YYYY-MM-DD", or "all"
+    error_sum = Column(Float, nullable=False, default=0.0)
+    error_count = Column(Integer, nullable=False, default=0)
+
 
 class Setting(Base):
     """Key-value store for user settings."""
@@ -89,6 +327,11 @@ class Setting(Base):
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    # Register existing partitions with the metadata
+    with engine.connect() as conn:
+        for (name,) in conn.execute(text("SELECT name FROM activity_partitions")):
+            activity_partition_table(name)
 
     # Initialize default settings
     db = SessionLocal()
@@ -109,3 +352,54 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Dependency to get a read-only database session."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+T = TypeVar("T")
+
+# Blocking database work from async code runs here, never on the event loop.
+# Bounded so a burst of slow queries queues up instead of opening a
+# connection (and a thread) per request.
+_db_executor = ThreadPoolExecutor(
+    max_workers=settings.db_thread_pool_size, thread_name_prefix="focusflow-db"
+)
+
+
+async def run_db(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run synchronous SQLAlchemy work on the database thread pool.
+
+    Async routes call this for every query so a slow one only occupies a
+    pool thread while other requests keep being served. A DBSession is
+    only ever used by one call at a time, so handing it to a worker
+    thread is safe.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, partial(fn, *args, **kwargs))
+
+
+# Work on the writer engine runs on its own single thread. The writer has
+# one connection, so queued writes wait here, in the executor's queue,
+# instead of each holding a _db_executor thread while blocked on the pool.
+_writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="focusflow-writer")
+
+
+async def run_write_db(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run synchronous SQLAlchemy work that uses the writer session (get_db /
+    SessionLocal), one call at a time.
+
+    Reads on get_read_db sessions keep using run_db, so a burst of uploads
+    never delays the dashboard. fn should commit (or roll back) before it
+    returns so the writer connection is free for the next call.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_writer_executor, partial(fn, *args, **kwargs))
@@ -2,13 +2,20 @@
 FocusFlow Backend - Main FastAPI Application
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 import uvicorn
 
 from config import settings
-from database import init_db
-from routers import activity, chat, predictions, calendar_routes, stats, settings as settings_router
+from database import init_db, SessionLocal
+from middleware import RequestDecompressionMiddleware
+from routers import activity, chat, predictions, calendar_routes, export, stats, settings as settings_router
+from services.activity_partitions import activity_partitions
+from services.activity_rollup import activity_rollup
+from services.session_registry import session_registry
+from services.write_behind import activity_queue
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -32,6 +39,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Accept gzip (and zstd, if installed) compressed request bodies
+app.add_middleware(
+    RequestDecompressionMiddleware,
+    max_body_bytes=settings.max_request_body_mb * 1024 * 1024,
+)
+
 # Include routers
 app.include_router(activity.router, prefix="/api", tags=["Activity"])
 app.include_router(chat.router, prefix="/api", tags=["Chat"])
@@ -39,17 +52,46 @@ app.include_router(predictions.router, prefix="/api", tags=["Predictions"])
 app.include_router(calendar_routes.router, prefix="/api", tags=["Calendar"])
 app.include_router(stats.router, prefix="/api", tags=["Stats"])
 app.include_router(settings_router.router, prefix="/api", tags=["Settings"])
+app.include_router(export.router, prefix="/api", tags=["Export"])
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    """No database connection freed up in time: busy, not broken, so ask the client to retry."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database is busy, retry shortly"},
+        headers={"Retry-After": "1"}
+    )
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup."""
     init_db()
+    db = SessionLocal()
+    try:
+        activity_partitions.adopt_unpartitioned(db)
+        db.commit()
+        session_registry.warm(db)
+    finally:
+        db.close()
+    if settings.activity_write_behind:
+        await activity_queue.start()
+    if settings.activity_retention_days > 0:
+        await activity_rollup.start()
     print("✅ FocusFlow API started")
     print(f"📚 Docs available at http://localhost:{settings.backend_port}/docs")
     print(f"➡️  Click here! http://localhost:8000/api/calendar/auth")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush any queued activity uploads and stop background jobs."""
+    await activity_rollup.stop()
+    await activity_queue.stop()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -0,0 +1,175 @@
+"""
+Request body decompression for FocusFlow.
+
+Clients may send request bodies with `Content-Encoding: gzip` (or `zstd`
+when the optional `zstandard` package is installed). The body is
+decompressed incrementally as the route reads it, so streaming endpoints
+such as /api/activity/stream keep their constant memory use. Output is
+capped at `max_body_bytes` (413 beyond that) to defuse zip bombs, and
+each decompression step produces at most OUTPUT_CHUNK bytes, so a tiny
+malicious input cannot allocate much past the cap.
+"""
+
+import zlib
+from typing import Optional
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # Optional: pip install zstandard
+    zstandard = None
+
+
+_DECODE_ERRORS = (ValueError, zlib.error) + ((zstandard.ZstdError,) if zstandard else ())
+
+# Upper bound on bytes produced per decompression step
+OUTPUT_CHUNK = 256 * 1024
+
+# zstd has no output limit per call, so input is fed in slices this small;
+# a slice of RLE blocks expands to at most ~8 MB
+ZSTD_INPUT_SLICE = 256
+
+
+class _GzipDecoder:
+    def __init__(self):
+        self._zlib = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        self._input = b""
+
+    def feed(self, data: bytes):
+        self._input += data
+
+    def read(self) -> bytes:
+        """Decompress up to OUTPUT_CHUNK bytes of the input fed so far."""
+        output = self._zlib.decompress(self._input, OUTPUT_CHUNK)
+        self._input = self._zlib.unconsumed_tail
+        return output
+
+    @property
+    def has_input(self) -> bool:
+        return bool(self._input)
+
+    def finish(self) -> bytes:
+        output = self._zlib.flush()
+        if not self._zlib.eof:
+            raise ValueError("truncated gzip stream")
+        if self._zlib.unused_data:
+            raise ValueError("trailing data after gzip stream")
+        return output
+
+
+class _ZstdDecoder:
+    def __init__(self):
+        self._zstd = zstandard.ZstdDecompressor().decompressobj()
+        self._input = memoryview(b"")
+
+    def feed(self, data: bytes):
+        self._input = memoryview(bytes(self._input) + data)
+
+    def read(self) -> bytes:
+        """Decompress input slice by slice until about OUTPUT_CHUNK bytes are out."""
+        output = []
+        size = 0
+        offset = 0
+        while offset < len(self._input) and size < OUTPUT_CHUNK:
+            piece = self._zstd.decompress(self._input[offset:offset + ZSTD_INPUT_SLICE])
+            offset += ZSTD_INPUT_SLICE
+            output.append(piece)
+            size += len(piece)
+        self._input = self._input[offset:]
+        return b"".join(output)
+
+    @property
+    def has_input(self) -> bool:
+        return len(self._input) > 0
+
+    def finish(self) -> bytes:
+        if not self._zstd.eof:
+            raise ValueError("truncated zstd stream")
+        return b""
+
+
+def supported_encodings() -> dict:
+    """Content-Encoding values accepted on request bodies."""
+    decoders = {"gzip": _GzipDecoder, "x-gzip": _GzipDecoder}
+    if zstandard is not None:
+        decoders["zstd"] = _ZstdDecoder
+    return decoders
+
+
+class RequestDecompressionMiddleware:
+    """ASGI middleware that transparently decodes compressed request bodies."""
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int = 64 * 1024 * 1024):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.decoders = supported_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding: Optional[str] = None
+        for name, value in scope["headers"]:
+            if name == b"content-encoding":
+                encoding = value.decode("latin-1").strip().lower()
+
+        if encoding is None or encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        decoder_cls = self.decoders.get(encoding)
+        if decoder_cls is None:
+            response = JSONResponse(
+                {"detail": f"Unsupported Content-Encoding '{encoding}' (supported: {', '.join(self.decoders)})"},
+                status_code=415
+            )
+            await response(scope, receive, send)
+            return
+
+        # Downstream sees a plain body of unknown length
+        scope = dict(scope, headers=[
+            (name, value) for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ])
+        await self.app(scope, self._decoding_receive(receive, decoder_cls(), encoding), send)
+
+    def _decoding_receive(self, receive: Receive, decoder, encoding: str) -> Receive:
+        max_body_bytes = self.max_body_bytes
+        more_body = True
+        finished = False
+        total = 0
+
+        async def decoding_receive() -> Message:
+            nonlocal more_body, finished, total
+            if finished:
+                return await receive()
+
+            while True:
+                if more_body and not decoder.has_input:
+                    message = await receive()
+                    if message["type"] != "http.request":
+                        return message
+                    decoder.feed(message.get("body", b""))
+                    more_body = message.get("more_body", False)
+
+                try:
+                    chunk = decoder.read()
+                    if not more_body and not decoder.has_input:
+                        chunk += decoder.finish()
+                        finished = True
+                except _DECODE_ERRORS as e:
+                    raise HTTPException(status_code=400, detail=f"Invalid {encoding} request body: {e}")
+
+                total += len(chunk)
+                if total > max_body_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Decompressed request body exceeds {max_body_bytes} bytes"
+                    )
+                if chunk or finished:
+                    return {"type": "http.request", "body": chunk, "more_body": not finished}
+
+        return decoding_receive
@@ -0,0 +1,422 @@
+"""
+Schema migrations for FocusFlow.
+
+`create_all` only creates missing tables, so changes to existing tables
+are shipped as numbered migrations that upgrade a focusflow.db in place.
+Applied versions are recorded in `schema_versions`; `run_migrations()`
+applies the rest in order at startup. Each runs in its own transaction,
+opened with an explicit BEGIN: pysqlite only starts one implicitly
+before DML and would commit CREATE/ALTER/DROP as they run, so a
+migration failing halfway would leave its schema changes behind.
+
+Migrations are SQL against the schema as it was when they were written,
+plus frozen copies of any Python logic they need (the sketch bucketing
+and category normalization of migrations 6 and 7), so they keep
+computing the same thing as the models and services evolve. Databases
+created before versioning existed start at version 0 and may already be
+partly upgraded, so the early migrations inspect the schema before
+changing it. Fresh databases run them too; they are no-ops against the
+current models.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+
+schema_versions = Table(
+    "schema_versions", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+    # VACUUM and some PRAGMAs cannot run inside a transaction
+    transactional: bool = True
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, name: str, transactional: bool = True):
+    """Register an upgrade function as schema version `version`."""
+    def register(upgrade: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, name, upgrade, transactional))
+        return upgrade
+    return register
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """
+    Apply every migration newer than the database's recorded versions.
+
+    Returns:
+        Versions applied by this call
+    """
+    with engine.begin() as conn:
+        schema_versions.create(bind=conn, checkfirst=True)
+        applied = set(conn.execute(select(schema_versions.c.version)).scalars())
+
+    newly_applied = []
+    for step in sorted(MIGRATIONS, key=lambda m: m.version):
+        if step.version in applied:
+            continue
+        if step.transactional:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("BEGIN")
+                step.upgrade(conn)
+                _record(conn, step)
+                conn.commit()
+        else:
+            # pysqlite only opens a transaction implicitly before DML
+            with engine.connect() as conn:
+                step.upgrade(conn)
+            with engine.begin() as conn:
+                _record(conn, step)
+        newly_applied.append(step.version)
+        print(f"🗃️  Applied schema migration {step.version}: {step.name}")
+    return newly_applied
+
+
+def _record(conn: Connection, step: Migration):
+    conn.execute(schema_versions.insert().values(
+        version=step.version, name=step.name, applied_at=datetime.utcnow()
+    ))
+
+
+def _columns(conn: Connection, table: str) -> set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def _activity_tables(conn: Connection) -> list[str]:
+    """The original activities table plus every monthly partition."""
+    tables = ["activities"]
+    if inspect(conn).has_table("activity_partitions"):
+        tables += conn.execute(text("SELECT name FROM activity_partitions")).scalars().all()
+    return tables
+
+
+# Frozen copies of live code the migrations were written against. The
+# sketches they build must stay readable by the duration_sketch version of
+# the time; changing the live functions takes a new migration.
+_SKETCH_LOG_GAMMA = math.log((1 + 0.01) / (1 - 0.01))  # RELATIVE_ACCURACY = 1%
+
+
+def _sketch_bucket(duration_ms: float) -> int:
+    """duration_sketch.bucket_index as of migrations 6 and 7."""
+    return math.ceil(math.log(duration_ms) / _SKETCH_LOG_GAMMA)
+
+
+def _category(task_name: str) -> str:
+    """database.session_category as of migration 7."""
+    return " ".join(task_name.casefold().split())
+
+
+# ============================================================
+# Migrations
+# ============================================================
+
+@migration(1, "activity dedup key")
+def _activity_dedup_key(conn: Connection):
+    if "dedup_key" not in _columns(conn, "activities"):
+        conn.execute(text("ALTER TABLE activities ADD COLUMN dedup_key INTEGER"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_activities_dedup_key ON activities (dedup_key)"
+    ))
+
+
+@migration(2, "intern activity url/domain/title into dimension tables")
+def _normalize_activity_strings(conn: Connection):
+    columns = _columns(conn, "activities")
+    if "domain" not in columns:
+        return
+
+    for table in ("urls", "domains", "titles"):
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, value VARCHAR NOT NULL UNIQUE)"
+        ))
+    for table, column in (("urls", "url"), ("domains", "domain"), ("titles", "title")):
+        if f"{column}_id" not in columns:
+            conn.execute(text(
+                f"ALTER TABLE activities ADD COLUMN {column}_id INTEGER REFERENCES {table} (id)"
+            ))
+        conn.execute(text(
+            f"INSERT OR IGNORE INTO {table} (value) "
+            f"SELECT DISTINCT {column} FROM activities WHERE {column} IS NOT NULL"
+        ))
+        conn.execute(text(
+            f"UPDATE activities SET {column}_id = "
+            f"(SELECT id FROM {table} WHERE {table}.value = activities.{column})"
+        ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_activities_domain"))
+    for column in ("url", "domain", "title"):
+        conn.execute(text(f"ALTER TABLE activities DROP COLUMN {column}"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_activities_domain_id ON activities (domain_id)"))
+
+
+@migration(3, "incremental auto-vacuum", transactional=False)
+def _incremental_auto_vacuum(conn: Connection):
+    # The mode only takes effect on the next VACUUM (instant for a new
+    # database, a one-time rewrite for an existing one)
+    if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+        return
+    conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.exec_driver_sql("VACUUM")
+
+
+@migration(4, "indexes for hot dashboard and prediction queries")
+def _hot_query_indexes(conn: Connection):
+    # Covering index for activity_totals / top_domains range scans
+    for table in _activity_tables(conn):
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_created_at ON {table} (created_at, domain_id, duration_ms)"
+        ))
+    # Today's / recent sessions (stats, chat context, session registry)
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_sessions_start_time ON sessions (start_time)"))
+    # Completed predictions, overall and per category (accuracy)
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_predictions_actual_minutes ON predictions (actual_minutes)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_predictions_task_category_actual_minutes "
+        "ON predictions (task_category, actual_minutes)"
+    ))
+    # Superseded by the composite index above
+    conn.execute(text("DROP INDEX IF EXISTS ix_predictions_task_category"))
+
+
+@migration(5, "daily dashboard totals")
+def _daily_stats(conn: Connection):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS daily_stats ("
+        "day VARCHAR NOT NULL PRIMARY KEY, "
+        "session_count INTEGER NOT NULL, focus_score_sum FLOAT NOT NULL, focus_score_count INTEGER NOT NULL, "
+        "activity_count INTEGER NOT NULL, duration_ms_sum INTEGER NOT NULL, "
+        "prediction_error_sum FLOAT NOT NULL, prediction_error_count INTEGER NOT NULL)"
+    ))
+    conn.execute(text("DELETE FROM daily_stats"))
+
+    counters = ("session_count", "focus_score_sum", "focus_score_count", "activity_count",
+                "duration_ms_sum", "prediction_error_sum", "prediction_error_count")
+    days: dict[str, dict[str, float]] = {}
+
+    def accumulate(query: str, columns: tuple[str, ...]):
+        for day, *values in conn.execute(text(query)):
+            for key in (day, "all"):
+                row = days.setdefault(key, dict.fromkeys(counters, 0))
+                for column, value in zip(columns, values):
+                    row[column] += value or 0
+
+    accumulate(
+        "SELECT date(start_time), COUNT(*), SUM(focus_score), COUNT(focus_score) FROM sessions "
+        "WHERE start_time IS NOT NULL GROUP BY 1",
+        ("session_count", "focus_score_sum", "focus_score_count")
+    )
+    for table in _activity_tables(conn):
+        accumulate(
+            f"SELECT date(created_at), COUNT(*), SUM(duration_ms) FROM {table} "
+            f"WHERE created_at IS NOT NULL GROUP BY 1",
+            ("activity_count", "duration_ms_sum")
+        )
+    if inspect(conn).has_table("activity_hourly"):
+        accumulate(
+            "SELECT date(hour), SUM(activity_count), SUM(total_duration_ms) FROM activity_hourly GROUP BY 1",
+            ("activity_count", "duration_ms_sum")
+        )
+    accumulate(
+        "SELECT date(created_at), SUM(ABS(predicted_minutes - actual_minutes) * 1.0 / actual_minutes), COUNT(*) "
+        "FROM predictions WHERE actual_minutes > 0 AND created_at IS NOT NULL GROUP BY 1",
+        ("prediction_error_sum", "prediction_error_count")
+    )
+
+    if days:
+        conn.execute(
+            text(f"INSERT INTO daily_stats (day, {', '.join(counters)}) "
+                 f"VALUES (:day, {', '.join(':' + c for c in counters)})"),
+            [{"day": day, **row} for day, row in days.items()]
+        )
+
+
+@migration(6, "per-task session duration sketches")
+def _duration_sketches(conn: Connection):
+    if inspect(conn).has_table("duration_sketches") and "task_name" not in _columns(conn, "duration_sketches"):
+        return  # Already keyed by category (created by the current models); migration 7 fills it
+
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS duration_sketches ("
+        "task_name VARCHAR NOT NULL PRIMARY KEY, session_count INTEGER NOT NULL, "
+        "duration_ms_sum INTEGER NOT NULL, duration_ms_sq_sum FLOAT NOT NULL)"
+    ))
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS duration_sketch_buckets ("
+        "task_name VARCHAR NOT NULL, bucket INTEGER NOT NULL, count INTEGER NOT NULL, "
+        "PRIMARY KEY (task_name, bucket))"
+    ))
+    conn.execute(text("DELETE FROM duration_sketch_buckets"))
+    conn.execute(text("DELETE FROM duration_sketches"))
+
+    totals: dict[str, list[float]] = {}
+    buckets: dict[tuple[str, int], int] = {}
+    rows = conn.execute(text(
+        "SELECT task_name, total_duration_ms FROM sessions "
+        "WHERE task_name IS NOT NULL AND total_duration_ms > 0"
+    ))
+    for task_name, duration_ms in rows:
+        total = totals.setdefault(task_name, [0, 0, 0.0])
+        total[0] += 1
+        total[1] += duration_ms
+        total[2] += float(duration_ms) ** 2
+        key = (task_name, _sketch_bucket(duration_ms))
+        buckets[key] = buckets.get(key, 0) + 1
+
+    if totals:
+        conn.execute(
+            text("INSERT INTO duration_sketches (task_name, session_count, duration_ms_sum, duration_ms_sq_sum) "
+                 "VALUES (:task_name, :count, :sum, :sq_sum)"),
+            [{"task_name": name, "count": c, "sum": s, "sq_sum": sq} for name, (c, s, sq) in totals.items()]
+        )
+        conn.execute(
+            text("INSERT INTO duration_sketch_buckets (task_name, bucket, count) VALUES (:task_name, :bucket, :count)"),
+            [{"task_name": name, "bucket": bucket, "count": count} for (name, bucket), count in buckets.items()]
+        )
+
+
+@migration(7, "normalized session category; duration sketches by category with a trigram index")
+def _session_category(conn: Connection):
+    if "category" not in _columns(conn, "sessions"):
+        conn.execute(text("ALTER TABLE sessions ADD COLUMN category VARCHAR"))
+    names = conn.execute(text(
+        "SELECT DISTINCT task_name FROM sessions WHERE category IS NULL AND task_name IS NOT NULL"
+    )).scalars().all()
+    if names:
+        conn.execute(
+            text("UPDATE sessions SET category = :category WHERE task_name = :task_name AND category IS NULL"),
+            [{"task_name": name, "category": _category(name)} for name in names]
+        )
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_sessions_category ON sessions (category)"))
+
+    # Version 6 keyed the sketches by raw task name
+    if inspect(conn).has_table("duration_sketches") and "task_name" in _columns(conn, "duration_sketches"):
+        conn.execute(text("DROP TABLE duration_sketch_buckets"))
+        conn.execute(text("DROP TABLE duration_sketches"))
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS duration_sketches ("
+        "category VARCHAR NOT NULL PRIMARY KEY, session_count INTEGER NOT NULL, "
+        "duration_ms_sum INTEGER NOT NULL, duration_ms_sq_sum FLOAT NOT NULL)"
+    ))
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS duration_sketch_buckets ("
+        "category VARCHAR NOT NULL, bucket INTEGER NOT NULL, count INTEGER NOT NULL, "
+        "PRIMARY KEY (category, bucket))"
+    ))
+    conn.execute(text("DELETE FROM duration_sketch_buckets"))
+    conn.execute(text("DELETE FROM duration_sketches"))
+
+    # Substring index over the categories, filled by trigger as new ones
+    # appear. The trigram tokenizer needs SQLite 3.34+ built with FTS5;
+    # without it category lookups scan duration_sketches instead.
+    try:
+        with conn.begin_nested():
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS duration_sketch_fts USING fts5(category, tokenize='trigram')"
+            ))
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS duration_sketches_fts_insert AFTER INSERT ON duration_sketches "
+                "BEGIN INSERT INTO duration_sketch_fts (category) VALUES (new.category); END"
+            ))
+            conn.execute(text("DELETE FROM duration_sketch_fts"))
+    except OperationalError as e:
+        print(f"⚠️  No trigram index for session categories ({e}); lookups will scan")
+
+    totals: dict[str, list[float]] = {}
+    buckets: dict[tuple[str, int], int] = {}
+    rows = conn.execute(text(
+        "SELECT category, total_duration_ms FROM sessions "
+        "WHERE category IS NOT NULL AND total_duration_ms > 0"
+    ))
+    for category, duration_ms in rows:
+        total = totals.setdefault(category, [0, 0, 0.0])
+        total[0] += 1
+        total[1] += duration_ms
+        total[2] += float(duration_ms) ** 2
+        key = (category, _sketch_bucket(duration_ms))
+        buckets[key] = buckets.get(key, 0) + 1
+
+    if totals:
+        conn.execute(
+            text("INSERT INTO duration_sketches (category, session_count, duration_ms_sum, duration_ms_sq_sum) "
+                 "VALUES (:category, :count, :sum, :sq_sum)"),
+            [{"category": name, "count": c, "sum": s, "sq_sum": sq} for name, (c, s, sq) in totals.items()]
+        )
+        conn.execute(
+            text("INSERT INTO duration_sketch_buckets (category, bucket, count) VALUES (:category, :bucket, :count)"),
+            [{"category": name, "bucket": bucket, "count": count} for (name, bucket), count in buckets.items()]
+        )
+
+
+@migration(8, "per-category prediction accuracy totals")
+def _prediction_accuracy(conn: Connection):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS prediction_accuracy ("
+        "task_category VARCHAR NOT NULL, day VARCHAR NOT NULL, "
+        "error_sum FLOAT NOT NULL, error_count INTEGER NOT NULL, "
+        "PRIMARY KEY (task_category, day))"
+    ))
+    conn.execute(text("DELETE FROM prediction_accuracy"))
+
+    totals: dict[tuple[str, str], list[float]] = {}
+    rows = conn.execute(text(
+        "SELECT task_category, date(created_at), "
+        "SUM(ABS(predicted_minutes - actual_minutes) * 1.0 / actual_minutes), COUNT(*) "
+        "FROM predictions WHERE actual_minutes > 0 AND task_category IS NOT NULL AND created_at IS NOT NULL "
+        "GROUP BY 1, 2"
+    ))
+    for task_category, day, error_sum, error_count in rows:
+        for key in ((task_category, day), (task_category, "all")):
+            total = totals.setdefault(key, [0.0, 0])
+            total[0] += error_sum
+            total[1] += error_count
+
+    if totals:
+        conn.execute(
+            text("INSERT INTO prediction_accuracy (task_category, day, error_sum, error_count) "
+                 "VALUES (:task_category, :day, :error_sum, :error_count)"),
+            [{"task_category": category, "day": day, "error_sum": s, "error_count": c}
+             for (category, day), (s, c) in totals.items()]
+        )
+
+
+@migration(9, "activity rollup key that matches NULL tasks and domains")
+def _activity_hourly_key(conn: Connection):
+    if not inspect(conn).has_table("activity_hourly"):
+        return
+    # The old key never matched NULLs, so each rollup run appended a row
+    # per NULL-keyed group; fold them into the group's lowest id
+    conn.execute(text(
+        "UPDATE activity_hourly SET "
+        "activity_count = (SELECT SUM(d.activity_count) FROM activity_hourly AS d WHERE d.hour = activity_hourly.hour "
+        "AND d.task_name IS activity_hourly.task_name AND d.domain_id IS activity_hourly.domain_id), "
+        "total_duration_ms = (SELECT SUM(d.total_duration_ms) FROM activity_hourly AS d "
+        "WHERE d.hour = activity_hourly.hour "
+        "AND d.task_name IS activity_hourly.task_name AND d.domain_id IS activity_hourly.domain_id) "
+        "WHERE id IN (SELECT MIN(id) FROM activity_hourly GROUP BY hour, task_name, domain_id HAVING COUNT(*) > 1)"
+    ))
+    conn.execute(text(
+        "DELETE FROM activity_hourly WHERE id NOT IN "
+        "(SELECT MIN(id) FROM activity_hourly GROUP BY hour, task_name, domain_id)"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_activity_hourly_key"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_activity_hourly_rollup_key "
+        "ON activity_hourly (hour, coalesce(task_name, ''), coalesce(domain_id, 0))"
+    ))
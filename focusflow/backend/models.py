@@ -32,8 +32,31 @@ class ActivityRequest(BaseModel):
 
 class ActivityResponse(BaseModel):
     """Response after logging activities."""
+    status: Literal["logged", "queued"]
+    count: int
+
+
+class ActivityStreamRecord(ActivityItem):
+    """Single NDJSON line for POST /api/activity/stream (backfills)."""
+    task_name: str
+    tab_switches: int = Field(default=0, ge=0)
+    focus_score: Optional[float] = Field(default=None, ge=0, le=100)
+
+
+class ActivityStreamChunk(BaseModel):
+    """Progress for one committed chunk of a streamed upload."""
+    chunk: int
+    rows: int
+    committed_rows: int  # Running total after this chunk
+
+
+class ActivityStreamResponse(BaseModel):
+    """Response after a streamed NDJSON upload."""
     status: Literal["logged"]
     count: int
+    rejected: int
+    rejected_lines: list[int]  # 1-based line numbers, capped
+    chunks: list[ActivityStreamChunk]
 
 
 # ============================================================
@@ -77,6 +100,26 @@ class PredictionResponse(BaseModel):
     explanation: str
 
 
+class PredictionBatchRequest(BaseModel):
+    """Categories to predict in one call."""
+    task_categories: list[str] = Field(min_length=1, max_length=1000)
+    conservativity: float = Field(default=0.5, ge=0, le=1)
+
+
+class PredictionBatchResponse(BaseModel):
+    """Prediction per requested category."""
+    predictions: dict[str, PredictionResponse]
+
+
+class PredictionCacheStats(BaseModel):
+    """Prediction cache counters since startup."""
+    hits: int
+    misses: int
+    invalidations: int  # Entries dropped because a matching session changed
+    size: int
+    max_size: int
+
+
 # ============================================================
 # Stats Models
 # ============================================================
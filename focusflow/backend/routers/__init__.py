@@ -2,4 +2,4 @@
 FocusFlow API Routers
 """
 
-from . import activity, chat, predictions, calendar_routes, stats, settings
+from . import activity, chat, predictions, calendar_routes, export, stats, settings
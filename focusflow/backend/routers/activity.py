@@ -2,85 +2,194 @@
 Activity Router - Handles activity logging from the Chrome extension.
 """
 
-from fastapi import APIRouter, Depends
+import asyncio
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.orm import Session as DBSession
-from datetime import datetime, timedelta
 
-from models import ActivityRequest, ActivityResponse
-from database import get_db, Activity, Session
+from config import settings
+from models import (
+    ActivityRequest, ActivityResponse, ActivityStreamRecord,
+    ActivityStreamChunk, ActivityStreamResponse
+)
+from database import get_db, run_write_db
+from services.activity_codec import ACTIVITY_COLUMNAR_MEDIA_TYPE, decode_activity_columnar
+from services.activity_ingestor import ActivityBatch, ActivityIngestor
+from services.session_registry import session_registry
+from services.write_behind import activity_queue
 
 router = APIRouter()
 
 
+async def parse_activity_request(http_request: Request) -> ActivityBatch:
+    """
+    Decode an activity upload as JSON or the compact columnar format.
+
+    The format is chosen by Content-Type; anything other than
+    ACTIVITY_COLUMNAR_MEDIA_TYPE is parsed as JSON.
+    """
+    body = await http_request.body()
+    content_type = http_request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type == ACTIVITY_COLUMNAR_MEDIA_TYPE:
+        try:
+            return decode_activity_columnar(body)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        return ActivityBatch.from_request(ActivityRequest.model_validate_json(body))
+    except ValidationError as e:
+        errors = [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        raise RequestValidationError(errors, body=body)
+
+
 @router.post("/activity", response_model=ActivityResponse)
-async def log_activity(request: ActivityRequest, db: DBSession = Depends(get_db)):
+async def log_activity(
+    request: ActivityBatch = Depends(parse_activity_request),
+    db: DBSession = Depends(get_db)
+):
     """
     Log activity data from the Chrome extension.
 
     Called every 30 seconds by the extension with batched activity data.
     Stores activities and creates/updates session records.
+
+    Accepts `application/json` (ActivityRequest) or the compact columnar
+    `application/x-focusflow-activity` encoding from services/activity_codec.py.
+
+    With write-behind enabled the upload is queued and committed by the
+    background writer; a full queue answers 503 so the client retries.
     """
     print(f"📝 Received activity: {request.task_name}")
     print(f"   Activities: {len(request.activities)}")
     print(f"   Tab switches: {request.tab_switches}")
     print(f"   Focus score: {request.focus_score}")
 
-    # Store each activity in the database
-    total_duration_ms = 0
-    earliest_start = None
-    latest_end = None
-
-    for activity_item in request.activities:
-        start_time = datetime.fromtimestamp(activity_item.start_time / 1000)
-        end_time = datetime.fromtimestamp(activity_item.end_time / 1000)
-
-        activity = Activity(
-            task_name=request.task_name,
-            url=activity_item.url,
-            domain=activity_item.domain,
-            title=activity_item.title,
-            duration_ms=activity_item.duration_ms,
-            start_time=start_time,
-            end_time=end_time,
-        )
-        db.add(activity)
-
-        total_duration_ms += activity_item.duration_ms
-
-        if earliest_start is None or start_time < earliest_start:
-            earliest_start = start_time
-        if latest_end is None or end_time > latest_end:
-            latest_end = end_time
-
-    # Find or create session for this task
-    # Look for an existing session with the same task name within the last hour
-    one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-    existing_session = db.query(Session).filter(
-        Session.task_name == request.task_name,
-        Session.start_time >= one_hour_ago
-    ).order_by(Session.start_time.desc()).first()
-
-    if existing_session:
-        # Update existing session
-        existing_session.end_time = latest_end or datetime.utcnow()
-        existing_session.focus_score = request.focus_score
-        existing_session.tab_switches = (existing_session.tab_switches or 0) + request.tab_switches
-        existing_session.total_duration_ms = (existing_session.total_duration_ms or 0) + total_duration_ms
-    else:
-        # Create new session
-        new_session = Session(
-            task_name=request.task_name,
-            start_time=earliest_start or datetime.utcnow(),
-            end_time=latest_end or datetime.utcnow(),
-            focus_score=request.focus_score,
-            tab_switches=request.tab_switches,
-            total_duration_ms=total_duration_ms,
-        )
-        db.add(new_session)
+    if activity_queue.running:
+        try:
+            activity_queue.submit(request)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=503,
+                detail="Activity queue is full, retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        return ActivityResponse(status="queued", count=len(request.activities))
 
-    db.commit()
+    async with session_registry.lock(request.task_name):
+        count = await run_write_db(_ingest_and_commit, db, request)
 
     return ActivityResponse(
         status="logged",
-        count=len(request.activities)
+        count=count
+    )
+
+
+def _ingest_and_commit(db: DBSession, request: ActivityBatch) -> int:
+    count = ActivityIngestor(db).ingest(request)
+    db.commit()
+    return count
+
+
+# Longest NDJSON line accepted by /activity/stream; longer lines are rejected
+# without being buffered so a missing newline cannot grow memory unbounded.
+MAX_STREAM_LINE_BYTES = 64 * 1024
+
+# Cap on rejected line numbers echoed back to the client
+MAX_REPORTED_REJECTIONS = 100
+
+
+async def _iter_ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Optional[bytes]]]:
+    """
+    Split a chunked request body into (line_number, line) pairs.
+
+    Lines over MAX_STREAM_LINE_BYTES are yielded as None so the caller
+    counts them as rejected.
+    """
+    buffer = b""
+    line_number = 0
+    oversized = False
+
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, None if oversized or len(line) > MAX_STREAM_LINE_BYTES else line
+            oversized = False
+
+        if len(buffer) > MAX_STREAM_LINE_BYTES:
+            # Drop the partial line; it is reported once its newline arrives
+            buffer = b""
+            oversized = True
+
+    if buffer or oversized:
+        yield line_number + 1, None if oversized else buffer
+
+
+@router.post("/activity/stream", response_model=ActivityStreamResponse)
+async def stream_activity(request: Request, db: DBSession = Depends(get_db)):
+    """
+    Ingest a newline-delimited JSON (NDJSON) activity backfill.
+
+    Each line is one ActivityStreamRecord. Lines are parsed and validated as
+    the body streams in and committed every `activity_stream_chunk_size`
+    rows, so memory stays flat regardless of upload size. Invalid lines are
+    skipped and reported rather than failing the whole upload.
+    """
+    chunk_size = settings.activity_stream_chunk_size
+    ingestor = ActivityIngestor(db)
+
+    pending: list[ActivityStreamRecord] = []
+    chunks: list[ActivityStreamChunk] = []
+    committed_rows = 0
+    rejected = 0
+    rejected_lines: list[int] = []
+
+    def ingest_and_commit() -> int:
+        rows = ingestor.ingest_records(pending)
+        db.commit()
+        return rows
+
+    async def commit_pending():
+        nonlocal committed_rows
+        async with session_registry.locked(record.task_name for record in pending):
+            rows = await run_write_db(ingest_and_commit)
+        committed_rows += rows
+        chunks.append(ActivityStreamChunk(
+            chunk=len(chunks) + 1,
+            rows=rows,
+            committed_rows=committed_rows
+        ))
+        pending.clear()
+
+    async for line_number, line in _iter_ndjson_lines(request.stream()):
+        try:
+            if line is None:
+                raise ValueError("line too long")
+            if not line.strip():
+                continue
+            pending.append(ActivityStreamRecord.model_validate_json(line))
+        except (ValidationError, ValueError):
+            rejected += 1
+            if len(rejected_lines) < MAX_REPORTED_REJECTIONS:
+                rejected_lines.append(line_number)
+            continue
+
+        if len(pending) >= chunk_size:
+            await commit_pending()
+
+    if pending:
+        await commit_pending()
+
+    print(f"📥 Streamed activity: {committed_rows} rows in {len(chunks)} chunks, {rejected} rejected")
+
+    return ActivityStreamResponse(
+        status="logged",
+        count=committed_rows,
+        rejected=rejected,
+        rejected_lines=rejected_lines,
+        chunks=chunks
     )
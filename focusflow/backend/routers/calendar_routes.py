@@ -7,8 +7,9 @@ from sqlalchemy.orm import Session as DBSession
 from datetime import datetime, timedelta
 from fastapi.responses import RedirectResponse, HTMLResponse
 from models import CalendarEventsResponse, CalendarEvent, CreateEventRequest, CreateEventResponse
-from database import get_db
+from database import get_db, get_read_db, run_db, session_category
 from services.calendar_service import CalendarService
+from services.prediction_engine import PredictionEngine
 from config import settings
 
 router = APIRouter()
@@ -18,10 +19,14 @@ router = APIRouter()
 async def get_calendar_events(
     start: str = Query(..., description="Start date (YYYY-MM-DD)"),
     end: str = Query(..., description="End date (YYYY-MM-DD)"),
-    db: DBSession = Depends(get_db)
+    conservativity: float = Query(0.5, ge=0, le=1, description="0=aggressive, 1=conservative"),
+    read_db: DBSession = Depends(get_read_db)
 ):
     """
     Get calendar events for a date range.
+
+    Events whose title matches past sessions carry a predicted duration;
+    all titles are predicted together in one batch.
     """
     service = CalendarService()
     
@@ -30,6 +35,14 @@ async def get_calendar_events(
         return CalendarEventsResponse(events=[])
         
     events = await service.get_events(start, end)
+    # A blank title names no task, so it gets no prediction
+    titles = [event.title for event in events if session_category(event.title)]
+    if titles:
+        predictions = await run_db(PredictionEngine(read_db).predict_many, titles, conservativity)
+        for event in events:
+            prediction = predictions.get(event.title)
+            if prediction is not None and prediction.based_on_sessions > 0:
+                event.predicted_duration = prediction.predicted_minutes
     return CalendarEventsResponse(events=events)
 
 
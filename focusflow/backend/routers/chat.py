@@ -14,7 +14,8 @@ from sqlalchemy.orm import Session as DBSession
 from datetime import datetime
 
 from models import ChatRequest, ChatResponse, ChatContext
-from database import get_db, Activity, Session, Setting
+from database import get_read_db, run_db, Session, Setting
+from services.activity_queries import activity_totals, top_domains
 from services.keywords_ai_service import KeywordsAIService
 from services.chat_tools import CHAT_TOOLS, ChatToolExecutor
 
@@ -34,31 +35,22 @@ def get_context_stats(db: DBSession) -> dict:
     avg_focus = sum(focus_scores) / len(focus_scores) if focus_scores else 0
 
     # Today's activities
-    today_activities = db.query(Activity).filter(
-        Activity.created_at >= today_start
-    ).all()
-
-    total_ms = sum(a.duration_ms for a in today_activities if a.duration_ms)
+    _, total_ms = activity_totals(db, today_start)
     hours_tracked = total_ms / (1000 * 60 * 60)
 
     # Top domains today
-    domain_time = {}
-    for a in today_activities:
-        if a.domain:
-            domain_time[a.domain] = domain_time.get(a.domain, 0) + (a.duration_ms or 0)
-
-    top_domains = sorted(domain_time.items(), key=lambda x: x[1], reverse=True)[:5]
+    domains = top_domains(db, today_start, limit=5)
 
     return {
         "today_sessions": len(today_sessions),
         "avg_focus_score": round(avg_focus, 1),
         "hours_tracked": round(hours_tracked, 2),
-        "top_domains": [(d, round(t / (1000 * 60), 1)) for d, t in top_domains]
+        "top_domains": [(d, round(t / (1000 * 60), 1)) for d, t in domains]
     }
 
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest, db: DBSession = Depends(get_db)):
+async def chat(request: ChatRequest, db: DBSession = Depends(get_read_db)):
     """
     Process a chat message and return AI response.
 
@@ -72,7 +64,7 @@ async def chat(request: ChatRequest, db: DBSession = Depends(get_db)):
     print(f"   Context: task={request.context.current_task}, conservativity={request.context.conservativity}")
 
     # Get real stats for context
-    stats = get_context_stats(db)
+    stats = await run_db(get_context_stats, db)
 
     # Create context
     context = ChatContext(
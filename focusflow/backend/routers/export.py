@@ -0,0 +1,49 @@
+"""
+Export Router - Streams history out as Parquet or Arrow for offline analysis.
+"""
+
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from config import settings
+from database import ReadSessionLocal, run_db
+from services import history_export
+
+router = APIRouter()
+
+
+@router.get("/export")
+async def export_history(
+    format: Literal["parquet", "arrow"] = Query("parquet", description="parquet or arrow (IPC stream)"),
+    table: Literal["activities", "sessions", "predictions"] = Query("activities", description="Table to export"),
+):
+    """
+    Download one table's full history.
+
+    The file is encoded `EXPORT_BATCH_ROWS` rows at a time on the database
+    thread pool and sent as each piece is ready, so memory stays bounded
+    however large the table is. The whole download reads one snapshot.
+    """
+    if not history_export.PYARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Export requires the pyarrow package on the server")
+
+    _, media_type = history_export.EXPORT_FORMATS[format]
+    filename = history_export.export_filename(table, format)
+    return StreamingResponse(
+        _stream(table, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _stream(table: str, fmt: str):
+    # The session outlives the request handler, so it is opened here
+    # rather than injected with Depends
+    db = ReadSessionLocal()
+    try:
+        chunks = history_export.iter_export(db, table, fmt, settings.export_batch_rows)
+        while (chunk := await run_db(next, chunks, None)) is not None:
+            yield chunk
+    finally:
+        await run_db(db.close)
@@ -5,8 +5,9 @@ Predictions Router - Handles task duration predictions.
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session as DBSession
 
-from models import PredictionResponse
-from database import get_db
+from models import PredictionBatchRequest, PredictionBatchResponse, PredictionCacheStats, PredictionResponse
+from database import get_db, get_read_db, run_db, run_write_db
+from services.prediction_cache import prediction_cache
 from services.prediction_engine import PredictionEngine
 
 router = APIRouter()
@@ -16,7 +17,8 @@ router = APIRouter()
 async def get_prediction(
     task_category: str = Query(..., description="Category of task to predict"),
     conservativity: float = Query(0.5, ge=0, le=1, description="0=aggressive, 1=conservative"),
-    db: DBSession = Depends(get_db)
+    db: DBSession = Depends(get_db),
+    read_db: DBSession = Depends(get_read_db)
 ):
     """
     Get duration prediction for a task category.
@@ -27,16 +29,40 @@ async def get_prediction(
     - 1.0 (Conservative): Use 90th percentile - accounts for interruptions
     """
     print(f"🔮 Prediction request: category={task_category}, conservativity={conservativity}")
-
-    engine = PredictionEngine(db)
-    prediction = engine.predict(task_category, conservativity)
+    prediction = await run_db(PredictionEngine(read_db).predict, task_category, conservativity)
 
     # Also record this prediction for accuracy tracking
     if prediction.based_on_sessions > 0:
-        engine.record_prediction(
+        await run_write_db(
+            PredictionEngine(db).record_prediction,
             task_category=task_category,
             predicted_minutes=prediction.predicted_minutes,
             conservativity=conservativity
         )
 
     return prediction
+
+
+@router.post("/predictions/batch", response_model=PredictionBatchResponse)
+async def get_predictions_batch(
+    request: PredictionBatchRequest,
+    read_db: DBSession = Depends(get_read_db)
+):
+    """
+    Get duration predictions for many task categories in one call.
+
+    Every category is predicted exactly like GET /predictions, but with a
+    fixed number of queries however many are requested. Batch predictions
+    are not recorded for accuracy tracking.
+    """
+    predictions = await run_db(
+        PredictionEngine(read_db).predict_many, request.task_categories, request.conservativity
+    )
+    return PredictionBatchResponse(predictions=predictions)
+
+
+@router.get("/predictions/cache", response_model=PredictionCacheStats)
+async def get_prediction_cache_stats():
+    """Hit/miss counters of the prediction cache."""
+    return prediction_cache.stats()
+
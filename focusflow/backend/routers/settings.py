@@ -7,18 +7,22 @@ from sqlalchemy.orm import Session as DBSession
 import json
 
 from models import SettingsResponse, SettingsUpdateRequest, SettingsUpdateResponse
-from database import get_db, Setting
+from database import get_db, get_read_db, run_db, run_write_db, Setting
 
 router = APIRouter()
 
 
 @router.get("/settings", response_model=SettingsResponse)
-async def get_settings(db: DBSession = Depends(get_db)):
+async def get_settings(db: DBSession = Depends(get_read_db)):
     """
     Get current user settings.
 
     TODO: Person B - This works but may need optimization
     """
+    return await run_db(_read_settings, db)
+
+
+def _read_settings(db: DBSession) -> SettingsResponse:
     # Get conservativity setting
     conservativity_setting = db.query(Setting).filter(Setting.key == "conservativity").first()
     conservativity = float(conservativity_setting.value) if conservativity_setting else 0.5
@@ -45,6 +49,11 @@ async def update_settings(
 
     TODO: Person B - This works but may need optimization
     """
+    await run_write_db(_write_settings, db, request)
+    return SettingsUpdateResponse(status="updated")
+
+
+def _write_settings(db: DBSession, request: SettingsUpdateRequest):
     # Update conservativity if provided
     if request.conservativity is not None:
         setting = db.query(Setting).filter(Setting.key == "conservativity").first()
@@ -64,5 +73,3 @@ async def update_settings(
         print(f"⚙️ Updated tracked sites: {request.tracked_sites}")
 
     db.commit()
-
-    return SettingsUpdateResponse(status="updated")
@@ -4,62 +4,49 @@ Stats Router - Handles dashboard statistics.
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session as DBSession
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from models import StatsResponse
-from database import get_db, Activity, Session, Prediction
+from database import get_read_db, run_db
+from services import daily_stats
 
 router = APIRouter()
 
 
 @router.get("/stats", response_model=StatsResponse)
-async def get_stats(db: DBSession = Depends(get_db)):
+async def get_stats(db: DBSession = Depends(get_read_db)):
     """
     Get dashboard statistics.
 
     Returns aggregated stats for the dashboard display.
-    Calculates real stats from the database.
+    Reads the running totals in daily_stats (today's row and the
+    all-time row), so the cost does not grow with history.
     """
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return await run_db(_dashboard_stats, db)
 
-    # Today's focus score (average of all sessions today)
-    today_sessions = db.query(Session).filter(
-        Session.start_time >= today_start
-    ).all()
 
-    if today_sessions:
-        valid_scores = [s.focus_score for s in today_sessions if s.focus_score is not None]
-        today_focus_score = sum(valid_scores) / len(valid_scores) if valid_scores else 0.0
+def _dashboard_stats(db: DBSession) -> StatsResponse:
+    today, all_time = daily_stats.dashboard_rows(db, datetime.utcnow())
+
+    # Today's focus score (average of all sessions started today)
+    if today and today.focus_score_count:
+        today_focus_score = today.focus_score_sum / today.focus_score_count
     else:
         today_focus_score = 0.0
 
     # Hours tracked today
-    today_activities = db.query(Activity).filter(
-        Activity.created_at >= today_start
-    ).all()
-
-    total_ms = sum(a.duration_ms for a in today_activities if a.duration_ms is not None)
-    hours_tracked = total_ms / (1000 * 60 * 60)
+    hours_tracked = (today.duration_ms_sum if today else 0) / (1000 * 60 * 60)
 
     # Prediction accuracy (MAPE-based)
-    completed_predictions = db.query(Prediction).filter(
-        Prediction.actual_minutes.isnot(None)
-    ).all()
-
-    if completed_predictions:
-        errors = []
-        for p in completed_predictions:
-            if p.actual_minutes and p.actual_minutes > 0:
-                error = abs(p.predicted_minutes - p.actual_minutes) / p.actual_minutes
-                errors.append(error)
-        accuracy = (1 - sum(errors) / len(errors)) * 100 if errors else 0.0
+    if all_time and all_time.prediction_error_count:
+        accuracy = (1 - all_time.prediction_error_sum / all_time.prediction_error_count) * 100
         accuracy = max(0.0, min(100.0, accuracy))  # Clamp to 0-100
     else:
         # If no completed predictions, show a reasonable default
         accuracy = 0.0
 
     # Total sessions
-    total_sessions = db.query(Session).count()
+    total_sessions = all_time.session_count if all_time else 0
 
     return StatsResponse(
         today_focus_score=round(today_focus_score, 1),
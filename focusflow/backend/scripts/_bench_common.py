@@ -0,0 +1,89 @@
+"""
+Shared setup, timing and seeding helpers for the benchmark and check scripts.
+
+Importing this puts focusflow/backend on sys.path. Scripts that open the
+database call scratch_database() before importing any backend module,
+because the engines read DATABASE_URL when `database` is first imported.
+"""
+
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+
+def scratch_dir(prefix: str = "focusflow-bench-") -> str:
+    """A new empty temporary directory."""
+    return tempfile.mkdtemp(prefix=prefix)
+
+
+def scratch_database(filename: str, prefix: str = "focusflow-bench-") -> str:
+    """
+    Point DATABASE_URL at `filename` in a new temporary directory.
+
+    Returns:
+        Path of the (not yet created) database file
+    """
+    path = os.path.join(scratch_dir(prefix), filename)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def best_of_ms(fn, repeat: int = 3) -> float:
+    """Fastest of `repeat` calls of fn(), in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def per_call_us(fn, repeat: int) -> float:
+    """Mean microseconds per call over `repeat` back-to-back calls of fn()."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def percentile_ms(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of latencies given in seconds, in milliseconds."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000 if ordered else float("nan")
+
+
+# Task kinds of the synthetic sessions; task names are "Coding 12" and so on
+CATEGORIES = ["coding", "writing", "review", "email", "design", "meeting", "reading", "planning"]
+
+
+def seed_sessions(count: int, tasks: int, rng: random.Random):
+    """
+    Add `count` sessions spread over `tasks` task names and the past year,
+    with log-normal durations around 35 minutes, then rebuild the session
+    categories and duration sketches from every session (schema migration 7).
+    """
+    # Imported on use: scratch_database() has to run before `database` loads
+    from database import Session, engine, session_category
+    from migrations import _session_category
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for offset in range(0, count, 100_000):
+            rows = []
+            for i in range(offset, min(count, offset + 100_000)):
+                task = f"{CATEGORIES[i % len(CATEGORIES)].title()} {rng.randrange(tasks // len(CATEGORIES))}"
+                started = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+                rows.append(dict(
+                    task_name=task, category=session_category(task), start_time=started, end_time=started,
+                    focus_score=70.0, tab_switches=1,
+                    total_duration_ms=int(rng.lognormvariate(math.log(35 * 60_000), 0.8))
+                ))
+            conn.execute(Session.__table__.insert(), rows)
+        _session_category(conn)
@@ -0,0 +1,70 @@
+"""
+Benchmark: decode + validate cost and bytes on the wire for activity
+uploads, JSON (ActivityRequest) vs the columnar binary format.
+
+Run from focusflow/backend:
+    python scripts/bench_activity_decode.py [--repeat 200]
+"""
+
+import argparse
+import json
+import time
+
+from _bench_common import per_call_us
+
+from models import ActivityItem, ActivityRequest
+from services.activity_ingestor import ActivityBatch
+from services.activity_codec import encode_activity_columnar, decode_activity_columnar
+
+
+BATCH_SIZES = (10, 100, 1000)
+
+
+def make_request(batch_size: int) -> ActivityRequest:
+    """A realistic upload: a few dozen sites, titles repeated across visits."""
+    base_ms = int(time.time() * 1000)
+    return ActivityRequest(
+        task_name="Feature development",
+        activities=[
+            ActivityItem(
+                url=f"https://site{i % 30}.example.com/projects/focusflow/page/{i % 120}",
+                domain=f"site{i % 30}.example.com",
+                title=f"FocusFlow project page {i % 120} - Example Site",
+                duration_ms=1000 + i,
+                start_time=base_ms + i * 1000,
+                end_time=base_ms + i * 1000 + 900,
+            )
+            for i in range(batch_size)
+        ],
+        tab_switches=12,
+        focus_score=80.0,
+    )
+
+
+def decode_json(body: bytes) -> ActivityBatch:
+    """The JSON path taken by parse_activity_request."""
+    return ActivityBatch.from_request(ActivityRequest.model_validate_json(body))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="Decodes per measurement")
+    args = parser.parse_args()
+
+    print(f"{'batch':>6} {'json B':>9} {'binary B':>9} {'json µs':>9} {'binary µs':>10} {'speedup':>8}")
+    for batch_size in BATCH_SIZES:
+        request = make_request(batch_size)
+        json_body = json.dumps(request.model_dump()).encode("utf-8")
+        binary_body = encode_activity_columnar(request)
+
+        json_us = per_call_us(lambda: decode_json(json_body), args.repeat)
+        binary_us = per_call_us(lambda: decode_activity_columnar(binary_body), args.repeat)
+
+        print(
+            f"{batch_size:>6} {len(json_body):>9,} {len(binary_body):>9,} "
+            f"{json_us:>9,.0f} {binary_us:>10,.0f} {json_us / binary_us:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: ORM per-object inserts vs the Core executemany path used by
+ActivityIngestor for POST /api/activity batches.
+
+Run from focusflow/backend:
+    python scripts/bench_activity_insert.py [--repeat 20]
+"""
+
+import argparse
+import time
+
+# Point the app at a throwaway database before config is imported
+from _bench_common import scratch_database
+
+scratch_database("bench.db")
+
+from database import SessionLocal, init_db, Activity
+from models import ActivityItem, ActivityRequest
+from services.activity_ingestor import ActivityBatch, ActivityIngestor
+
+
+BATCH_SIZES = (10, 100, 1000)
+
+
+_next_start_ms = int(time.time() * 1000)
+
+
+def make_batch(batch_size: int, task_name: str = "bench") -> ActivityBatch:
+    """Build a synthetic extension upload with `batch_size` unique tab records."""
+    global _next_start_ms
+    base_ms = _next_start_ms
+    _next_start_ms += batch_size * 1000
+    return ActivityBatch.from_request(ActivityRequest(
+        task_name=task_name,
+        activities=[
+            ActivityItem(
+                url=f"https://example{i % 50}.com/page/{i}",
+                domain=f"example{i % 50}.com",
+                title=f"Example page {i}",
+                duration_ms=1000 + i,
+                start_time=base_ms + i * 1000,
+                end_time=base_ms + i * 1000 + 900,
+            )
+            for i in range(batch_size)
+        ],
+        tab_switches=3,
+        focus_score=80.0,
+    ))
+
+
+class OrmIngestor(ActivityIngestor):
+    """The original log_activity insert loop: one ORM object per item."""
+
+    def _insert_rows(self, table, rows: list[dict]):
+        activities = [Activity(**row) for row in rows]
+        self.db.add_all(activities)
+        self.db.flush()
+        return activities
+
+
+def run(ingestor_cls, batch_size: int, repeat: int) -> float:
+    """Ingest + commit `repeat` fresh uploads; returns rows/sec."""
+    batches = [make_batch(batch_size) for _ in range(repeat)]
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for batch in batches:
+            ingestor_cls(db).ingest(batch)
+            db.commit()
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    return batch_size * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Uploads per measurement")
+    args = parser.parse_args()
+
+    init_db()
+
+    print(f"{'batch':>6} {'orm rows/s':>12} {'core rows/s':>12} {'speedup':>8}")
+    for batch_size in BATCH_SIZES:
+        orm_rate = run(OrmIngestor, batch_size, args.repeat)
+        core_rate = run(ActivityIngestor, batch_size, args.repeat)
+        print(f"{batch_size:>6} {orm_rate:>12,.0f} {core_rate:>12,.0f} {core_rate / orm_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: "today" / "this week" / all-time activity aggregates on one
+unpartitioned activities table vs monthly partitions.
+
+The same synthetic history is queried both ways: first in the original
+single table, then again after startup's adoption step has moved it into
+monthly partitions.
+
+Run from focusflow/backend:
+    python scripts/bench_activity_partitions.py [--rows 3000000] [--years 3]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from _bench_common import best_of_ms, scratch_database
+
+_db_path = scratch_database("partitions.db")
+_tmpdir = os.path.dirname(_db_path)
+
+from database import SessionLocal, init_db
+from services.activity_partitions import activity_partitions
+from services.activity_queries import activity_totals, top_domains
+
+
+SINGLE_TABLE_TOTALS = """
+SELECT COUNT(*), COALESCE(SUM(duration_ms), 0) FROM activities WHERE created_at >= ?
+"""
+
+SINGLE_TABLE_TOP_DOMAINS = """
+SELECT domains.value, totals.total_ms FROM domains JOIN (
+    SELECT domain_id, SUM(duration_ms) AS total_ms FROM activities
+    WHERE created_at >= ? AND domain_id IS NOT NULL
+    GROUP BY domain_id ORDER BY total_ms DESC LIMIT 5
+) AS totals ON domains.id = totals.domain_id ORDER BY totals.total_ms DESC
+"""
+
+DOMAINS = 500
+
+
+def build_history(rows: int, years: int, seed: int = 11):
+    """Fill the unpartitioned activities table with evenly spread history."""
+    init_db()
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    span = years * 365 * 86400
+    conn = sqlite3.connect(_db_path)
+    conn.executemany("INSERT INTO domains (id, value) VALUES (?, ?)",
+                     ((d + 1, f"site{d}.example.com") for d in range(DOMAINS)))
+    conn.executemany(
+        "INSERT INTO activities (task_name, domain_id, duration_ms, start_time, end_time, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (f"Task {i % 100}", rng.randrange(DOMAINS) + 1, rng.randint(1_000, 600_000), created, created, created)
+            for i in range(rows)
+            for created in [(now - timedelta(seconds=rng.random() * span)).strftime("%Y-%m-%d %H:%M:%S.%f")]
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=3_000_000, help="Synthetic activity rows")
+    parser.add_argument("--years", type=int, default=3, help="Years of history to spread them over")
+    args = parser.parse_args()
+
+    print(f"Building {args.rows:,} rows over {args.years} years in {_tmpdir} ...")
+    build_history(args.rows, args.years)
+
+    now = datetime.utcnow()
+    windows = (
+        ("today", now.replace(hour=0, minute=0, second=0, microsecond=0)),
+        ("7 days", now - timedelta(days=7)),
+        ("all", datetime.min),
+    )
+
+    single = sqlite3.connect(_db_path)
+    single_results = {}
+    for label, since in windows:
+        param = (since.strftime("%Y-%m-%d %H:%M:%S.%f"),)
+        single_results[label] = (
+            best_of_ms(lambda: single.execute(SINGLE_TABLE_TOTALS, param).fetchall(), repeat=5),
+            best_of_ms(lambda: single.execute(SINGLE_TABLE_TOP_DOMAINS, param).fetchall(), repeat=5),
+        )
+    single.close()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    activity_partitions.adopt_unpartitioned(db)
+    db.commit()
+    print(f"Adoption into {len(activity_partitions.catalog(db))} partitions took {time.perf_counter() - started:.1f}s")
+
+    print(f"{'window':<8} {'totals single':>14} {'totals parts':>13} {'top single':>11} {'top parts':>10}   (ms)")
+    for label, since in windows:
+        totals_ms = best_of_ms(lambda: activity_totals(db, since), repeat=5)
+        top_ms = best_of_ms(lambda: top_domains(db, since), repeat=5)
+        single_totals, single_top = single_results[label]
+        print(f"{label:<8} {single_totals:>14,.1f} {totals_ms:>13,.1f} {single_top:>11,.1f} {top_ms:>10,.1f}")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: per-request overhead of GET /api/calendar before the Google API call.
+
+Each request builds a CalendarService, gets the Calendar API client's
+events collection and prepares the list request that get_events executes. Measured
+with the old path (token.json re-read and build() on every request, which
+parses the calendar v3 discovery document) and with the cached
+credentials, discovery document and service. The network round trip to
+Google is not included, so the figures are pure local overhead.
+
+Run from focusflow/backend:
+    python scripts/bench_calendar_service.py [--requests 200]
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from _bench_common import scratch_dir
+
+# CalendarService reads token.json from the working directory
+os.chdir(scratch_dir())
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from services import calendar_service
+from services.calendar_service import SCOPES, CalendarService
+
+
+def write_token():
+    """An authorized-user token that stays valid for the run (never sent anywhere)."""
+    with open("token.json", "w") as f:
+        json.dump({
+            "token": "bench-access-token",
+            "refresh_token": "bench-refresh-token",
+            "client_id": "bench.apps.googleusercontent.com",
+            "client_secret": "bench-secret",
+            "scopes": SCOPES,
+            "expiry": (datetime.utcnow() + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        }, f)
+
+
+def list_request(events_api):
+    return events_api.list(
+        calendarId="primary", timeMin="2026-01-01T00:00:00Z", timeMax="2026-01-07T23:59:59Z",
+        singleEvents=True, orderBy="startTime"
+    )
+
+
+def uncached():
+    credentials = Credentials.from_authorized_user_file("token.json", SCOPES)
+    return list_request(build("calendar", "v3", credentials=credentials).events())
+
+
+def cached():
+    return list_request(CalendarService()._get_events())
+
+
+def per_request_ms(fn, requests: int) -> float:
+    fn()  # First request pays for imports and the one-time loads
+    started = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    return (time.perf_counter() - started) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests timed per path")
+    args = parser.parse_args()
+
+    write_token()
+    before = per_request_ms(uncached, args.requests)
+    after = per_request_ms(cached, args.requests)
+    assert cached().uri == uncached().uri
+
+    # Rewriting token.json (OAuth callback, refresh elsewhere) must rebuild
+    service = CalendarService()._get_service()
+    time.sleep(0.01)
+    write_token()
+    assert CalendarService()._get_service() is not service
+    assert CalendarService()._get_service() is CalendarService()._get_service()
+    assert calendar_service._discovery_document is not None
+
+    print(f"{'path':<40} {'ms/request':>11}")
+    print(f"{'re-read token.json + build()':<40} {before:>11.3f}")
+    print(f"{'cached credentials + service':<40} {after:>11.3f}")
+    print(f"speedup: {before / after:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: category predictions from exact percentiles vs duration sketches.
+
+Loads synthetic sessions (log-normal durations over many task names) in
+growing steps. At each size, for a set of categories, it compares the old
+path (load every matching session, sort, take median and p90) with
+PredictionEngine.predict on the per-category sketches, which are found
+through the trigram index. It reports timings and the largest relative
+error of the median, p90 and min/max against the exact values, and fails
+if any exceeds duration_sketch.RELATIVE_ACCURACY.
+
+It also replays uploads through ActivityIngestor, which opens and extends
+sessions, and checks that the incrementally maintained sketches match a
+rebuild from `sessions` (schema migration 7).
+
+Run from focusflow/backend:
+    python scripts/bench_duration_sketch.py [--sessions 100000 1000000] [--tasks 400]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from _bench_common import CATEGORIES, best_of_ms, scratch_database, seed_sessions
+
+scratch_database("sketch.db")
+
+from sqlalchemy import select
+from database import DurationSketch, DurationSketchBucket, Session, SessionLocal, engine, init_db
+from migrations import _session_category
+from services import duration_sketch
+from services.activity_ingestor import ActivityBatch, ActivityIngestor
+from services.prediction_engine import PredictionEngine
+
+
+def exact_stats(db, category: str) -> dict:
+    """The pre-sketch computation: every matching session, sorted in Python."""
+    durations = sorted(
+        d / 60_000 for (d,) in db.execute(
+            select(Session.total_duration_ms).where(
+                Session.task_name.ilike(f"%{category}%"), Session.total_duration_ms > 0
+            )
+        )
+    )
+    return {
+        "median": statistics.median(durations),
+        "p90": durations[min(int(len(durations) * 0.9), len(durations) - 1)],
+        "min": durations[0],
+        "max": durations[-1],
+    }
+
+
+def sketch_stats(db, category: str) -> dict:
+    summary = duration_sketch.summarize(db, category)
+    return {
+        "median": summary.median_ms() / 60_000,
+        "p90": summary.percentile_ms(0.9) / 60_000,
+        "min": summary.min_ms() / 60_000,
+        "max": summary.max_ms() / 60_000,
+    }
+
+
+def check_incremental(rng: random.Random) -> bool:
+    """Ingest uploads, then compare the live sketches with a rebuild."""
+    db = SessionLocal()
+    ingestor = ActivityIngestor(db)
+    start_ms = int(time.time() * 1000)
+    for i in range(300):
+        ingestor.ingest(ActivityBatch(
+            task_name=f"ingested {i % 12}", tab_switches=1, focus_score=60.0,
+            activities=[(f"https://example.com/{i}/{j}", "example.com", "Page", rng.randrange(1, 600_000),
+                         start_ms + (i * 10 + j) * 1000, start_ms + (i * 10 + j) * 1000 + 500) for j in range(5)],
+        ))
+        db.commit()
+    db.close()
+
+    def snapshot():
+        with engine.connect() as conn:
+            totals = conn.execute(select(DurationSketch.__table__).order_by(DurationSketch.category)).all()
+            buckets = conn.execute(
+                select(DurationSketchBucket.__table__).where(DurationSketchBucket.count != 0)
+                .order_by(DurationSketchBucket.category, DurationSketchBucket.bucket)
+            ).all()
+        return [tuple(row) for row in totals], [tuple(row) for row in buckets]
+
+    live = snapshot()
+    with engine.begin() as conn:
+        _session_category(conn)
+    return live == snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="Total sessions at each measured step")
+    parser.add_argument("--tasks", type=int, default=400, help="Distinct task names")
+    args = parser.parse_args()
+
+    init_db()
+    rng = random.Random(20)
+    bound = duration_sketch.RELATIVE_ACCURACY
+    queries = CATEGORIES + ["Coding 1", "e"]
+    failed = False
+    loaded = 0
+
+    print(f"tasks={args.tasks:,} queries={len(queries)} (ms per prediction, best of 5)")
+    print(f"{'sessions':>10} {'exact':>9} {'sketch':>8} {'median err':>11} {'p90 err':>8} {'min err':>8} {'max err':>8}")
+    for total in sorted(args.sessions):
+        seed_sessions(total - loaded, args.tasks, rng)
+        loaded = total
+
+        db = SessionLocal()
+        engine_ = PredictionEngine(db)
+        worst = {"median": 0.0, "p90": 0.0, "min": 0.0, "max": 0.0}
+        exact_ms = sketch_ms = 0.0
+        for category in queries:
+            exact = exact_stats(db, category)
+            estimate = sketch_stats(db, category)
+            for key in worst:
+                worst[key] = max(worst[key], abs(estimate[key] - exact[key]) / exact[key])
+            exact_ms += best_of_ms(lambda: exact_stats(db, category), repeat=2)
+            sketch_ms += best_of_ms(lambda: engine_._predict(category, 0.5), repeat=5)  # uncached
+        db.close()
+
+        failed |= max(worst.values()) > bound
+        print(f"{total:>10,} {exact_ms / len(queries):>9.1f} {sketch_ms / len(queries):>8.2f} "
+              + " ".join(f"{worst[key]:>{width}.3%}" for key, width in
+                         (("median", 11), ("p90", 8), ("min", 8), ("max", 8))))
+    print(f"error bound: {bound:.0%}")
+
+    incremental_ok = check_incremental(rng)
+    print(f"incremental sketches match rebuild: {incremental_ok}")
+    if failed or not incremental_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
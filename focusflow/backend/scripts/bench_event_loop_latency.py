@@ -0,0 +1,120 @@
+"""
+Benchmark: POST /api/activity latency while slow GET /api/predictions calls run.
+
+Seeds enough matching sessions that a category prediction takes a
+while, then measures upload latency through the ASGI app three ways:
+uploads alone, uploads with concurrent prediction calls (queries on the
+run_db thread pool), and uploads with prediction queries run inline on
+the event loop, as the routes did before run_db.
+
+Run from focusflow/backend:
+    python scripts/bench_event_loop_latency.py [--uploads 200] [--sessions 50000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import time
+
+from _bench_common import percentile_ms, scratch_database
+
+_db_path = scratch_database("latency.db")
+# Every call should run the prediction queries, not hit the cache
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+
+import httpx
+import routers.predictions
+from database import init_db, run_db
+from main import app
+
+
+def seed(sessions: int, seed: int = 9):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(_db_path)
+    conn.executemany(
+        "INSERT INTO sessions (task_name, start_time, end_time, focus_score, tab_switches, total_duration_ms) "
+        "VALUES (?, '2026-01-01 09:00:00.000000', '2026-01-01 10:00:00.000000', 70.0, 3, ?)",
+        ((f"coding ticket {i}", rng.randrange(60_000, 7_200_000)) for i in range(sessions))
+    )
+    conn.commit()
+    conn.close()
+
+
+def upload(i: int) -> dict:
+    start = 1_760_000_000_000 + i * 60_000
+    return {
+        "task_name": f"Task {i % 8}", "tab_switches": 1, "focus_score": 80.0,
+        "activities": [
+            {"url": f"https://site{j}.example.com/{i}", "domain": f"site{j}.example.com", "title": f"Page {j}",
+             "duration_ms": 5_000, "start_time": start + j * 5_000, "end_time": start + (j + 1) * 5_000}
+            for j in range(10)
+        ],
+    }
+
+
+async def measure(uploads: int, concurrency: int, slow_callers: int) -> tuple[list[float], list[float]]:
+    """Upload latencies (and prediction latencies) with `slow_callers` looping /api/predictions."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        done = asyncio.Event()
+        upload_latencies: list[float] = []
+        slow_latencies: list[float] = []
+        next_upload = iter(range(uploads))
+        # Warm-up: first upload creates the partition and loads the session registry
+        (await client.post("/api/activity", json=upload(-1))).raise_for_status()
+
+        async def call_predictions():
+            while not done.is_set():
+                started = time.perf_counter()
+                (await client.get("/api/predictions", params={"task_category": "coding"})).raise_for_status()
+                slow_latencies.append(time.perf_counter() - started)
+
+        async def call_activity():
+            for i in next_upload:
+                started = time.perf_counter()
+                (await client.post("/api/activity", json=upload(i))).raise_for_status()
+                upload_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)  # The extension uploads periodically, not back to back
+
+        slow_tasks = [asyncio.create_task(call_predictions()) for _ in range(slow_callers)]
+        await asyncio.sleep(0.05 if slow_callers else 0)
+        await asyncio.gather(*(call_activity() for _ in range(concurrency)))
+        done.set()
+        await asyncio.gather(*slow_tasks)
+    return upload_latencies, slow_latencies
+
+
+async def run_inline(fn, *args, **kwargs):
+    """Stand-in for run_db that blocks the event loop like the old routes."""
+    return fn(*args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=200, help="Uploads per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent upload clients")
+    parser.add_argument("--slow-callers", type=int, default=2, help="Clients looping /api/predictions")
+    parser.add_argument("--sessions", type=int, default=50_000, help="Matching sessions seeded")
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.sessions)
+
+    scenarios = [
+        ("uploads only", 0, run_db),
+        ("+ slow, thread pool", args.slow_callers, run_db),
+        ("+ slow, on event loop", args.slow_callers, run_inline),
+    ]
+    print(f"{'scenario':<24} {'upload p50 ms':>14} {'upload p99 ms':>14} {'predict p50 ms':>15} {'predict calls':>14}")
+    for label, slow_callers, slow_runner in scenarios:
+        routers.predictions.run_db = slow_runner
+        uploads, slow = asyncio.run(measure(args.uploads, args.concurrency, slow_callers))
+        print(f"{label:<24} {percentile_ms(uploads, 0.5):>14,.1f} {percentile_ms(uploads, 0.99):>14,.1f} "
+              f"{percentile_ms(slow, 0.5):>15,.1f} {len(slow):>14}")
+    routers.predictions.run_db = run_db
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark: peak memory of the streaming history export vs materializing the table.
+
+Synthetic activity history is spread over monthly partitions and exported
+twice per size: with services/history_export.py (yield_per batches, one
+row group each, bytes handed out as produced) and by fetching every row
+and building one Arrow table first. Peak memory is Python allocations
+(tracemalloc) plus Arrow's memory pool. Each streamed file is read back
+to check its row count.
+
+Run from focusflow/backend:
+    python scripts/bench_history_export.py [--rows 250000 1000000] [--format parquet]
+"""
+
+import argparse
+import io
+import os
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from _bench_common import scratch_database
+
+_db_path = scratch_database("export.db")
+_tmpdir = os.path.dirname(_db_path)
+
+from database import ReadSessionLocal, SessionLocal, init_db
+from services import history_export
+from services.activity_partitions import activity_partitions
+
+DOMAINS = 500
+
+
+def build_history(first_id: int, rows: int, urls: int, rng: random.Random):
+    """Add `rows` activities over the last year and move them into partitions."""
+    now = datetime.utcnow()
+    conn = sqlite3.connect(_db_path)
+    conn.executemany(
+        "INSERT INTO activities (id, task_name, url_id, domain_id, duration_ms, start_time, end_time, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (first_id + i, f"Task {i % 100}", rng.randrange(urls) + 1, rng.randrange(DOMAINS) + 1,
+             rng.randint(1_000, 600_000), created, created, created)
+            for i in range(rows)
+            for created in [(now - timedelta(seconds=rng.random() * 365 * 86400)).strftime("%Y-%m-%d %H:%M:%S.%f")]
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+    db = SessionLocal()
+    activity_partitions.adopt_unpartitioned(db)
+    db.commit()
+    db.close()
+
+
+def build_strings(urls: int):
+    init_db()
+    conn = sqlite3.connect(_db_path)
+    conn.executemany("INSERT INTO domains (id, value) VALUES (?, ?)",
+                     ((d + 1, f"site{d}.example.com") for d in range(DOMAINS)))
+    conn.executemany("INSERT INTO urls (id, value) VALUES (?, ?)",
+                     ((u + 1, f"https://site{u % DOMAINS}.example.com/page/{u}") for u in range(urls)))
+    conn.commit()
+    conn.close()
+
+
+def measure(fn) -> tuple[float, float, object]:
+    """(seconds, peak MB, result) of fn()."""
+    pool = history_export._pyarrow().default_memory_pool()
+    pool.release_unused()
+    arrow_base = pool.max_memory()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, (python_peak + pool.max_memory() - arrow_base) / 1e6, result
+
+
+def streamed(fmt: str, batch_rows: int) -> tuple[int, int]:
+    """Export to a file; returns (bytes written, rows read back)."""
+    path = os.path.join(_tmpdir, f"export.{fmt}")
+    db = ReadSessionLocal()
+    with open(path, "wb") as f:
+        for chunk in history_export.iter_export(db, "activities", fmt, batch_rows):
+            f.write(chunk)
+    db.close()
+    pa = history_export._pyarrow()
+    if fmt == "parquet":
+        rows = pa.parquet.ParquetFile(path).metadata.num_rows
+    else:
+        with pa.memory_map(path) as source:
+            rows = sum(batch.num_rows for batch in pa.ipc.open_stream(source))
+    return os.path.getsize(path), rows
+
+
+def materialized(fmt: str) -> int:
+    """Fetch every row, build one table, encode it; returns bytes written."""
+    pa = history_export._pyarrow()
+    schema = history_export._schema("activities")
+    db = ReadSessionLocal()
+    rows = [row for query in history_export._queries(db, "activities") for row in db.execute(query).all()]
+    db.close()
+    table = pa.Table.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)], schema=schema
+    )
+    out = io.BytesIO()
+    if fmt == "parquet":
+        pa.parquet.write_table(table, out, compression="zstd")
+    else:
+        with pa.ipc.new_stream(out, schema) as writer:
+            writer.write_table(table)
+    return out.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[250_000, 1_000_000], help="History sizes to export")
+    parser.add_argument("--format", choices=tuple(history_export.EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--batch-rows", type=int, default=65_536, help="Rows per row group / record batch")
+    args = parser.parse_args()
+
+    if not history_export.PYARROW_AVAILABLE:
+        print("❌ This benchmark needs pyarrow: pip install pyarrow")
+        sys.exit(1)
+
+    print(f"format={args.format} batch_rows={args.batch_rows:,}")
+    print(f"{'rows':>10} {'method':<13} {'seconds':>8} {'peak MB':>8} {'file MB':>8}")
+    sizes = sorted(args.rows)
+    urls = max(sizes) // 10
+    rng = random.Random(5)
+    build_strings(urls)
+    loaded = 0
+    for rows in sizes:
+        # Sizes grow cumulatively: each round adds the difference. Ids are
+        # explicit because adoption empties the table, which reuses rowids
+        build_history(loaded + 1, rows - loaded, urls, rng)
+        loaded = rows
+        seconds, peak, (size, read_back) = measure(lambda: streamed(args.format, args.batch_rows))
+        assert read_back == rows, f"exported {read_back:,} rows, expected {rows:,}"
+        print(f"{rows:>10,} {'streamed':<13} {seconds:>8.2f} {peak:>8.1f} {size / 1e6:>8.1f}")
+        seconds, peak, size = measure(lambda: materialized(args.format))
+        print(f"{rows:>10,} {'materialized':<13} {seconds:>8.2f} {peak:>8.1f} {size / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark: database size and top_domains query time for the old
+denormalized activities table (url/domain/title strings on every row)
+vs the normalized layout (integer keys into domains/urls/titles).
+
+Run from focusflow/backend:
+    python scripts/bench_normalized_storage.py [--rows 5000000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+from _bench_common import best_of_ms, scratch_database
+
+_db_path = scratch_database("normalized.db")
+_tmpdir = os.path.dirname(_db_path)
+
+from database import SessionLocal, engine, Base
+from services.activity_partitions import activity_partitions
+from services.activity_queries import top_domains
+
+
+DENORMALIZED_DDL = """
+CREATE TABLE activities (
+    id INTEGER PRIMARY KEY,
+    task_name VARCHAR,
+    url VARCHAR,
+    domain VARCHAR,
+    title VARCHAR,
+    duration_ms INTEGER,
+    start_time DATETIME,
+    end_time DATETIME,
+    created_at DATETIME
+);
+CREATE INDEX ix_activities_task_name ON activities (task_name);
+CREATE INDEX ix_activities_domain ON activities (domain);
+"""
+
+DENORMALIZED_TOP_DOMAINS = """
+SELECT domain, SUM(duration_ms) AS total_ms FROM activities
+WHERE created_at >= ? AND domain IS NOT NULL
+GROUP BY domain ORDER BY total_ms DESC LIMIT 5
+"""
+
+DOMAINS = 2_000
+URLS = 200_000
+TITLES = 100_000
+HISTORY_DAYS = 365
+
+
+def synthetic_rows(count: int, seed: int = 7):
+    """Yield (task, url_n, domain_n, title_n, duration_ms, created_at) tuples."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    tasks = [f"Task {i}" for i in range(200)]
+    for i in range(count):
+        url_n = int(rng.paretovariate(1.2)) % URLS
+        created = now - timedelta(seconds=rng.random() * HISTORY_DAYS * 86400)
+        yield (
+            tasks[i % len(tasks)],
+            url_n,
+            url_n % DOMAINS,
+            url_n % TITLES,
+            rng.randint(1_000, 600_000),
+            created.strftime("%Y-%m-%d %H:%M:%S.%f"),
+        )
+
+
+def build_denormalized(path: str, rows: int):
+    conn = sqlite3.connect(path)
+    conn.executescript(DENORMALIZED_DDL)
+    conn.executemany(
+        "INSERT INTO activities (task_name, url, domain, title, duration_ms, start_time, end_time, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (task, f"https://www.site{d}.example.com/articles/{u}/read?ref=focusflow",
+             f"www.site{d}.example.com", f"Article number {t} - Site {d} | Example Publishing",
+             ms, created, created, created)
+            for task, u, d, t, ms, created in synthetic_rows(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def build_normalized(path: str, rows: int):
+    Base.metadata.create_all(bind=engine)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO domains (id, value) VALUES (?, ?)",
+                     ((d + 1, f"www.site{d}.example.com") for d in range(DOMAINS)))
+    conn.executemany("INSERT INTO urls (id, value) VALUES (?, ?)",
+                     ((u + 1, f"https://www.site{u % DOMAINS}.example.com/articles/{u}/read?ref=focusflow")
+                      for u in range(URLS)))
+    conn.executemany("INSERT INTO titles (id, value) VALUES (?, ?)",
+                     ((t + 1, f"Article number {t} - Site {t % DOMAINS} | Example Publishing")
+                      for t in range(TITLES)))
+    conn.executemany(
+        "INSERT INTO activities (task_name, url_id, domain_id, title_id, duration_ms, start_time, end_time, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ((task, u + 1, d + 1, t + 1, ms, created, created, created)
+         for task, u, d, t, ms, created in synthetic_rows(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+    # Route the rows into monthly partitions as startup would, then reclaim
+    # the space they left behind so the file size stays comparable
+    db = SessionLocal()
+    activity_partitions.adopt_unpartitioned(db)
+    db.commit()
+    db.close()
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000, help="Synthetic activity rows")
+    args = parser.parse_args()
+
+    denormalized_path = os.path.join(_tmpdir, "denormalized.db")
+    normalized_path = os.path.join(_tmpdir, "normalized.db")
+
+    print(f"Building {args.rows:,} rows of synthetic history in {_tmpdir} ...")
+    build_denormalized(denormalized_path, args.rows)
+    build_normalized(normalized_path, args.rows)
+
+    since_week = datetime.utcnow() - timedelta(days=7)
+    since_all = datetime.min
+    denormalized = sqlite3.connect(denormalized_path)
+    db = SessionLocal()
+
+    print(f"{'layout':<14} {'size MB':>9} {'top_domains 7d ms':>18} {'top_domains all ms':>19}")
+    for label, path, query in (
+        ("denormalized", denormalized_path,
+         lambda since: denormalized.execute(DENORMALIZED_TOP_DOMAINS, (since.strftime("%Y-%m-%d %H:%M:%S.%f"),)).fetchall()),
+        ("normalized", normalized_path, lambda since: top_domains(db, since)),
+    ):
+        size_mb = os.path.getsize(path) / 1e6
+        week_ms = best_of_ms(lambda: query(since_week))
+        all_ms = best_of_ms(lambda: query(since_all))
+        print(f"{label:<14} {size_mb:>9,.0f} {week_ms:>18,.0f} {all_ms:>19,.0f}")
+
+    db.close()
+    denormalized.close()
+
+
+if __name__ == "__main__":
+    main()
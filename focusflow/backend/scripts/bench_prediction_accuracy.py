@@ -0,0 +1,114 @@
+"""
+Benchmark: prediction accuracy from running totals vs full MAPE recomputation.
+
+Loads synthetic predictions in growing steps (backfilling the totals the
+way schema migrations 5 and 8 do). At each size it times
+PredictionEngine.get_accuracy overall, per category and over the last 7
+days against the previous approach, which loads every completed
+prediction and recomputes MAPE in Python. It then records and revises
+actual durations through update_actual_duration and checks that every
+accuracy still matches a recomputation.
+
+Run from focusflow/backend:
+    python scripts/bench_prediction_accuracy.py [--predictions 10000 1000000]
+"""
+
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+
+from _bench_common import best_of_ms, scratch_database
+
+scratch_database("accuracy.db")
+
+from database import Prediction, SessionLocal, engine, init_db
+from migrations import _daily_stats, _prediction_accuracy
+from services.prediction_engine import PredictionEngine
+
+CATEGORIES = ["coding", "writing", "review", "email", "design", "meeting"]
+
+
+def seed_predictions(start: int, stop: int, rng: random.Random):
+    now = datetime.utcnow()
+    rows = [
+        dict(
+            id=i + 1, task_category=rng.choice(CATEGORIES), predicted_minutes=rng.randrange(10, 120),
+            actual_minutes=rng.randrange(5, 150) if rng.random() < 0.6 else None, conservativity=0.5,
+            created_at=now - timedelta(minutes=rng.randrange(180 * 24 * 60))
+        )
+        for i in range(start, stop)
+    ]
+    with engine.begin() as conn:
+        conn.execute(Prediction.__table__.insert(), rows)
+        _daily_stats(conn)
+        _prediction_accuracy(conn)
+
+
+def recomputed_accuracy(db, task_category=None, days=None) -> float:
+    """The previous get_accuracy: every completed prediction, MAPE in Python."""
+    query = db.query(Prediction).filter(Prediction.actual_minutes.isnot(None), Prediction.actual_minutes > 0)
+    if task_category:
+        query = query.filter(Prediction.task_category == task_category)
+    if days is not None:
+        cutoff = (datetime.utcnow() - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        query = query.filter(Prediction.created_at >= cutoff)
+    errors = [abs(p.predicted_minutes - p.actual_minutes) / p.actual_minutes for p in query.all()]
+    if not errors:
+        return 0.0
+    return round(max(0, (1 - sum(errors) / len(errors)) * 100), 1)
+
+
+QUERIES = [(None, None), ("coding", None), ("coding", 7)]
+
+
+def matches(db) -> bool:
+    engine_ = PredictionEngine(db)
+    return all(
+        abs(engine_.get_accuracy(category, days) - recomputed_accuracy(db, category, days)) <= 0.1
+        for category in CATEGORIES + [None] for days in (None, 1, 7, 30)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--predictions", type=int, nargs="+", default=[10_000, 1_000_000],
+                        help="Total predictions at each measured step")
+    args = parser.parse_args()
+
+    init_db()
+    rng = random.Random(25)
+    loaded = 0
+    ok = True
+    labels = [f"{category or 'all'}/{days or 'all'} days" for category, days in QUERIES]
+    print(f"{'predictions':>12} " + " ".join(f"{label + ' old ms':>22} {'new ms':>7}" for label in labels))
+    for total in sorted(args.predictions):
+        seed_predictions(loaded, total, rng)
+        loaded = total
+
+        db = SessionLocal()
+        engine_ = PredictionEngine(db)
+        cells = []
+        for category, days in QUERIES:
+            old_ms = best_of_ms(lambda: recomputed_accuracy(db, category, days))
+            new_ms = best_of_ms(lambda: engine_.get_accuracy(category, days))
+            cells.append(f"{old_ms:>22,.1f} {new_ms:>7.2f}")
+        ok &= matches(db)
+        db.close()
+        print(f"{total:>12,} " + " ".join(cells))
+
+    # Record and revise actual durations through the engine
+    db = SessionLocal()
+    engine_ = PredictionEngine(db)
+    for _ in range(500):
+        engine_.update_actual_duration(rng.randrange(1, loaded + 1), rng.choice([0, rng.randrange(5, 150)]))
+    incremental_ok = matches(db)
+    db.close()
+
+    print(f"running totals match recomputation: {ok and incremental_ok}")
+    if not (ok and incremental_ok):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
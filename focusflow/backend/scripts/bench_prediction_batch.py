@@ -0,0 +1,94 @@
+"""
+Benchmark: predictions for N calendar events, one by one vs in one batch.
+
+Seeds sessions over many task names, then predicts durations for N
+event titles (categories, exact task names and titles with no history)
+with PredictionEngine._predict per title and with _predict_many, both
+uncached. It reports the time and SQL statements per batch, and fails if
+any batched prediction differs from the per-title one.
+
+Run from focusflow/backend:
+    python scripts/bench_prediction_batch.py [--sessions 200000] [--events 10 50 200]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from _bench_common import CATEGORIES, scratch_database, seed_sessions
+
+scratch_database("batch.db")
+
+from sqlalchemy import event
+from database import ReadSessionLocal, init_db, read_engine
+from services.prediction_engine import PredictionEngine
+
+
+def event_titles(count: int, tasks: int, rng: random.Random) -> list[str]:
+    titles = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            titles.append(rng.choice(CATEGORIES).title())
+        elif kind == 1:
+            titles.append(f"{rng.choice(CATEGORIES)} {rng.randrange(tasks // len(CATEGORIES))}")
+        else:
+            titles.append(f"Offsite {i}")
+    return titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200_000, help="Seeded sessions")
+    parser.add_argument("--tasks", type=int, default=400, help="Distinct task names")
+    parser.add_argument("--events", type=int, nargs="+", default=[10, 50, 200], help="Events per batch")
+    args = parser.parse_args()
+
+    init_db()
+    rng = random.Random(23)
+    seed_sessions(args.sessions, args.tasks, rng)
+
+    statements = 0
+
+    @event.listens_for(read_engine, "before_cursor_execute")
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    def timed(fn, repeat: int = 3):
+        """Result, best time (ms) and statements executed per call."""
+        nonlocal statements
+        timings = []
+        for _ in range(repeat):
+            statements = 0
+            started = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - started)
+        return result, min(timings) * 1000, statements
+
+    mismatches = 0
+    print(f"sessions={args.sessions:,} tasks={args.tasks}")
+    print(f"{'events':>7} {'per-event ms':>13} {'statements':>11} {'batch ms':>9} {'statements':>11}")
+    for count in args.events:
+        titles = event_titles(count, args.tasks, rng)
+        db = ReadSessionLocal()
+        engine_ = PredictionEngine(db)
+        engine_._predict_many(titles[:1], 0.5)  # warm up the connection
+
+        one_by_one, single_ms, single_statements = timed(
+            lambda: {title: engine_._predict(title, 0.5) for title in titles}
+        )
+        batched, batch_ms, batch_statements = timed(lambda: engine_._predict_many(titles, 0.5))
+        db.close()
+
+        mismatches += sum(batched[title] != one_by_one[title] for title in titles)
+        print(f"{count:>7} {single_ms:>13.1f} {single_statements:>11} {batch_ms:>9.1f} {batch_statements:>11}")
+
+    print(f"batched predictions differing from per-event: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: prediction latency and hit rate with the prediction cache.
+
+Seeds sessions over many task names, then replays a skewed mix of
+prediction queries (a few categories asked for most of the time, three
+conservativity settings) interleaved with activity uploads that open and
+extend sessions. Every answer from PredictionEngine.predict is compared
+with an uncached computation on the same data, so a prediction served
+after a matching upload but before its invalidation fails the run. It
+also checks that a rolled-back upload leaves the cache alone, and
+reports the hit rate and latency with and without the cache.
+
+Run from focusflow/backend:
+    python scripts/bench_prediction_cache.py [--sessions 200000] [--queries 5000] [--upload-every 50]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from _bench_common import CATEGORIES, scratch_database, seed_sessions
+
+scratch_database("cache.db")
+
+from database import ReadSessionLocal, SessionLocal, init_db
+from services.activity_ingestor import ActivityBatch, ActivityIngestor
+from services.prediction_cache import prediction_cache
+from services.prediction_engine import PredictionEngine
+
+
+def upload(ingestor: ActivityIngestor, task_name: str, start_ms: int, rng: random.Random):
+    ingestor.ingest(ActivityBatch(
+        task_name=task_name, tab_switches=1, focus_score=60.0,
+        activities=[(f"https://example.com/{start_ms}", "example.com", "Page", rng.randrange(60_000, 600_000),
+                     start_ms, start_ms + 500)],
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200_000, help="Seeded sessions")
+    parser.add_argument("--tasks", type=int, default=400, help="Distinct task names")
+    parser.add_argument("--queries", type=int, default=5_000, help="Prediction queries to replay")
+    parser.add_argument("--upload-every", type=int, default=50, help="Queries between uploads")
+    args = parser.parse_args()
+
+    init_db()
+    rng = random.Random(22)
+    seed_sessions(args.sessions, args.tasks, rng)
+
+    # Skewed workload: category k is asked for with weight 1/(k+1)
+    queries = CATEGORIES + [f"{category} {n}" for category in CATEGORIES for n in range(3)]
+    weights = [1 / (k + 1) for k in range(len(queries))]
+
+    writer = SessionLocal()
+    ingestor = ActivityIngestor(writer)
+    start_ms = int(time.time() * 1000)
+    cached_ms = uncached_ms = 0.0
+    stale = 0
+    for i in range(args.queries):
+        if i % args.upload_every == 0:
+            upload(ingestor, f"{rng.choice(CATEGORIES).title()} {rng.randrange(3)}", start_ms + i * 1000, rng)
+            writer.commit()
+
+        category = rng.choices(queries, weights)[0]
+        conservativity = rng.choice([0.0, 0.5, 1.0])
+        db = ReadSessionLocal()
+        engine_ = PredictionEngine(db)
+        started = time.perf_counter()
+        prediction = engine_.predict(category, conservativity)
+        cached_ms += time.perf_counter() - started
+        started = time.perf_counter()
+        expected = engine_._predict(category, conservativity)
+        uncached_ms += time.perf_counter() - started
+        db.close()
+        stale += prediction != expected
+
+    # A rolled-back upload must not drop cached predictions
+    db = ReadSessionLocal()
+    PredictionEngine(db).predict("coding", 0.5)
+    db.close()
+    before = prediction_cache.stats()
+    upload(ingestor, "Coding 0", start_ms + args.queries * 1000, rng)
+    writer.rollback()
+    rollback_ok = prediction_cache.stats()["invalidations"] == before["invalidations"]
+    writer.close()
+
+    stats = prediction_cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    print(f"sessions={args.sessions:,} queries={args.queries:,} uploads={args.queries // args.upload_every:,}")
+    print(f"hit rate:           {stats['hits'] / lookups:.1%} ({stats['hits']:,} hits, {stats['misses']:,} misses)")
+    print(f"invalidations:      {stats['invalidations']:,} (cache size {stats['size']}/{stats['max_size']})")
+    print(f"ms per prediction:  {uncached_ms * 1000 / args.queries:.3f} uncached, {cached_ms * 1000 / args.queries:.3f} cached")
+    print(f"stale predictions:  {stale}")
+    print(f"rollback keeps cache: {rollback_ok}")
+    if stale or not rollback_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Benchmark: one shared connection pool vs a single writer plus read-only readers.
+
+Writer threads ingest uploads (commit per upload, like POST /api/activity)
+while reader threads run the dashboard aggregates (activity_totals +
+top_domains over the last 7 days). The same database is exercised twice:
+first with both session factories bound to one ordinary pool, as before
+the split, then with SessionLocal on the single-connection writer engine
+and ReadSessionLocal on the mode=ro reader pool.
+
+It then drives the ASGI app: concurrent POST /api/activity clients next
+to GET /api/stats clients, first with uploads run on the shared run_db
+thread pool, where each queued upload holds a thread while it waits for
+the writer connection, then on the dedicated run_write_db thread.
+
+Run from focusflow/backend:
+    python scripts/bench_read_write_split.py [--seconds 5] [--writers 4] [--readers 4]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+from _bench_common import percentile_ms, scratch_database
+
+scratch_database("split.db")
+
+import httpx
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+import routers.activity
+from config import settings
+from database import ReadSessionLocal, SessionLocal, _apply_sqlite_pragmas, engine, init_db, read_engine, run_db, run_write_db
+from main import app
+from services.activity_ingestor import ActivityBatch, ActivityIngestor
+from services.activity_queries import activity_totals, top_domains
+
+
+class Batches:
+    """Thread-safe source of uploads with unique, increasing timestamps."""
+
+    def __init__(self):
+        self._next_ms = int(time.time() * 1000)
+        self._lock = threading.Lock()
+
+    def make(self, size: int, task: int) -> ActivityBatch:
+        with self._lock:
+            start = self._next_ms
+            self._next_ms += size * 1000
+        return ActivityBatch(
+            task_name=f"Task {task}", tab_switches=2, focus_score=75.0,
+            activities=[
+                (f"https://site{i % 40}.example.com/page/{start + i}", f"site{i % 40}.example.com",
+                 f"Page {i}", 1000 + i, start + i * 1000, start + i * 1000 + 900)
+                for i in range(size)
+            ],
+        )
+
+
+def run(seconds: float, writers: int, readers: int, batches: Batches) -> dict:
+    stop = threading.Event()
+    lock = threading.Lock()
+    write_latencies: list[float] = []
+    read_latencies: list[float] = []
+    errors = [0]
+
+    def write_loop(task: int):
+        db = SessionLocal()
+        ingestor = ActivityIngestor(db)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                ingestor.ingest(batches.make(20, task))
+                db.commit()
+                with lock:
+                    write_latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    errors[0] += 1
+        db.close()
+
+    def read_loop():
+        db = ReadSessionLocal()
+        since = datetime.utcnow() - timedelta(days=7)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                activity_totals(db, since)
+                top_domains(db, since)
+                db.rollback()  # End the read transaction like a request would
+                with lock:
+                    read_latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    errors[0] += 1
+        db.close()
+
+    threads = [threading.Thread(target=write_loop, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=read_loop) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "writes/s": len(write_latencies) / seconds,
+        "write p95 ms": percentile_ms(write_latencies, 0.95),
+        "reads/s": len(read_latencies) / seconds,
+        "read p95 ms": percentile_ms(read_latencies, 0.95),
+        "errors": errors[0],
+    }
+
+
+async def run_app(seconds: float, writers: int, readers: int, batches: Batches) -> dict:
+    """Upload and /api/stats latencies through the app."""
+    write_latencies: list[float] = []
+    read_latencies: list[float] = []
+    errors = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        deadline = time.perf_counter() + seconds
+
+        async def timed_loop(latencies: list[float], request):
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await request()
+                if response.is_success:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        def upload(task: int):
+            batch = batches.make(20, task)
+            return client.post("/api/activity", json={
+                "task_name": batch.task_name, "tab_switches": batch.tab_switches,
+                "focus_score": batch.focus_score,
+                "activities": [
+                    dict(zip(("url", "domain", "title", "duration_ms", "start_time", "end_time"), activity))
+                    for activity in batch.activities
+                ],
+            })
+
+        await asyncio.gather(
+            *(timed_loop(write_latencies, lambda task=i: upload(task)) for i in range(writers)),
+            *(timed_loop(read_latencies, lambda: client.get("/api/stats")) for _ in range(readers)),
+        )
+
+    return {
+        "writes/s": len(write_latencies) / seconds,
+        "write p95 ms": percentile_ms(write_latencies, 0.95),
+        "reads/s": len(read_latencies) / seconds,
+        "read p95 ms": percentile_ms(read_latencies, 0.95),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5, help="Measured run time per configuration")
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent writer threads")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader threads")
+    parser.add_argument("--app-writers", type=int, default=32, help="Concurrent upload clients through the app")
+    parser.add_argument("--seed-rows", type=int, default=50_000, help="Activities loaded before measuring")
+    args = parser.parse_args()
+
+    init_db()
+    batches = Batches()
+    db = SessionLocal()
+    ingestor = ActivityIngestor(db)
+    for i in range(args.seed_rows // 1000):
+        ingestor.ingest(batches.make(1000, i % 7))
+        db.commit()
+    db.close()
+
+    shared_engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
+    event.listen(shared_engine, "connect", _apply_sqlite_pragmas)
+
+    print(f"profile={settings.sqlite_profile} writers={args.writers} readers={args.readers}")
+    print(f"{'configuration':<22} {'writes/s':>9} {'write p95 ms':>13} {'reads/s':>9} {'read p95 ms':>12} {'errors':>7}")
+    for label, write_bind, read_bind in (
+        ("shared pool", shared_engine, shared_engine),
+        ("writer + ro readers", engine, read_engine),
+    ):
+        SessionLocal.configure(bind=write_bind)
+        ReadSessionLocal.configure(bind=read_bind)
+        result = run(args.seconds, args.writers, args.readers, batches)
+        print(f"{label:<22} {result['writes/s']:>9,.0f} {result['write p95 ms']:>13,.1f} "
+              f"{result['reads/s']:>9,.0f} {result['read p95 ms']:>12,.1f} {result['errors']:>7}")
+    SessionLocal.configure(bind=engine)
+    ReadSessionLocal.configure(bind=read_engine)
+
+    print(f"\nthrough the app: upload clients={args.app_writers} /api/stats clients={args.readers}")
+    print(f"{'uploads run on':<22} {'writes/s':>9} {'write p95 ms':>13} {'reads/s':>9} {'read p95 ms':>12} {'errors':>7}")
+    for label, runner in (("run_db pool", run_db), ("writer thread", run_write_db)):
+        routers.activity.run_write_db = runner
+        result = asyncio.run(run_app(args.seconds, args.app_writers, args.readers, batches))
+        print(f"{label:<22} {result['writes/s']:>9,.0f} {result['write p95 ms']:>13,.1f} "
+              f"{result['reads/s']:>9,.0f} {result['read p95 ms']:>12,.1f} {result['errors']:>7}")
+    routers.activity.run_write_db = run_write_db
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: bytes saved by compressing activity uploads, and the server
+CPU cost of decompressing them in RequestDecompressionMiddleware.
+
+Payloads are synthetic uploads with realistic URLs and titles, in both
+the JSON and the columnar binary encoding. zstd rows are skipped unless
+the optional `zstandard` package is installed.
+
+Run from focusflow/backend:
+    python scripts/bench_request_compression.py [--repeat 200]
+"""
+
+import argparse
+import asyncio
+import gzip
+import random
+
+from _bench_common import per_call_us, scratch_database
+
+scratch_database("bench.db")
+
+from middleware import RequestDecompressionMiddleware, zstandard
+from models import ActivityItem, ActivityRequest
+from services.activity_codec import encode_activity_columnar
+
+
+BATCH_SIZES = (10, 100, 1000)
+SITES = ["github.com", "stackoverflow.com", "docs.python.org", "mail.google.com",
+         "www.youtube.com", "news.ycombinator.com", "en.wikipedia.org", "app.slack.com"]
+
+
+def make_request(batch_size: int, seed: int = 3) -> ActivityRequest:
+    rng = random.Random(seed)
+    start = 1_760_000_000_000
+    activities = []
+    for i in range(batch_size):
+        site = rng.choice(SITES)
+        page = rng.randrange(5_000)
+        activities.append(ActivityItem(
+            url=f"https://{site}/{rng.choice(['questions', 'issues', 'wiki', 'watch'])}/{page}?ref=focusflow",
+            domain=site,
+            title=f"Item {page} - {rng.choice(['Fix flaky test', 'Design review', 'Weekly sync', 'Release notes'])} | {site}",
+            duration_ms=rng.randint(1_000, 600_000),
+            start_time=start + i * 60_000,
+            end_time=start + i * 60_000 + 45_000,
+        ))
+    return ActivityRequest(task_name="Feature development", activities=activities, tab_switches=7, focus_score=82.5)
+
+
+def compressors() -> dict:
+    codecs = {"gzip": lambda data: gzip.compress(data, compresslevel=6)}
+    if zstandard is not None:
+        codecs["zstd"] = zstandard.ZstdCompressor(level=3).compress
+    return codecs
+
+
+def decompress_through_middleware(middleware: RequestDecompressionMiddleware, encoding: str, body: bytes) -> int:
+    """Run one request body through the middleware; returns decoded size."""
+    received = []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            received.append(message["body"])
+            if not message["more_body"]:
+                return
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    middleware.app = app
+    scope = {"type": "http", "headers": [(b"content-encoding", encoding.encode())]}
+    asyncio.run(middleware(scope, receive, None))
+    return sum(len(chunk) for chunk in received)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="Iterations per timing")
+    args = parser.parse_args()
+
+    middleware = RequestDecompressionMiddleware(app=None)
+    # Baseline: a pass-through request, to subtract event loop overhead
+    baseline_us = per_call_us(lambda: asyncio.run(_noop()), args.repeat)
+
+    print(f"{'batch':>6} {'format':<9} {'codec':<5} {'raw B':>9} {'sent B':>9} {'saved':>6} "
+          f"{'compress us':>12} {'decompress us':>14}")
+    for batch_size in BATCH_SIZES:
+        request = make_request(batch_size)
+        for label, raw in (
+            ("json", request.model_dump_json().encode()),
+            ("columnar", encode_activity_columnar(request)),
+        ):
+            for codec, compress in compressors().items():
+                body = compress(raw)
+                assert decompress_through_middleware(middleware, codec, body) == len(raw)
+                compress_us = per_call_us(lambda: compress(raw), args.repeat)
+                decompress_us = per_call_us(
+                    lambda: decompress_through_middleware(middleware, codec, body), args.repeat
+                ) - baseline_us
+                print(f"{batch_size:>6} {label:<9} {codec:<5} {len(raw):>9,} {len(body):>9,} "
+                      f"{1 - len(body) / len(raw):>6.0%} {compress_us:>12,.0f} {decompress_us:>14,.0f}")
+
+
+async def _noop():
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: mixed read/write throughput under each SQLITE_PROFILE.
+
+For every profile a fresh database is seeded with recent activity, then
+one writer thread ingests uploads (commit per upload, like
+POST /api/activity) while reader threads run the dashboard aggregates
+(activity_totals + top_domains for the last 7 days). Each profile runs
+in its own subprocess because the engine is configured at import time.
+
+Run from focusflow/backend:
+    python scripts/bench_sqlite_profiles.py [--seconds 5] [--readers 4]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from _bench_common import scratch_database
+
+PROFILES = ("default", "durable", "production")
+
+
+def worker(profile: str, seconds: float, readers: int, seed_rows: int):
+    """Runs inside the subprocess for one profile; prints one result line."""
+    scratch_database("bench.db")
+    os.environ["SQLITE_PROFILE"] = profile
+
+    from datetime import datetime, timedelta
+    from sqlalchemy.exc import OperationalError
+    from database import ReadSessionLocal, SessionLocal, init_db
+    from services.activity_ingestor import ActivityBatch, ActivityIngestor
+    from services.activity_queries import activity_totals, top_domains
+
+    init_db()
+    next_ms = [int(time.time() * 1000)]
+
+    def make_batch(size: int) -> ActivityBatch:
+        start = next_ms[0]
+        next_ms[0] += size * 1000
+        return ActivityBatch(
+            task_name=f"Task {start % 7}", tab_switches=2, focus_score=75.0,
+            activities=[
+                (f"https://site{i % 40}.example.com/page/{start + i}", f"site{i % 40}.example.com",
+                 f"Page {i}", 1000 + i, start + i * 1000, start + i * 1000 + 900)
+                for i in range(size)
+            ],
+        )
+
+    db = SessionLocal()
+    ingestor = ActivityIngestor(db)
+    for _ in range(seed_rows // 1000):
+        ingestor.ingest(make_batch(1000))
+        db.commit()
+    db.close()
+
+    stop = threading.Event()
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    read_latencies = []
+    lock = threading.Lock()
+
+    def write_loop():
+        db = SessionLocal()
+        ingestor = ActivityIngestor(db)
+        while not stop.is_set():
+            try:
+                ingestor.ingest(make_batch(20))
+                db.commit()
+                counts["writes"] += 1
+            except OperationalError:
+                db.rollback()
+                counts["errors"] += 1
+        db.close()
+
+    def read_loop():
+        db = ReadSessionLocal()
+        since = datetime.utcnow() - timedelta(days=7)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                activity_totals(db, since)
+                top_domains(db, since)
+                db.rollback()  # End the read transaction like a request would
+                with lock:
+                    counts["reads"] += 1
+                    read_latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    counts["errors"] += 1
+        db.close()
+
+    threads = [threading.Thread(target=write_loop)] + [threading.Thread(target=read_loop) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    read_latencies.sort()
+    p95 = read_latencies[int(len(read_latencies) * 0.95)] * 1000 if read_latencies else float("nan")
+    print(f"{profile:<11} {counts['writes'] / seconds:>9,.0f} {counts['reads'] / seconds:>9,.0f} "
+          f"{p95:>12,.1f} {counts['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5, help="Measured run time per profile")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader threads")
+    parser.add_argument("--seed-rows", type=int, default=50_000, help="Activities loaded before measuring")
+    parser.add_argument("--worker", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.seconds, args.readers, args.seed_rows)
+        return
+
+    print(f"{'profile':<11} {'writes/s':>9} {'reads/s':>9} {'read p95 ms':>12} {'errors':>7}")
+    for profile in PROFILES:
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", profile,
+             "--seconds", str(args.seconds), "--readers", str(args.readers),
+             "--seed-rows", str(args.seed_rows)],
+            check=True
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Import-time budget for the API: fails if `import main` gets slow again.
+
+Imports main in fresh interpreters under `python -X importtime` and checks
+two things:
+  - none of the lazily loaded stacks (Google Calendar client, OAuth,
+    pyarrow) is imported at startup;
+  - the fastest run's total import time is within the budget.
+The slowest modules are listed to show where a regression came from.
+
+Run from focusflow/backend:
+    python scripts/check_import_time.py [--budget-ms 1200] [--runs 5] [--top 15]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use only; see services/calendar_service.py and
+# services/history_export.py
+LAZY_PACKAGES = ("googleapiclient", "google_auth_oauthlib", "google.oauth2", "google.auth", "pyarrow")
+
+
+def import_times() -> dict[str, tuple[int, int]]:
+    """{module: (self µs, cumulative µs)} for one cold `import main`."""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'import.db')}")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1200, help="Allowed total import time of main")
+    parser.add_argument("--runs", type=int, default=5, help="Cold imports to take the fastest of")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    fastest = min(runs, key=lambda times: times["main"][1])
+    total_ms = fastest["main"][1] / 1000
+
+    print(f"{'module':<48} {'self ms':>8} {'cumul ms':>9}")
+    for name, (own, cumulative) in sorted(fastest.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"{name:<48} {own / 1000:>8.1f} {cumulative / 1000:>9.1f}")
+    print()
+
+    failures = []
+    eager = sorted(
+        name for name in fastest
+        if any(name == package or name.startswith(package + ".") for package in LAZY_PACKAGES)
+    )
+    if eager:
+        failures.append(f"imported at startup but should be lazy: {', '.join(eager[:5])}"
+                        + (f" (+{len(eager) - 5} more)" if len(eager) > 5 else ""))
+    if total_ms > args.budget_ms:
+        failures.append(f"import main took {total_ms:,.0f} ms, budget is {args.budget_ms:,.0f} ms")
+
+    print(f"import main: {total_ms:,.0f} ms (budget {args.budget_ms:,.0f} ms, best of {args.runs})")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
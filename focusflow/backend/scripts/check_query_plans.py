@@ -0,0 +1,163 @@
+"""
+Check that the hot dashboard and prediction queries use their indexes.
+
+Seeds a fresh database (built by init_db, so through the migrations),
+runs the real service and router code while recording every SELECT it
+issues, and prints SQLite's EXPLAIN QUERY PLAN for each one. Exits with
+status 1 if any query misses the index listed for it in CHECKS.
+
+Category predictions find the categories containing the query through
+the FTS5 trigram index, then read their sketches by primary key.
+
+Run from focusflow/backend:
+    python scripts/check_query_plans.py [--rows 20000]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from _bench_common import scratch_database
+
+scratch_database("plans.db", prefix="focusflow-plans-")
+
+from sqlalchemy import event
+from database import SessionLocal, Session, Prediction, engine, init_db, session_category
+from routers.chat import get_context_stats
+from routers.stats import get_stats
+from services.activity_ingestor import ActivityBatch, ActivityIngestor
+from services.activity_partitions import partition_name
+from services.duration_sketch import record as record_duration
+from services.prediction_engine import PredictionEngine
+from services.session_registry import SessionRegistry
+
+
+def _partition_index() -> str:
+    return f"ix_{partition_name(datetime.utcnow())}_created_at"
+
+
+# (label, callable taking a session, index names its plans must use)
+CHECKS = [
+    ("GET /api/stats", lambda db: asyncio.run(get_stats(db)),
+     ["sqlite_autoindex_daily_stats_1"]),
+    ("chat context stats", get_context_stats,
+     ["ix_sessions_start_time", _partition_index()]),
+    ("prediction accuracy", lambda db: PredictionEngine(db).get_accuracy(),
+     ["sqlite_autoindex_daily_stats_1"]),
+    ("prediction accuracy by category", lambda db: PredictionEngine(db).get_accuracy("coding"),
+     ["sqlite_autoindex_prediction_accuracy_1"]),
+    ("prediction accuracy by category, last 7 days", lambda db: PredictionEngine(db).get_accuracy("coding", days=7),
+     ["sqlite_autoindex_prediction_accuracy_1"]),
+    ("session registry warm-up", lambda db: SessionRegistry().warm(db),
+     ["ix_sessions_start_time"]),
+    ("category prediction", lambda db: PredictionEngine(db).predict("coding", 0.5),
+     ["duration_sketch_fts VIRTUAL TABLE INDEX", "sqlite_autoindex_duration_sketches_1",
+      "sqlite_autoindex_duration_sketch_buckets_1"]),
+    ("batch prediction", lambda db: PredictionEngine(db).predict_many(["writing", "review 3", "offsite"], 0.5),
+     ["duration_sketch_fts VIRTUAL TABLE INDEX", "sqlite_autoindex_duration_sketches_1",
+      "sqlite_autoindex_duration_sketch_buckets_1"]),
+]
+
+
+def seed(rows: int, seed: int = 5):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    ingestor = ActivityIngestor(db)
+    start_ms = int(time.time() * 1000)
+    for offset in range(0, rows, 1000):
+        ingestor.ingest(ActivityBatch(
+            task_name=f"Task {offset % 13}", tab_switches=1, focus_score=70.0,
+            activities=[
+                (f"https://site{i % 50}.example.com/{offset + i}", f"site{i % 50}.example.com",
+                 f"Page {i}", 1000 + i, start_ms + (offset + i) * 1000, start_ms + (offset + i) * 1000 + 900)
+                for i in range(min(1000, rows - offset))
+            ],
+        ))
+        db.commit()
+
+    for i in range(2000):
+        started = now - timedelta(minutes=rng.randrange(90 * 24 * 60))
+        task_name = rng.choice(["coding", "writing", "review", "email"]) + f" {i % 40}"
+        session = Session(
+            task_name=task_name, category=session_category(task_name),
+            start_time=started, end_time=started + timedelta(minutes=30),
+            focus_score=rng.uniform(40, 100), tab_switches=rng.randrange(20),
+            total_duration_ms=rng.randrange(60_000, 7_200_000)
+        )
+        db.add(session)
+        record_duration(db, session.category, None, session.total_duration_ms)
+    for i in range(2000):
+        db.add(Prediction(
+            task_category=rng.choice(["coding", "writing", "review", "email"]),
+            predicted_minutes=rng.randrange(10, 120),
+            actual_minutes=rng.randrange(10, 120) if i % 4 == 0 else None,
+            conservativity=0.5
+        ))
+    db.commit()
+    db.close()
+
+
+@contextmanager
+def recorded_selects():
+    """Collect (statement, parameters) of every SELECT run on the engine."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def query_plan(statement: str, parameters) -> list[str]:
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000, help="Activities seeded before checking")
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.rows)
+
+    failures = 0
+    for label, run, expected in CHECKS:
+        db = SessionLocal()
+        with recorded_selects() as statements:
+            run(db)
+        db.close()
+
+        details = []
+        print(f"\n== {label}")
+        for statement, parameters in statements:
+            plan = query_plan(statement, parameters)
+            details += plan
+            print("   " + " ".join(statement.split())[:110])
+            for step in plan:
+                print(f"      {step}")
+
+        missing = [index for index in expected if not any(index in step for step in details)]
+        if missing:
+            failures += 1
+            print(f"   FAIL: not using {', '.join(missing)}")
+        elif expected:
+            print(f"   ok: uses {', '.join(expected)}")
+
+    print(f"\n{len(CHECKS) - failures}/{len(CHECKS)} checks passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
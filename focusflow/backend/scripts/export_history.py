@@ -0,0 +1,52 @@
+"""
+Export activity, session and prediction history as Parquet or Arrow files.
+
+Writes one file per table (focusflow-<table>.parquet or .arrows) into the
+output directory, streaming EXPORT_BATCH_ROWS rows at a time, the same way
+GET /api/export does. Requires pyarrow.
+
+Run from focusflow/backend:
+    python scripts/export_history.py [--format parquet|arrow] [--output exports] [--tables activities sessions]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from database import ReadSessionLocal, init_db
+from services import history_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--format", choices=tuple(history_export.EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--output", default="exports", help="Directory to write the files to")
+    parser.add_argument("--tables", nargs="+", choices=history_export.EXPORT_TABLES,
+                        default=list(history_export.EXPORT_TABLES))
+    parser.add_argument("--batch-rows", type=int, default=settings.export_batch_rows,
+                        help="Rows per row group / record batch")
+    args = parser.parse_args()
+
+    if not history_export.PYARROW_AVAILABLE:
+        print("❌ Export requires pyarrow: pip install pyarrow")
+        sys.exit(1)
+
+    init_db()
+    os.makedirs(args.output, exist_ok=True)
+    db = ReadSessionLocal()
+    try:
+        for table in args.tables:
+            path = os.path.join(args.output, history_export.export_filename(table, args.format))
+            with open(path, "wb") as f:
+                for chunk in history_export.iter_export(db, table, args.format, args.batch_rows):
+                    f.write(chunk)
+            print(f"✅ {table} → {path} ({os.path.getsize(path) / 1e6:,.1f} MB)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+List, archive, restore or drop monthly activity partitions.
+
+Archived months are kept on disk but no longer read by stats or chat
+queries; dropping deletes an archived month for good.
+
+Run from focusflow/backend:
+    python scripts/manage_activity_partitions.py list
+    python scripts/manage_activity_partitions.py archive 2024-01
+    python scripts/manage_activity_partitions.py restore 2024-01
+    python scripts/manage_activity_partitions.py drop 2024-01
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal, init_db
+from services.activity_partitions import activity_partitions
+
+
+PAST_TENSE = {"archive": "Archived", "restore": "Restored", "drop": "Dropped"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("action", choices=("list", "archive", "restore", "drop"))
+    parser.add_argument("month", nargs="?", help="Partition month as YYYY-MM")
+    args = parser.parse_args()
+
+    if args.action != "list" and not args.month:
+        parser.error(f"{args.action} needs a month (YYYY-MM)")
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.action == "list":
+            for partition in activity_partitions.catalog(db):
+                state = "archived" if partition.archived else "active"
+                print(f"{partition.name:<20} {partition.range_start:%Y-%m-%d} → {partition.range_end:%Y-%m-%d}  {state}")
+            return
+
+        month = datetime.strptime(args.month, "%Y-%m")
+        getattr(activity_partitions, args.action)(db, month)
+        db.commit()
+        print(f"✅ {PAST_TENSE[args.action]} partition for {args.month}")
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
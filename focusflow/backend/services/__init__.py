@@ -5,5 +5,6 @@ FocusFlow Backend Services
 from .ollama_service import OllamaService
 from .keywords_ai_service import KeywordsAIService
 from .prediction_engine import PredictionEngine
+from .activity_ingestor import ActivityBatch, ActivityIngestor
 from .calendar_service import CalendarService
 from .chat_tools import CHAT_TOOLS, ChatToolExecutor
@@ -0,0 +1,136 @@
+"""
+Activity Codec - Compact columnar binary format for activity uploads.
+
+The extension repeats the same keys, domains and titles in every JSON
+upload. This format sends each distinct string once in a string table and
+the activities as fixed-width little-endian columns, which both shrinks
+the payload and lets the server decode it with a handful of
+`struct.unpack_from` calls instead of per-field Pydantic validation.
+
+Layout (all integers little-endian):
+
+    offset  size      field
+    0       4         magic b"FFA1"
+    4       4         f32 focus_score
+    8       4         u32 tab_switches
+    12      4         u32 n  (number of activities)
+    16      4         u32 s  (number of strings)
+    20      4         u32 task_name (string index)
+    24      4*s       u32 byte length of each UTF-8 string
+    ...     sum(len)  UTF-8 string bytes, concatenated
+    ...     4*n       u32 url (string index)
+    ...     4*n       u32 domain (string index)
+    ...     4*n       u32 title (string index)
+    ...     4*n       u32 duration_ms
+    ...     8*n       i64 start_time (unix ms)
+    ...     8*n       i64 end_time (unix ms)
+"""
+
+import math
+import struct
+
+from models import ActivityRequest
+from services.activity_ingestor import ActivityBatch
+
+
+ACTIVITY_COLUMNAR_MEDIA_TYPE = "application/x-focusflow-activity"
+
+MAGIC = b"FFA1"
+_HEADER = struct.Struct("<4sfIIII")
+
+
+def encode_activity_columnar(request: ActivityRequest) -> bytes:
+    """Encode an ActivityRequest in the columnar wire format."""
+    strings: list[str] = []
+    index: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in index:
+            index[value] = len(strings)
+            strings.append(value)
+        return index[value]
+
+    task_index = intern(request.task_name)
+    activities = request.activities
+    urls = [intern(a.url) for a in activities]
+    domains = [intern(a.domain) for a in activities]
+    titles = [intern(a.title) for a in activities]
+
+    encoded = [s.encode("utf-8") for s in strings]
+    n = len(activities)
+
+    return b"".join([
+        _HEADER.pack(MAGIC, request.focus_score, request.tab_switches, n, len(encoded), task_index),
+        struct.pack(f"<{len(encoded)}I", *(len(b) for b in encoded)),
+        *encoded,
+        struct.pack(f"<{n}I", *urls),
+        struct.pack(f"<{n}I", *domains),
+        struct.pack(f"<{n}I", *titles),
+        struct.pack(f"<{n}I", *(a.duration_ms for a in activities)),
+        struct.pack(f"<{n}q", *(a.start_time for a in activities)),
+        struct.pack(f"<{n}q", *(a.end_time for a in activities)),
+    ])
+
+
+def decode_activity_columnar(data: bytes) -> ActivityBatch:
+    """
+    Decode and validate a columnar upload.
+
+    Field constraints are checked on whole columns and the result goes
+    straight into an ActivityBatch, without building a model per activity.
+
+    Raises:
+        ValueError: If the payload is malformed or violates ActivityRequest limits
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated activity payload header")
+
+    magic, focus_score, tab_switches, n, string_count, task_index = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a FocusFlow columnar activity payload")
+    if not (math.isfinite(focus_score) and 0 <= focus_score <= 100):
+        raise ValueError("focus_score must be between 0 and 100")
+
+    offset = _HEADER.size
+    lengths_end = offset + 4 * string_count
+    expected_size = lengths_end + 32 * n
+    if len(data) < expected_size:
+        raise ValueError("Truncated activity payload")
+
+    lengths = struct.unpack_from(f"<{string_count}I", data, offset)
+    offset = lengths_end
+    if len(data) != expected_size + sum(lengths):
+        raise ValueError("Activity payload size does not match its header")
+
+    view = memoryview(data)
+    try:
+        strings = []
+        for length in lengths:
+            strings.append(str(view[offset:offset + length], "utf-8"))
+            offset += length
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Invalid UTF-8 in string table: {e}") from e
+
+    urls = struct.unpack_from(f"<{n}I", data, offset)
+    domains = struct.unpack_from(f"<{n}I", data, offset + 4 * n)
+    titles = struct.unpack_from(f"<{n}I", data, offset + 8 * n)
+    durations = struct.unpack_from(f"<{n}I", data, offset + 12 * n)
+    starts = struct.unpack_from(f"<{n}q", data, offset + 16 * n)
+    ends = struct.unpack_from(f"<{n}q", data, offset + 24 * n)
+
+    if task_index >= string_count or (n and max(max(urls), max(domains), max(titles)) >= string_count):
+        raise ValueError("String index out of range")
+
+    return ActivityBatch(
+        task_name=strings[task_index],
+        tab_switches=tab_switches,
+        focus_score=focus_score,
+        activities=list(zip(
+            [strings[i] for i in urls],
+            [strings[i] for i in domains],
+            [strings[i] for i in titles],
+            durations,
+            starts,
+            ends,
+        )),
+    )
@@ -0,0 +1,290 @@
+"""
+Activity Ingestor - Writes extension activity batches to the database.
+
+Activity rows are written with a single Core-level executemany instead of
+one ORM object per row, so large batches skip identity-map and
+unit-of-work bookkeeping entirely. URL, domain and title strings are
+interned into dimension tables (services/dimension_cache.py) so each fact
+row stores only integers. Rows go to the current month's partition table
+(services/activity_partitions.py). The task's open session is found through the
+in-memory session registry (services/session_registry.py), so merging an
+upload is a single UPDATE by primary key with no lookup query. The
+dashboard totals in daily_stats (services/daily_stats.py) and the task's
+duration sketch (services/duration_sketch.py) are updated in the same
+transaction.
+
+Callers that may run concurrently hold `session_registry.locked(...)` for
+the batch's task names until they commit.
+"""
+
+import hashlib
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import Row, Table, func, select
+from sqlalchemy.orm import Session as DBSession
+
+from database import Session, session_category
+from models import ActivityRequest, ActivityStreamRecord
+from services import daily_stats, duration_sketch
+from services.activity_partitions import activity_partitions, month_start
+from services.dimension_cache import domain_ids, url_ids, title_ids
+from services.session_registry import OpenSession, session_registry
+
+
+# (url, domain, title, duration_ms, start_time_ms, end_time_ms)
+ActivityTuple = tuple[str, str, str, int, int, int]
+
+
+def activity_dedup_key(task_name: str, url: str, start_ms: int, end_ms: int) -> int:
+    """
+    Deterministic 64-bit identity of an activity, backing the unique dedup index.
+
+    A signed 64-bit integer keeps the index compact; the chance of two
+    distinct activities colliding is ~n^2 / 2^65 (about 1e-6 at 5M rows).
+    """
+    digest = hashlib.blake2b(
+        f"{task_name}\x1f{url}\x1f{start_ms}\x1f{end_ms}".encode("utf-8"),
+        digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+@dataclass
+class ActivityBatch:
+    """
+    A validated upload in the shape the insert path consumes.
+
+    Every wire format (JSON, columnar binary, NDJSON stream) is decoded
+    into this, so they all share one insert path.
+    """
+    task_name: str
+    tab_switches: int = 0
+    focus_score: Optional[float] = None
+    activities: list[ActivityTuple] = field(default_factory=list)
+
+    @classmethod
+    def from_request(cls, request: ActivityRequest) -> "ActivityBatch":
+        return cls(
+            task_name=request.task_name,
+            tab_switches=request.tab_switches,
+            focus_score=request.focus_score,
+            activities=[
+                (a.url, a.domain, a.title, a.duration_ms, a.start_time, a.end_time)
+                for a in request.activities
+            ],
+        )
+
+
+class ActivityIngestor:
+    """Applies activity batches to the database (the caller commits)."""
+
+    # Uploads for the same task within this window extend the existing session
+    SESSION_MERGE_WINDOW = timedelta(hours=1)
+
+    def __init__(self, db: DBSession):
+        self.db = db
+
+    def ingest(self, batch: ActivityBatch) -> int:
+        """
+        Stage an activity batch and its session update in the current transaction.
+
+        Args:
+            batch: Validated upload from the extension
+
+        Activities already stored (same task, URL, start and end time) are
+        skipped, by the partition's unique dedup index or, for a batch
+        retried after the month rolled over, by a lookup in the earlier
+        partitions. A resent batch is a no-op. A partly resent one extends
+        the session by the new rows only and adds their share of the
+        batch's tab switches (repeats within the batch count once).
+
+        Returns:
+            Number of activity rows inserted (0 for a replayed batch)
+        """
+        activities = batch.activities
+        urls = url_ids.resolve(self.db, (a[0] for a in activities))
+        domains = domain_ids.resolve(self.db, (a[1] for a in activities))
+        titles = title_ids.resolve(self.db, (a[2] for a in activities))
+        now = datetime.utcnow()
+
+        rows = [
+            {
+                "task_name": batch.task_name,
+                "url_id": urls[url],
+                "domain_id": domains[domain],
+                "title_id": titles[title],
+                "duration_ms": duration_ms,
+                "start_time": datetime.fromtimestamp(start_ms / 1000),
+                "end_time": datetime.fromtimestamp(end_ms / 1000),
+                "created_at": now,
+                "dedup_key": activity_dedup_key(batch.task_name, url, start_ms, end_ms),
+            }
+            for url, domain, title, duration_ms, start_ms, end_ms in activities
+        ]
+
+        fresh = self._not_stored_earlier(rows, now)
+        inserted = self._insert_rows(activity_partitions.for_write(self.db, now), fresh) if fresh else []
+        if rows and not inserted:
+            # Every activity was already stored: this is a retry of a
+            # committed upload, so leave the session untouched.
+            return 0
+
+        # Repeats within this batch are rejected too but were never stored
+        distinct = len({row["dedup_key"] for row in rows})
+        if len(inserted) < distinct:
+            # Part of the batch was stored by an earlier upload, along with
+            # its tab switches; count only the new rows' share of them
+            batch = replace(batch, tab_switches=round(batch.tab_switches * len(inserted) / distinct))
+
+        total_duration_ms = sum(row.duration_ms for row in inserted)
+        earliest_start = min((row.start_time for row in inserted), default=None)
+        latest_end = max((row.end_time for row in inserted), default=None)
+
+        session_change = self._upsert_session(batch, total_duration_ms, earliest_start, latest_end)
+        daily_stats.add(
+            self.db,
+            (now, {"activity_count": len(inserted), "duration_ms_sum": total_duration_ms}),
+            session_change
+        )
+        return len(inserted)
+
+    def ingest_records(self, records: list[ActivityStreamRecord]) -> int:
+        """
+        Stage a chunk of streamed NDJSON records, grouped into one batch per task.
+
+        Tab switches are summed per task and the last focus score seen wins,
+        matching what a single upload for that task would have recorded.
+
+        Returns:
+            Number of activity rows inserted
+        """
+        batches: dict[str, ActivityBatch] = {}
+        for record in records:
+            batch = batches.get(record.task_name)
+            if batch is None:
+                batch = batches[record.task_name] = ActivityBatch(task_name=record.task_name)
+            batch.activities.append((
+                record.url, record.domain, record.title,
+                record.duration_ms, record.start_time, record.end_time
+            ))
+            batch.tab_switches += record.tab_switches
+            if record.focus_score is not None:
+                batch.focus_score = record.focus_score
+
+        return sum(self.ingest(batch) for batch in batches.values())
+
+    # Activity start times are local wall-clock times while partitions are
+    # keyed by UTC created_at; widening the lookup by a day covers any offset
+    PARTITION_CLOCK_SLACK = timedelta(days=1)
+
+    # Dedup keys per IN (...) lookup, well under SQLite's bound-parameter limit
+    DEDUP_LOOKUP_CHUNK = 500
+
+    def _not_stored_earlier(self, rows: list[dict], now: datetime) -> list[dict]:
+        """
+        Rows whose activity is not already stored in an earlier month's partition.
+
+        The current partition's dedup index rejects replays within the
+        month; this covers an upload retried after the month rolled over.
+        Only activities that started before the current month can have a
+        copy in an earlier partition, so a typical batch costs nothing here.
+        """
+        current = month_start(now)
+        earlier = [row for row in rows if row["start_time"] - self.PARTITION_CLOCK_SLACK < current]
+        if not earlier:
+            return rows
+
+        since = min(row["start_time"] for row in earlier) - self.PARTITION_CLOCK_SLACK
+        keys = [row["dedup_key"] for row in earlier]
+        stored = set()
+        for table in activity_partitions.for_range(self.db, since, current, include_archived=True):
+            for i in range(0, len(keys), self.DEDUP_LOOKUP_CHUNK):
+                stored.update(self.db.execute(
+                    select(table.c.dedup_key).where(table.c.dedup_key.in_(keys[i:i + self.DEDUP_LOOKUP_CHUNK]))
+                ).scalars())
+        return [row for row in rows if row["dedup_key"] not in stored] if stored else rows
+
+    def _insert_rows(self, table: Table, rows: list[dict]) -> list[Row]:
+        """
+        Insert activity rows into a partition as one executemany, ignoring duplicates.
+
+        Returns:
+            (duration_ms, start_time, end_time) of the rows actually inserted
+        """
+        # Core insert on the Table (not the mapped class) skips the ORM
+        # bulk path and never touches the identity map. OR IGNORE lets the
+        # unique dedup index reject replays at insert time.
+        result = self.db.execute(
+            table.insert()
+            .prefix_with("OR IGNORE")
+            .returning(table.c.duration_ms, table.c.start_time, table.c.end_time),
+            rows
+        )
+        return result.all()
+
+    def _upsert_session(
+        self,
+        batch: ActivityBatch,
+        total_duration_ms: int,
+        earliest_start: Optional[datetime],
+        latest_end: Optional[datetime]
+    ) -> tuple[datetime, dict[str, float]]:
+        """
+        Extend the task's recent session, or open a new one.
+
+        Returns:
+            The session's start time and its daily_stats deltas
+        """
+        now = datetime.utcnow()
+        sessions = Session.__table__
+        current = session_registry.get(self.db, batch.task_name)
+
+        if current and current.start_time >= now - self.SESSION_MERGE_WINDOW:
+            updated = replace(
+                current,
+                end_time=latest_end or now,
+                focus_score=batch.focus_score if batch.focus_score is not None else current.focus_score,
+                tab_switches=current.tab_switches + batch.tab_switches,
+                total_duration_ms=current.total_duration_ms + total_duration_ms,
+            )
+            # Increment in SQL so the row stays exact even if the registry
+            # snapshot were stale; the registry only supplies the row ID.
+            self.db.execute(
+                sessions.update()
+                .where(sessions.c.id == current.id)
+                .values(
+                    end_time=updated.end_time,
+                    focus_score=updated.focus_score,
+                    tab_switches=func.coalesce(sessions.c.tab_switches, 0) + batch.tab_switches,
+                    total_duration_ms=func.coalesce(sessions.c.total_duration_ms, 0) + total_duration_ms,
+                )
+            )
+            opened, previous_focus, previous_duration = False, current.focus_score, current.total_duration_ms
+        else:
+            values = dict(
+                task_name=batch.task_name,
+                category=session_category(batch.task_name),
+                start_time=earliest_start or now,
+                end_time=latest_end or now,
+                focus_score=batch.focus_score,
+                tab_switches=batch.tab_switches,
+                total_duration_ms=total_duration_ms,
+            )
+            session_id = self.db.execute(
+                sessions.insert().values(**values).returning(sessions.c.id)
+            ).scalar_one()
+            updated = OpenSession(
+                id=session_id, **{k: v for k, v in values.items() if k not in ("task_name", "category")}
+            )
+            opened, previous_focus, previous_duration = True, None, None
+
+        session_registry.stage(self.db, batch.task_name, updated)
+        duration_sketch.record(
+            self.db, session_category(batch.task_name), previous_duration, updated.total_duration_ms
+        )
+        return updated.start_time, {
+            "session_count": int(opened),
+            "focus_score_sum": (updated.focus_score or 0) - (previous_focus or 0),
+            "focus_score_count": (updated.focus_score is not None) - (previous_focus is not None),
+        }
@@ -0,0 +1,218 @@
+"""
+Activity Partitions - Monthly tables for activity history.
+
+Activities are written to one table per calendar month of `created_at`
+(`activities_2026_10`, ...), each a clone of the Activity model with its
+own indexes, and listed in the `activity_partitions` catalog. Range
+queries ask `for_range()` which partitions overlap the window, so a
+"today" or "this week" aggregate reads only the current month (or two)
+no matter how much history has accumulated.
+
+Old months leave the query path in O(1): `archive()` flips a catalog
+flag and `drop()` removes the table. Partitions created inside a
+transaction are only trusted by other sessions after it commits.
+
+Activity ids stay unique across partitions: each partition is an
+AUTOINCREMENT table whose sequence starts above the highest id of every
+existing partition, so `id` still identifies one activity in the whole
+history (e.g. in exports). Partitions created before this seeding was
+added may repeat ids of the months before them.
+
+Each partition has its own unique dedup index, which only rejects a
+replay stored in the same month. The ingestor also looks up the dedup
+keys of activities that started before the current month in the earlier
+partitions their first copy could be in (archived ones included), so a
+batch retried across a month boundary is not stored twice. Rows in a
+dropped partition can no longer be matched.
+"""
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Table, column, event, func, insert, inspect, select, table as table_clause, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as DBSession
+
+from database import SessionLocal, Base, Activity, ActivityPartition, activity_partition_table
+
+# SQLite's AUTOINCREMENT high-water marks, one row per partition table
+_sqlite_sequence = table_clause("sqlite_sequence", column("name"), column("seq"))
+
+
+def month_start(moment: datetime) -> datetime:
+    """First instant of the month containing `moment`."""
+    return datetime(moment.year, moment.month, 1)
+
+
+def next_month(start: datetime) -> datetime:
+    """First instant of the month after `start`."""
+    if start.month == 12:
+        return datetime(start.year + 1, 1, 1)
+    return datetime(start.year, start.month + 1, 1)
+
+
+def partition_name(start: datetime) -> str:
+    """Table name of the partition for the month starting at `start`."""
+    return f"activities_{start:%Y_%m}"
+
+
+class ActivityPartitions:
+    """Routes activity reads and writes to monthly partition tables."""
+
+    def __init__(self):
+        # Partitions known to exist and be cataloged (committed)
+        self._known: set[str] = set()
+
+    def for_write(self, db: DBSession, moment: datetime) -> Table:
+        """
+        Partition for rows created at `moment`, creating it if needed.
+
+        The table and its catalog row are created in `db`'s transaction.
+        """
+        start = month_start(moment)
+        name = partition_name(start)
+        table = activity_partition_table(name)
+
+        pending = _pending_partitions(db)
+        if name not in self._known and name not in pending:
+            connection = db.connection()
+            if not inspect(connection).has_table(name):
+                table.create(bind=connection)
+                # Continue the id sequence of the partitions before it
+                db.execute(insert(_sqlite_sequence).values(name=name, seq=self._highest_id(db)))
+            db.execute(
+                sqlite_insert(ActivityPartition.__table__)
+                .values(name=name, range_start=start, range_end=next_month(start), archived=False)
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+            pending.add(name)
+
+        return table
+
+    def for_range(
+        self,
+        db: DBSession,
+        since: datetime,
+        until: Optional[datetime] = None,
+        include_archived: bool = False
+    ) -> list[Table]:
+        """Partitions overlapping [since, until), oldest first (active ones only by default)."""
+        query = select(ActivityPartition.name).where(ActivityPartition.range_end > since)
+        if not include_archived:
+            query = query.where(ActivityPartition.archived.is_(False))
+        if until is not None:
+            query = query.where(ActivityPartition.range_start < until)
+        names = db.execute(query.order_by(ActivityPartition.range_start)).scalars()
+        return [activity_partition_table(name) for name in names]
+
+    def catalog(self, db: DBSession) -> list[ActivityPartition]:
+        """Every cataloged partition, oldest first."""
+        return db.query(ActivityPartition).order_by(ActivityPartition.range_start).all()
+
+    def archive(self, db: DBSession, month: datetime):
+        """
+        Take a month out of the query path without touching its rows (O(1)).
+
+        Raises:
+            ValueError: If the month has no partition or is the current month
+        """
+        partition = self._get(db, month)
+        if partition.range_end > datetime.utcnow():
+            raise ValueError(f"{partition.name} is still receiving writes")
+        partition.archived = True
+
+    def restore(self, db: DBSession, month: datetime):
+        """Put an archived month back into the query path."""
+        self._get(db, month).archived = False
+
+    def drop(self, db: DBSession, month: datetime, require_archived: bool = True):
+        """
+        Delete a month's table and catalog entry.
+
+        Args:
+            require_archived: Refuse to drop a partition still being queried
+                (the retention job drops active partitions it has emptied)
+
+        Raises:
+            ValueError: If the month has no partition or is not archived
+        """
+        partition = self._get(db, month)
+        if require_archived and not partition.archived:
+            raise ValueError(f"Archive {partition.name} before dropping it")
+        table = activity_partition_table(partition.name)
+        table.drop(bind=db.connection(), checkfirst=True)
+        db.delete(partition)
+        Base.metadata.remove(table)
+        self._known.discard(partition.name)
+
+    def adopt_unpartitioned(self, db: DBSession) -> int:
+        """
+        Move rows left in the original `activities` table into monthly
+        partitions. Runs once at startup; a no-op when it is empty.
+
+        Returns:
+            Number of rows moved
+        """
+        legacy = Activity.__table__
+        months = db.execute(
+            select(func.strftime("%Y-%m", legacy.c.created_at)).distinct()
+            .where(legacy.c.created_at.isnot(None))
+        ).scalars().all()
+        if not months:
+            return 0
+
+        columns = [column.name for column in legacy.columns]
+        moved = 0
+        for month in months:
+            start = datetime.strptime(month, "%Y-%m")
+            table = self.for_write(db, start)
+            moved += db.execute(
+                insert(table).from_select(
+                    columns,
+                    select(*legacy.columns).where(
+                        legacy.c.created_at >= start, legacy.c.created_at < next_month(start)
+                    )
+                )
+            ).rowcount
+        # Rows without a timestamp cannot be routed; leave them where they are
+        db.execute(legacy.delete().where(legacy.c.created_at.isnot(None)))
+        print(f"🗃️  Moved {moved} activity rows into monthly partitions")
+        return moved
+
+    def _highest_id(self, db: DBSession) -> int:
+        """Largest activity id in use or handed out in any table, archived ones included."""
+        names = db.execute(select(ActivityPartition.name)).scalars().all()
+        sources = [Activity.__table__] + [activity_partition_table(name) for name in names]
+        ids = union_all(
+            *(select(func.max(table.c.id).label("id")) for table in sources),
+            select(func.max(_sqlite_sequence.c.seq)).where(_sqlite_sequence.c.name.in_(names))
+        ).subquery()
+        return db.execute(select(func.max(ids.c.id))).scalar() or 0
+
+    def _get(self, db: DBSession, month: datetime) -> ActivityPartition:
+        partition = db.get(ActivityPartition, partition_name(month_start(month)))
+        if partition is None:
+            raise ValueError(f"No activity partition for {month:%Y-%m}")
+        return partition
+
+    def _promote(self, created: set[str]):
+        self._known.update(created)
+
+
+def _pending_partitions(db: DBSession) -> set[str]:
+    """Partitions this session created in its current transaction."""
+    return db.info.setdefault("new_partitions", set())
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _promote_new_partitions(db: DBSession):
+    created = db.info.pop("new_partitions", None)
+    if created:
+        activity_partitions._promote(created)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_new_partitions(db: DBSession):
+    db.info.pop("new_partitions", None)
+
+
+activity_partitions = ActivityPartitions()
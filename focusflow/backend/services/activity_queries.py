@@ -0,0 +1,86 @@
+"""
+Activity Queries - Shared aggregate queries over logged activities.
+
+Activities store integer domain/url/title IDs (see database.Domain etc.),
+so aggregations group on the integer key and join the dimension table only
+for the handful of rows they return. Activity rows live in monthly
+partitions (services/activity_partitions.py); each query reads only the
+partitions overlapping its time range, plus the hourly rollup of rows
+past the retention window (services/activity_rollup.py).
+"""
+
+from datetime import datetime
+from sqlalchemy import Table, func, select, union_all
+from sqlalchemy.orm import Session as DBSession
+
+from database import ActivityHourly, Domain
+from services.activity_partitions import activity_partitions
+
+
+def _partition_rows(tables: list[Table], since: datetime, *columns: str, where=None) -> list:
+    """Select `columns` from each partition's rows created since `since`."""
+    selects = []
+    for table in tables:
+        query = select(*(table.c[name] for name in columns)).where(table.c.created_at >= since)
+        if where is not None:
+            query = query.where(where(table))
+        selects.append(query)
+    return selects
+
+
+def activity_totals(db: DBSession, since: datetime) -> tuple[int, int]:
+    """
+    Count and total duration of activities logged since a point in time.
+
+    Returns:
+        (activity_count, total_duration_ms)
+    """
+    count, total_ms = db.execute(
+        select(
+            func.coalesce(func.sum(ActivityHourly.activity_count), 0),
+            func.coalesce(func.sum(ActivityHourly.total_duration_ms), 0)
+        ).where(ActivityHourly.hour >= since)
+    ).one()
+
+    tables = activity_partitions.for_range(db, since)
+    if tables:
+        selects = _partition_rows(tables, since, "duration_ms")
+        rows = (selects[0] if len(selects) == 1 else union_all(*selects)).subquery()
+        raw_count, raw_ms = db.execute(
+            select(func.count(), func.coalesce(func.sum(rows.c.duration_ms), 0))
+        ).one()
+        count += raw_count
+        total_ms += raw_ms
+
+    return count, total_ms
+
+
+def top_domains(db: DBSession, since: datetime, limit: int = 5) -> list[tuple[str, int]]:
+    """
+    Domains with the most tracked time since a point in time.
+
+    Returns:
+        List of (domain, total_duration_ms), largest first
+    """
+    rolled_up = (
+        select(ActivityHourly.domain_id, ActivityHourly.total_duration_ms.label("duration_ms"))
+        .where(ActivityHourly.hour >= since, ActivityHourly.domain_id.isnot(None))
+    )
+    rows = union_all(rolled_up, *_partition_rows(
+        activity_partitions.for_range(db, since), since, "domain_id", "duration_ms",
+        where=lambda table: table.c.domain_id.isnot(None)
+    )).subquery()
+
+    totals = (
+        select(rows.c.domain_id, func.sum(rows.c.duration_ms).label("total_ms"))
+        .group_by(rows.c.domain_id)
+        .order_by(func.sum(rows.c.duration_ms).desc())
+        .limit(limit)
+        .subquery()
+    )
+    result = db.execute(
+        select(Domain.value, totals.c.total_ms)
+        .join(totals, Domain.id == totals.c.domain_id)
+        .order_by(totals.c.total_ms.desc())
+    )
+    return [(domain, total_ms or 0) for domain, total_ms in result]
@@ -0,0 +1,216 @@
+"""
+Activity Rollup - Retention job that compacts old raw activities.
+
+Raw per-tab rows are only needed at full resolution for recent days;
+older history is only ever summed by task or domain. Every
+`ACTIVITY_ROLLUP_INTERVAL_MINUTES` this job folds rows older than
+`ACTIVITY_RETENTION_DAYS` into `activity_hourly` (one row per hour, task
+and domain) and deletes them, `ACTIVITY_ROLLUP_BATCH_SIZE` rows per
+transaction so ingestion never waits long on the SQLite write lock.
+Partitions it empties are dropped, and freed pages are returned to the
+filesystem with incremental VACUUM.
+
+services/activity_queries.py unions the rollup with the raw tail, so
+totals are unchanged; the rolled-up range just has hour granularity.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import Table, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as DBSession
+
+from config import settings
+from database import SessionLocal, ActivityHourly, ActivityPartition, activity_partition_table, run_write_db
+from services.activity_partitions import activity_partitions
+
+# Pages handed back per incremental VACUUM step (4 MB at the default page size)
+VACUUM_PAGES_PER_STEP = 1000
+
+# Unique (hour, task, domain) index the upsert targets, NULL keys included
+_ROLLUP_KEY = next(
+    index for index in ActivityHourly.__table__.indexes if index.name == "ix_activity_hourly_rollup_key"
+)
+
+
+async def _run_inline(fn, *args):
+    return fn(*args)
+
+
+class ActivityRollupJob:
+    """Periodic background job; `run_once` can also be called directly."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], DBSession] = SessionLocal,
+        retention_days: int = 30,
+        interval_minutes: int = 60,
+        batch_size: int = 5000
+    ):
+        self.session_factory = session_factory
+        self.retention = timedelta(days=retention_days)
+        self.interval = interval_minutes * 60
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Launch the periodic job (first run happens immediately)."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        print(f"🧹 Activity rollup enabled (raw rows kept {self.retention.days} days)")
+
+    async def stop(self):
+        """Cancel the job; a batch already running finishes in its thread."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                rolled = await self.run(runner=run_write_db)
+                if rolled:
+                    print(f"🧹 Rolled {rolled} raw activities into hourly totals")
+            except Exception as e:
+                print(f"❌ Activity rollup failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Roll up every raw activity older than the retention window.
+
+        Returns:
+            Number of raw rows rolled up and deleted
+        """
+        return asyncio.run(self.run(now))
+
+    async def run(self, now: Optional[datetime] = None, runner: Callable[..., Awaitable] = _run_inline) -> int:
+        """
+        Same as run_once, with every transaction passed to `runner`.
+
+        The background job runs each batch, partition drop and VACUUM step
+        as its own run_write_db call, so uploads queued on the writer get
+        their turn in between instead of waiting for the whole rollup.
+        """
+        cutoff = (now or datetime.utcnow()) - self.retention
+        rolled = 0
+        for name, range_start, range_end in await runner(self._expired_partitions, cutoff):
+            while batch_rows := await runner(self._roll_up_step, name, cutoff):
+                rolled += batch_rows
+            # A month entirely past the cutoff is now empty; drop its table
+            if range_end <= cutoff:
+                await runner(self._drop_if_empty, name, range_start)
+
+        free_pages = await runner(self._free_pages)
+        for _ in range(0, free_pages, VACUUM_PAGES_PER_STEP):
+            await runner(self._execute_script, f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP});")
+        if free_pages:
+            # In WAL mode the file only shrinks once the WAL is checkpointed
+            await runner(self._execute_script, "PRAGMA wal_checkpoint(TRUNCATE);")
+        return rolled
+
+    def _expired_partitions(self, cutoff: datetime) -> list[tuple[str, datetime, datetime]]:
+        """(name, range_start, range_end) of live partitions starting before the cutoff, oldest first."""
+        db = self.session_factory()
+        try:
+            return [
+                (partition.name, partition.range_start, partition.range_end)
+                for partition in db.query(ActivityPartition).filter(
+                    ActivityPartition.range_start < cutoff,
+                    ActivityPartition.archived.is_(False)
+                ).order_by(ActivityPartition.range_start)
+            ]
+        finally:
+            db.close()
+
+    def _roll_up_step(self, name: str, cutoff: datetime) -> int:
+        """Roll up and commit one batch of a partition."""
+        db = self.session_factory()
+        try:
+            batch_rows = self._roll_up_batch(db, activity_partition_table(name), cutoff)
+            db.commit()
+            return batch_rows
+        finally:
+            db.close()
+
+    def _drop_if_empty(self, name: str, range_start: datetime):
+        db = self.session_factory()
+        try:
+            if db.execute(select(activity_partition_table(name).c.id).limit(1)).first() is None:
+                activity_partitions.drop(db, range_start, require_archived=False)
+                db.commit()
+        finally:
+            db.close()
+
+    def _roll_up_batch(self, db: DBSession, table: Table, cutoff: datetime) -> int:
+        """Fold the oldest `batch_size` expired rows of a partition into the rollup."""
+        oldest = (
+            select(table.c.id)
+            .where(table.c.created_at < cutoff)
+            .order_by(table.c.id)
+            .limit(self.batch_size)
+            .subquery()
+        )
+        last_id = db.execute(select(func.max(oldest.c.id))).scalar()
+        if last_id is None:
+            return 0
+
+        in_batch = (table.c.created_at < cutoff) & (table.c.id <= last_id)
+        # Same text format SQLAlchemy uses for DateTime on SQLite
+        hour = func.strftime("%Y-%m-%d %H:00:00.000000", table.c.created_at)
+        hourly = ActivityHourly.__table__
+
+        upsert = sqlite_insert(hourly).from_select(
+            ["hour", "task_name", "domain_id", "activity_count", "total_duration_ms"],
+            select(hour, table.c.task_name, table.c.domain_id, func.count(),
+                   func.coalesce(func.sum(table.c.duration_ms), 0))
+            .where(in_batch)
+            .group_by(hour, table.c.task_name, table.c.domain_id)
+        )
+        db.execute(upsert.on_conflict_do_update(
+            index_elements=_ROLLUP_KEY.expressions,
+            set_={
+                "activity_count": hourly.c.activity_count + upsert.excluded.activity_count,
+                "total_duration_ms": hourly.c.total_duration_ms + upsert.excluded.total_duration_ms,
+            }
+        ))
+        return db.execute(table.delete().where(in_batch)).rowcount
+
+    def _free_pages(self) -> int:
+        """Free pages incremental VACUUM can return (0 unless auto_vacuum is INCREMENTAL)."""
+        db = self.session_factory()
+        try:
+            connection = db.connection()
+            if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+                return 0
+            return connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        finally:
+            db.close()
+
+    def _execute_script(self, script: str):
+        # executescript steps a pragma to completion; a plain execute()
+        # would release a single page of incremental_vacuum
+        db = self.session_factory()
+        try:
+            db.connection().connection.dbapi_connection.executescript(script)
+        finally:
+            db.close()
+
+
+# Process-wide job; started at startup unless ACTIVITY_RETENTION_DAYS is 0
+activity_rollup = ActivityRollupJob(
+    retention_days=settings.activity_retention_days,
+    interval_minutes=settings.activity_rollup_interval_minutes,
+    batch_size=settings.activity_rollup_batch_size,
+)
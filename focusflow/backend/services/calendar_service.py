@@ -2,23 +2,54 @@
 Calendar Service - Google Calendar integration.
 
 Handles OAuth authentication and calendar operations.
+
+The Google client libraries are imported on first use rather than at
+module load: googleapiclient.discovery and the OAuth stack are most of the
+app's import time, and deployments that never connect a calendar should
+not pay for them. scripts/check_import_time.py guards this.
+
+Routers build a CalendarService per request, so what is expensive to set
+up lives at module level: the credentials from token.json (re-read only
+when the file changes), the parsed calendar v3 discovery document, and
+the service built from them (rebuilt only for new credentials).
 """
 
+import json
 import os
-from typing import Optional
+import threading
+from typing import TYPE_CHECKING, Optional
 from datetime import datetime
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 
 from config import settings
 from models import CalendarEvent
 
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
 
 # OAuth scopes for Google Calendar
 SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
 
+# token file -> (mtime_ns, credentials loaded from it)
+_token_cache: dict[str, tuple[int, "Credentials"]] = {}
+
+# Parsed calendar v3 discovery document (~130 KB of JSON)
+_discovery_document: Optional[dict] = None
+
+# (credentials, service, events collection) per thread: the service's
+# httplib2 connection is not thread-safe, so it is never shared between
+# threads. service.events() generates its methods from the discovery
+# document on every call, so the collection is kept too.
+_services = threading.local()
+
+
+def _calendar_discovery_document() -> dict:
+    global _discovery_document
+    if _discovery_document is None:
+        from googleapiclient.discovery_cache import get_static_doc
+        _discovery_document = json.loads(get_static_doc("calendar", "v3"))
+    return _discovery_document
+
 
 class CalendarService:
     """Service for Google Calendar integration."""
@@ -27,23 +58,37 @@ class CalendarService:
         self.client_id = settings.google_client_id
         self.client_secret = settings.google_client_secret
         self.redirect_uri = settings.google_redirect_uri
-        self._credentials: Optional[Credentials] = None
+        self._credentials: Optional["Credentials"] = None
         self.token_file = "token.json"
         self._load_credentials()
 
     def _load_credentials(self):
         """Load credentials from local file if available."""
-        if os.path.exists(self.token_file):
-            try:
-                self._credentials = Credentials.from_authorized_user_file(self.token_file, SCOPES)
-            except Exception as e:
-                print(f"Error loading token: {e}")
+        try:
+            mtime = os.stat(self.token_file).st_mtime_ns
+        except FileNotFoundError:
+            return
+
+        cached = _token_cache.get(self.token_file)
+        if cached and cached[0] == mtime:
+            self._credentials = cached[1]
+            return
+
+        from google.oauth2.credentials import Credentials
+        try:
+            self._credentials = Credentials.from_authorized_user_file(self.token_file, SCOPES)
+            _token_cache[self.token_file] = (mtime, self._credentials)
+        except Exception as e:
+            print(f"Error loading token: {e}")
 
     def _save_credentials(self):
         """Save credentials to local file."""
         if self._credentials:
             with open(self.token_file, "w") as token:
                 token.write(self._credentials.to_json())
+            # These are the credentials the file now holds; a refresh keeps
+            # the same object, so its built service stays valid
+            _token_cache[self.token_file] = (os.stat(self.token_file).st_mtime_ns, self._credentials)
 
     def get_auth_url(self) -> str:
         """
@@ -52,6 +97,7 @@ class CalendarService:
         if not self.client_id or not self.client_secret:
             raise Exception("Google Client ID/Secret not configured in .env")
 
+        from google_auth_oauthlib.flow import Flow
         flow = Flow.from_client_config(
             {
                 "web": {
@@ -72,6 +118,7 @@ class CalendarService:
         Handle OAuth callback and store credentials.
         """
         try:
+            from google_auth_oauthlib.flow import Flow
             flow = Flow.from_client_config(
                 {
                     "web": {
@@ -104,8 +151,21 @@ class CalendarService:
                 self._save_credentials()
             else:
                 return None
-                
-        return build("calendar", "v3", credentials=self._credentials)
+
+        cached = getattr(_services, "entry", None)
+        if cached and cached[0] is self._credentials:
+            return cached[1]
+
+        from googleapiclient.discovery import build_from_document
+        service = build_from_document(_calendar_discovery_document(), credentials=self._credentials)
+        _services.entry = (self._credentials, service, service.events())
+        return service
+
+    def _get_events(self):
+        """The authenticated service's events collection, or None."""
+        if not self._get_service():
+            return None
+        return _services.entry[2]
 
     async def get_events(
         self,
@@ -115,15 +175,16 @@ class CalendarService:
         """
         Get calendar events for a date range.
         """
-        service = self._get_service()
-        if not service:
+        events_api = self._get_events()
+        if not events_api:
             return []
+        from googleapiclient.errors import HttpError
 
         time_min = f"{start_date}T00:00:00Z"
         time_max = f"{end_date}T23:59:59Z"
 
         try:
-            events_result = service.events().list(
+            events_result = events_api.list(
                 calendarId="primary",
                 timeMin=time_min,
                 timeMax=time_max,
@@ -159,9 +220,10 @@ class CalendarService:
         """
         Create a new calendar event.
         """
-        service = self._get_service()
-        if not service:
+        events_api = self._get_events()
+        if not events_api:
             raise Exception("Not authenticated")
+        from googleapiclient.errors import HttpError
 
         event = {
             "summary": title,
@@ -177,7 +239,7 @@ class CalendarService:
             event["description"] = description
 
         try:
-            created = service.events().insert(
+            created = events_api.insert(
                 calendarId="primary",
                 body=event
             ).execute()
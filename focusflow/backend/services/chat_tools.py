@@ -15,7 +15,8 @@ from sqlalchemy.orm import Session as DBSession
 
 from services.calendar_service import CalendarService
 from services.prediction_engine import PredictionEngine
-from database import Session, Activity, Setting
+from services.activity_queries import activity_totals, top_domains
+from database import Session, Setting, run_db
 
 
 # Tool definitions for the LLM (OpenAI function calling format)
@@ -151,11 +152,11 @@ class ChatToolExecutor:
             if tool_name == "create_calendar_event":
                 return await self._create_calendar_event(arguments)
             elif tool_name == "get_task_prediction":
-                return self._get_task_prediction(arguments)
+                return await run_db(self._get_task_prediction, arguments)
             elif tool_name == "get_upcoming_events":
                 return await self._get_upcoming_events(arguments)
             elif tool_name == "get_productivity_stats":
-                return self._get_productivity_stats(arguments)
+                return await run_db(self._get_productivity_stats, arguments)
             elif tool_name == "schedule_task_with_prediction":
                 return await self._schedule_task_with_prediction(arguments)
             else:
@@ -260,10 +261,8 @@ class ChatToolExecutor:
             Session.start_time >= start_time
         ).all()
 
-        # Get activities
-        activities = self.db.query(Activity).filter(
-            Activity.created_at >= start_time
-        ).all()
+        # Get activity totals
+        activity_count, total_ms = activity_totals(self.db, start_time)
 
         # Calculate stats
         if sessions:
@@ -272,24 +271,18 @@ class ChatToolExecutor:
         else:
             avg_focus = 0
 
-        total_ms = sum(a.duration_ms for a in activities if a.duration_ms)
         hours_tracked = total_ms / (1000 * 60 * 60)
 
         # Get top domains
-        domain_time = {}
-        for a in activities:
-            if a.domain:
-                domain_time[a.domain] = domain_time.get(a.domain, 0) + (a.duration_ms or 0)
-
-        top_domains = sorted(domain_time.items(), key=lambda x: x[1], reverse=True)[:5]
+        domains = top_domains(self.db, start_time, limit=5)
 
         return {
             "time_period": time_period,
             "total_sessions": len(sessions),
             "average_focus_score": round(avg_focus, 1),
             "hours_tracked": round(hours_tracked, 2),
-            "total_activities": len(activities),
-            "top_sites": [{"domain": d, "minutes": round(t / 60000, 1)} for d, t in top_domains]
+            "total_activities": activity_count,
+            "top_sites": [{"domain": d, "minutes": round(t / 60000, 1)} for d, t in domains]
         }
 
     async def _schedule_task_with_prediction(self, args: dict) -> dict:
@@ -300,7 +293,7 @@ class ChatToolExecutor:
         conservativity = args.get("conservativity", 0.5)
 
         # Get prediction
-        prediction = self._get_task_prediction({
+        prediction = await run_db(self._get_task_prediction, {
             "task_category": task_category,
             "conservativity": conservativity
         })
@@ -0,0 +1,80 @@
+"""
+Daily Stats - Incrementally maintained dashboard totals.
+
+GET /api/stats used to scan today's sessions and activities, every
+completed prediction and the whole sessions table on each refresh. The
+writers now apply their changes as deltas to `daily_stats` instead: the
+row for the affected UTC day and the all-time row, in the caller's
+transaction, so the totals commit or roll back with the rows they
+describe. Reading the dashboard is then two primary-key lookups.
+
+Existing databases are backfilled by schema migration 5.
+"""
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as DBSession
+
+from database import DailyStats
+
+# Key of the row summing every day
+ALL_TIME = "all"
+
+COUNTERS = (
+    "session_count", "focus_score_sum", "focus_score_count",
+    "activity_count", "duration_ms_sum",
+    "prediction_error_sum", "prediction_error_count",
+)
+
+
+def day_key(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d")
+
+
+def prediction_error(predicted_minutes: int, actual_minutes: Optional[int]) -> Optional[float]:
+    """Absolute percentage error of one prediction, or None if it has no usable actual."""
+    if not actual_minutes or actual_minutes <= 0:
+        return None
+    return abs(predicted_minutes - actual_minutes) / actual_minutes
+
+
+def _build_upsert():
+    table = DailyStats.__table__
+    stmt = sqlite_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=["day"],
+        set_={column: table.c[column] + stmt.excluded[column] for column in COUNTERS}
+    )
+
+
+_UPSERT = _build_upsert()
+
+
+def add(db: DBSession, *changes: tuple[datetime, dict[str, float]]):
+    """
+    Add counter deltas to their days and the all-time row.
+
+    Args:
+        db: Session whose transaction the change belongs to
+        changes: (moment, {counter: delta}) pairs; unnamed counters are 0
+    """
+    totals: dict[str, dict[str, float]] = {}
+    for moment, deltas in changes:
+        for day in (day_key(moment), ALL_TIME):
+            row = totals.setdefault(day, dict.fromkeys(COUNTERS, 0))
+            for column, delta in deltas.items():
+                row[column] += delta
+
+    rows = [{"day": day, **row} for day, row in totals.items() if any(row.values())]
+    if rows:
+        db.execute(_UPSERT, rows)
+
+
+def dashboard_rows(db: DBSession, today: datetime) -> tuple[Optional[DailyStats], Optional[DailyStats]]:
+    """(today's row, all-time row); either is None until something is recorded."""
+    rows = {
+        row.day: row
+        for row in db.query(DailyStats).filter(DailyStats.day.in_([day_key(today), ALL_TIME]))
+    }
+    return rows.get(day_key(today)), rows.get(ALL_TIME)
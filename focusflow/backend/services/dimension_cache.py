@@ -0,0 +1,108 @@
+"""
+Dimension Cache - In-process interning of domain, URL and title strings.
+
+Activity rows store integer surrogate keys into the `domains`, `urls` and
+`titles` tables. Ingestion resolves strings to IDs through these caches, so
+the common case (a domain or page seen before) costs a dict lookup rather
+than a database round trip. Misses are resolved in bulk with one
+INSERT OR IGNORE plus one SELECT per table.
+
+IDs learned inside a transaction are held on the session until it
+commits; a rollback discards them, so the cache never hands out an ID
+whose row was rolled back. Dimension rows are never updated or deleted,
+which keeps the cache valid across processes sharing the database.
+"""
+
+from typing import Iterable
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as DBSession
+
+from database import SessionLocal, Domain, Url, Title
+
+
+# Keeps each IN (...) lookup well under SQLite's bound-parameter limit
+_LOOKUP_CHUNK = 500
+
+
+class DimensionCache:
+    """Maps string values of one dimension table to their integer IDs."""
+
+    def __init__(self, model, max_entries: int = 100_000):
+        self.model = model
+        self.max_entries = max_entries
+        self._ids: dict[str, int] = {}
+
+    def resolve(self, db: DBSession, values: Iterable[str]) -> dict[str, int]:
+        """
+        Return IDs for `values`, creating dimension rows for new strings.
+
+        Args:
+            db: Session whose transaction the new rows belong to
+            values: Strings to resolve (duplicates are fine)
+
+        Returns:
+            Dict of value -> ID covering every requested value
+        """
+        pending = _pending_ids(db, self)
+        resolved = {}
+        missing = set()
+
+        for value in values:
+            if value in resolved:
+                continue
+            cached = self._ids.get(value)
+            if cached is None:
+                cached = pending.get(value)
+            if cached is None:
+                missing.add(value)
+            else:
+                resolved[value] = cached
+
+        if missing:
+            table = self.model.__table__
+            db.execute(
+                sqlite_insert(table).on_conflict_do_nothing(index_elements=["value"]),
+                [{"value": value} for value in missing]
+            )
+            missing = list(missing)
+            for start in range(0, len(missing), _LOOKUP_CHUNK):
+                chunk = missing[start:start + _LOOKUP_CHUNK]
+                for row_id, value in db.execute(
+                    select(table.c.id, table.c.value).where(table.c.value.in_(chunk))
+                ):
+                    pending[value] = row_id
+                    resolved[value] = row_id
+
+        return resolved
+
+    def _promote(self, learned: dict[str, int]):
+        """Make IDs from a committed transaction visible to all sessions."""
+        self._ids.update(learned)
+        # Evict oldest entries first; misses just cost one lookup again
+        while len(self._ids) > self.max_entries:
+            del self._ids[next(iter(self._ids))]
+
+    def clear(self):
+        self._ids.clear()
+
+
+def _pending_ids(db: DBSession, cache: DimensionCache) -> dict[str, int]:
+    """IDs this session learned for `cache` in its current transaction."""
+    return db.info.setdefault("interned_ids", {}).setdefault(cache, {})
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _promote_interned_ids(db: DBSession):
+    for cache, learned in db.info.pop("interned_ids", {}).items():
+        cache._promote(learned)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_interned_ids(db: DBSession):
+    db.info.pop("interned_ids", None)
+
+
+domain_ids = DimensionCache(Domain, max_entries=10_000)
+url_ids = DimensionCache(Url)
+title_ids = DimensionCache(Title)
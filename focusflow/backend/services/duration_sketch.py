@@ -0,0 +1,314 @@
+"""
+Duration Sketch - Per-task quantile sketches of session durations.
+
+PredictionEngine needs the median and 90th percentile duration of every
+session whose task name contains a category. Rather than loading and
+sorting those sessions on each call, every session category (the
+normalized task name, see database.session_category) keeps a log-bucket
+histogram of its session durations (the DDSketch scheme) in
+`duration_sketch_buckets`, and its exact count, sum and sum of squares in
+`duration_sketches`. Sketches merge by adding bucket counts, so a query
+is answered by summing the buckets of its matching categories: the cost
+depends on how many categories match and their occupied buckets, not on
+how many sessions there are.
+
+Categories containing the query are found through `duration_sketch_fts`,
+an FTS5 trigram index over the category names that serves
+`LIKE '%query%'` for queries of three or more characters (a query
+containing % or _ is matched literally through an ESCAPE clause, which
+scans the index instead). When SQLite
+lacks the trigram tokenizer (before 3.34), the lookup scans
+`duration_sketches` instead, which holds one row per category.
+
+Error bounds (RELATIVE_ACCURACY = α = 1%):
+- Bucket i holds durations in (γ^(i-1), γ^i] ms with γ = (1+α)/(1-α) and
+  reports 2γ^i/(γ+1) for them, which is within α of every value in it.
+  Any order statistic read from the sketch is therefore within 1% of the
+  exact one: |estimate - exact| <= 0.01 * exact.
+- The median of an even count (mean of two order statistics) and
+  predict()'s interpolation between median and p90 are weighted averages
+  of such values and keep the 1% bound. predicted_minutes can then differ
+  by one more minute through rounding.
+- min and max are order statistics too (within 1%). count and mean are
+  exact; the standard deviation is exact up to floating-point rounding.
+
+ActivityIngestor moves a session's duration between buckets in the
+transaction that opens or extends the session, which also invalidates
+the cached predictions matching that category on commit
+(services/prediction_cache.py). Schema migration 7 rebuilds every sketch
+from `sessions`.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import Column, MetaData, String, Table, func, inspect, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as DBSession
+
+from database import DurationSketch, DurationSketchBucket, session_category
+from services.prediction_cache import prediction_cache
+
+# Relative error of every quantile read from a sketch
+RELATIVE_ACCURACY = 0.01
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+# FTS5 virtual table created (when supported) by schema migration 7
+duration_sketch_fts = Table("duration_sketch_fts", MetaData(), Column("category", String))
+_has_fts: Optional[bool] = None
+
+# summarize_many() queries per statement, under SQLite's 500-term compound SELECT limit
+_QUERIES_PER_STATEMENT = 250
+
+
+def bucket_index(duration_ms: float) -> int:
+    """Bucket holding a (positive) duration."""
+    return math.ceil(math.log(duration_ms) / _LOG_GAMMA)
+
+
+def bucket_value(index: int) -> float:
+    """Duration (ms) reported for every value in a bucket."""
+    return 2 * _GAMMA ** index / (_GAMMA + 1)
+
+
+def _build_upserts():
+    totals = DurationSketch.__table__
+    totals_stmt = sqlite_insert(totals)
+    buckets = DurationSketchBucket.__table__
+    buckets_stmt = sqlite_insert(buckets)
+    return (
+        totals_stmt.on_conflict_do_update(
+            index_elements=["category"],
+            set_={
+                column: totals.c[column] + totals_stmt.excluded[column]
+                for column in ("session_count", "duration_ms_sum", "duration_ms_sq_sum")
+            }
+        ),
+        buckets_stmt.on_conflict_do_update(
+            index_elements=["category", "bucket"],
+            set_={"count": buckets.c.count + buckets_stmt.excluded.count}
+        ),
+    )
+
+
+_TOTALS_UPSERT, _BUCKETS_UPSERT = _build_upserts()
+
+
+def record(db: DBSession, category: str, old_duration_ms: Optional[int], new_duration_ms: Optional[int]):
+    """
+    Replace one session's duration in its category's sketch.
+
+    Durations that are None or not positive are not part of the sketch,
+    so pass old_duration_ms=None for a new session.
+
+    Args:
+        db: Session whose transaction the session change belongs to
+        category: The session's category
+        old_duration_ms: Duration before the change
+        new_duration_ms: Duration after the change
+    """
+    old = old_duration_ms if old_duration_ms and old_duration_ms > 0 else None
+    new = new_duration_ms if new_duration_ms and new_duration_ms > 0 else None
+    if old == new:
+        return
+
+    db.execute(_TOTALS_UPSERT, {
+        "category": category,
+        "session_count": (new is not None) - (old is not None),
+        "duration_ms_sum": (new or 0) - (old or 0),
+        "duration_ms_sq_sum": float(new or 0) ** 2 - float(old or 0) ** 2,
+    })
+
+    moves: dict[int, int] = {}
+    if old is not None:
+        moves[bucket_index(old)] = moves.get(bucket_index(old), 0) - 1
+    if new is not None:
+        moves[bucket_index(new)] = moves.get(bucket_index(new), 0) + 1
+    rows = [{"category": category, "bucket": bucket, "count": delta} for bucket, delta in moves.items() if delta]
+    if rows:
+        db.execute(_BUCKETS_UPSERT, rows)
+    prediction_cache.stage_invalidation(db, category)
+
+
+@dataclass(frozen=True)
+class DurationSummary:
+    """Merged sketch of the sessions of one or more categories."""
+    count: int
+    duration_ms_sum: int
+    duration_ms_sq_sum: float
+    buckets: list[tuple[int, int]]  # (bucket, count), ascending
+
+    def value_at(self, rank: int) -> float:
+        """Estimate (ms) of the rank-th smallest duration, 0-based."""
+        return self.values_at([rank])[0]
+
+    def values_at(self, ranks: list[int]) -> list[float]:
+        """Estimates (ms) of several order statistics in one walk over the buckets."""
+        order = sorted(range(len(ranks)), key=ranks.__getitem__)
+        values = [bucket_value(self.buckets[-1][0])] * len(ranks)
+        position = 0
+        seen = 0
+        for bucket, count in self.buckets:
+            seen += count
+            while position < len(order) and ranks[order[position]] < seen:
+                values[order[position]] = bucket_value(bucket)
+                position += 1
+            if position == len(order):
+                break
+        return values
+
+    def _median_ranks(self) -> list[int]:
+        middle = self.count // 2
+        return [middle] if self.count % 2 else [middle - 1, middle]
+
+    def _percentile_rank(self, q: float) -> int:
+        """Same rank rule as sorted(durations)[int(n * q)]."""
+        return min(int(self.count * q), self.count - 1)
+
+    def median_ms(self) -> float:
+        values = self.values_at(self._median_ranks())
+        return sum(values) / len(values)
+
+    def percentile_ms(self, q: float) -> float:
+        """Same rank rule as sorted(durations)[int(n * q)]."""
+        return self.value_at(self._percentile_rank(q))
+
+    def median_and_percentile_ms(self, q: float) -> tuple[float, float]:
+        """median_ms() and percentile_ms(q) from a single walk."""
+        median_ranks = self._median_ranks()
+        *median_values, percentile = self.values_at(median_ranks + [self._percentile_rank(q)])
+        return sum(median_values) / len(median_values), percentile
+
+    def min_ms(self) -> float:
+        return self.value_at(0)
+
+    def max_ms(self) -> float:
+        return self.value_at(self.count - 1)
+
+    def mean_ms(self) -> float:
+        return self.duration_ms_sum / self.count
+
+    def stdev_ms(self) -> float:
+        """Sample standard deviation, like statistics.stdev (0 for one session)."""
+        if self.count < 2:
+            return 0.0
+        variance = (self.duration_ms_sq_sum - self.duration_ms_sum ** 2 / self.count) / (self.count - 1)
+        return math.sqrt(max(0.0, variance))
+
+
+def _category_names(db: DBSession):
+    """Column to match category names on: the trigram index when there is one."""
+    global _has_fts
+    if _has_fts is None:
+        _has_fts = inspect(db.connection()).has_table(duration_sketch_fts.name)
+    return duration_sketch_fts.c.category if _has_fts else DurationSketch.category
+
+
+def _contains(names, query: str):
+    """`names LIKE '%query%'`, with any % or _ in `query` matched literally."""
+    if "%" not in query and "_" not in query:
+        # An ESCAPE clause stops FTS5 from using the trigram index, so only
+        # queries that need one get it
+        return names.like(f"%{query}%")
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return names.like(f"%{escaped}%", escape="\\")
+
+
+def _matching_categories(db: DBSession, task_category: str):
+    """Subquery of the categories containing `task_category`, normalized like task names."""
+    names = _category_names(db)
+    return select(names).where(_contains(names, session_category(task_category) or ""))
+
+
+def _no_sessions() -> DurationSummary:
+    return DurationSummary(count=0, duration_ms_sum=0, duration_ms_sq_sum=0.0, buckets=[])
+
+
+def summarize(db: DBSession, task_category: str) -> DurationSummary:
+    """
+    Merged sketch of every category containing `task_category` (case-insensitive).
+
+    A blank category would match every session, so it matches none.
+    """
+    if not session_category(task_category):
+        return _no_sessions()
+    categories = _matching_categories(db, task_category)
+    count, duration_sum, duration_sq_sum = db.execute(
+        select(
+            func.sum(DurationSketch.session_count),
+            func.sum(DurationSketch.duration_ms_sum),
+            func.sum(DurationSketch.duration_ms_sq_sum),
+        ).where(DurationSketch.category.in_(categories))
+    ).one()
+    if not count:
+        return _no_sessions()
+
+    total = func.sum(DurationSketchBucket.count)
+    buckets = db.execute(
+        select(DurationSketchBucket.bucket, total)
+        .where(DurationSketchBucket.category.in_(categories))
+        .group_by(DurationSketchBucket.bucket)
+        .having(total > 0)
+        .order_by(DurationSketchBucket.bucket)
+    ).all()
+    return DurationSummary(
+        count=count, duration_ms_sum=duration_sum, duration_ms_sq_sum=duration_sq_sum,
+        buckets=[tuple(row) for row in buckets]
+    )
+
+
+def summarize_many(db: DBSession, task_categories: list[str]) -> dict[str, DurationSummary]:
+    """
+    summarize() for several categories at once.
+
+    The (query, matching category) pairs of every requested category are
+    one UNION ALL of index lookups, and the totals and buckets are summed
+    per query in one grouped statement each, so the number of round trips
+    does not grow with the number of categories.
+
+    Returns:
+        Summary for each of `task_categories`, keyed as given (blank ones
+        match no sessions, as in summarize())
+    """
+    summaries: dict[str, DurationSummary] = {}
+    queries = list(dict.fromkeys(filter(None, map(session_category, task_categories))))
+    names = _category_names(db)
+    for offset in range(0, len(queries), _QUERIES_PER_STATEMENT):
+        matches = union_all(*(
+            select(literal(query).label("query"), names.label("category")).where(_contains(names, query))
+            for query in queries[offset:offset + _QUERIES_PER_STATEMENT]
+        )).cte("matches")
+
+        totals = db.execute(
+            select(
+                matches.c.query,
+                func.sum(DurationSketch.session_count),
+                func.sum(DurationSketch.duration_ms_sum),
+                func.sum(DurationSketch.duration_ms_sq_sum),
+            )
+            .join(DurationSketch, DurationSketch.category == matches.c.category)
+            .group_by(matches.c.query)
+        ).all()
+
+        total = func.sum(DurationSketchBucket.count)
+        buckets: dict[str, list[tuple[int, int]]] = {}
+        for query, bucket, count in db.execute(
+            select(matches.c.query, DurationSketchBucket.bucket, total)
+            .join(DurationSketchBucket, DurationSketchBucket.category == matches.c.category)
+            .group_by(matches.c.query, DurationSketchBucket.bucket)
+            .having(total > 0)
+            .order_by(matches.c.query, DurationSketchBucket.bucket)
+        ):
+            buckets.setdefault(query, []).append((bucket, count))
+
+        for query, count, duration_sum, duration_sq_sum in totals:
+            if count:
+                summaries[query] = DurationSummary(
+                    count=count, duration_ms_sum=duration_sum, duration_ms_sq_sum=duration_sq_sum,
+                    buckets=buckets[query]
+                )
+
+    empty = _no_sessions()
+    return {c: summaries.get(session_category(c), empty) for c in task_categories}
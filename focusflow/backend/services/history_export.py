@@ -0,0 +1,184 @@
+"""
+History Export - Streams activity, session and prediction history as
+Apache Parquet or Arrow IPC for offline analysis.
+
+Rows are read with `yield_per`, so the SQLite cursor is stepped a batch
+at a time instead of fetching the whole result. Each batch is transposed
+into Arrow columns and written as one row group (Parquet) or record
+batch (Arrow stream). The encoded bytes are handed out as they are
+produced. Memory therefore stays at roughly one batch, whatever the
+table size.
+
+Activities are exported with their url/domain/title strings resolved,
+one partition after another. Rows already compacted into
+`activity_hourly` are not included. The export reads inside one
+explicit read transaction, so rows committed while it streams are not
+in the file. Under WAL that transaction holds back checkpoints until the
+download finishes.
+
+Requires `pyarrow` (in requirements.txt; the endpoint returns 501
+without it). It is imported on the first export rather than at startup.
+"""
+
+from importlib.util import find_spec
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Iterator
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session as DBSession
+
+from database import Activity, Domain, Prediction, Session, Title, Url, activity_partition_table
+from services.activity_partitions import activity_partitions
+
+if TYPE_CHECKING:
+    import pyarrow
+
+# Optional: pip install pyarrow
+PYARROW_AVAILABLE = find_spec("pyarrow") is not None
+
+
+# format -> (file extension, media type)
+EXPORT_FORMATS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrows", "application/vnd.apache.arrow.stream"),
+}
+
+EXPORT_TABLES = ("activities", "sessions", "predictions")
+
+
+def _pyarrow():
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+    return pyarrow
+
+
+def _schema(table: str) -> "pyarrow.Schema":
+    pyarrow = _pyarrow()
+    timestamp = pyarrow.timestamp("us")
+    columns = {
+        "activities": [
+            ("id", pyarrow.int64()), ("task_name", pyarrow.string()),
+            ("url", pyarrow.string()), ("domain", pyarrow.string()), ("title", pyarrow.string()),
+            ("duration_ms", pyarrow.int64()), ("start_time", timestamp), ("end_time", timestamp),
+            ("created_at", timestamp),
+        ],
+        "sessions": [
+            ("id", pyarrow.int64()), ("task_name", pyarrow.string()), ("category", pyarrow.string()),
+            ("start_time", timestamp), ("end_time", timestamp),
+            ("focus_score", pyarrow.float64()), ("tab_switches", pyarrow.int64()),
+            ("total_duration_ms", pyarrow.int64()), ("created_at", timestamp),
+        ],
+        "predictions": [
+            ("id", pyarrow.int64()), ("task_category", pyarrow.string()),
+            ("predicted_minutes", pyarrow.int64()), ("actual_minutes", pyarrow.int64()),
+            ("conservativity", pyarrow.float64()), ("created_at", timestamp),
+        ],
+    }[table]
+    return pyarrow.schema(columns)
+
+
+def _queries(db: DBSession, table: str) -> list[Select]:
+    """Statements whose rows, in order, make up the export of `table`."""
+    if table == "sessions":
+        return [select(*Session.__table__.columns).order_by(Session.id)]
+    if table == "predictions":
+        return [select(*Prediction.__table__.columns).order_by(Prediction.id)]
+
+    # Archived partitions are out of the query path but still history
+    tables = [Activity.__table__] + [
+        activity_partition_table(partition.name) for partition in activity_partitions.catalog(db)
+    ]
+    return [
+        select(
+            source.c.id, source.c.task_name, Url.value, Domain.value, Title.value,
+            source.c.duration_ms, source.c.start_time, source.c.end_time, source.c.created_at
+        )
+        .outerjoin(Url, Url.id == source.c.url_id)
+        .outerjoin(Domain, Domain.id == source.c.domain_id)
+        .outerjoin(Title, Title.id == source.c.title_id)
+        .order_by(source.c.id)
+        for source in tables
+    ]
+
+
+class _ChunkSink:
+    """Write-only file object that collects encoded bytes until drained."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_export(db: DBSession, table: str, fmt: str, batch_rows: int = 65_536) -> Iterator[bytes]:
+    """
+    Encode a table's history, yielding the file a piece at a time.
+
+    Args:
+        db: Session to read from (a read-only one is fine)
+        table: One of EXPORT_TABLES
+        fmt: "parquet" or "arrow" (Arrow IPC streaming format)
+        batch_rows: Rows per row group / record batch
+
+    Raises:
+        RuntimeError: If pyarrow is not installed
+    """
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Parquet/Arrow export requires the pyarrow package")
+
+    pyarrow = _pyarrow()
+    schema = _schema(table)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+
+    # One snapshot for the whole file. pysqlite leaves SELECTs in autocommit,
+    # so each statement (the partition catalog, then each partition) would
+    # otherwise see the database as of its own start; the read transaction
+    # ends when the caller closes (or rolls back) the session.
+    connection = db.connection()
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
+
+    # Statements run one after another as the previous one is exhausted;
+    # batches span statement boundaries, so only the last row group is short
+    rows = chain.from_iterable(
+        db.execute(query.execution_options(yield_per=batch_rows)) for query in _queries(db, table)
+    )
+    while batch := list(islice(rows, batch_rows)):
+        columns = zip(*batch)
+        writer.write_batch(pyarrow.record_batch(
+            [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        ))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def export_filename(table: str, fmt: str) -> str:
+    extension, _ = EXPORT_FORMATS[fmt]
+    return f"focusflow-{table}.{extension}"
@@ -0,0 +1,90 @@
+"""
+Prediction Accuracy - Running MAPE totals per prediction category.
+
+get_accuracy used to load every completed prediction (a table that grows
+with each GET /api/predictions) and recompute the mean absolute
+percentage error in Python. update_actual_duration now adds each
+prediction's error to `prediction_accuracy` instead, under the category
+and the UTC day the prediction was made plus the category's all-time
+row, in the transaction that records the actual duration. The totals
+across categories are daily_stats' prediction_error_* counters.
+
+Accuracy overall or for one category is then one primary-key lookup; a
+rolling window of N days reads at most N rows.
+
+Existing databases are backfilled by schema migration 8.
+"""
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as DBSession
+
+from database import DailyStats, PredictionAccuracy
+from services.daily_stats import ALL_TIME, day_key
+
+
+def _build_upsert():
+    table = PredictionAccuracy.__table__
+    stmt = sqlite_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=["task_category", "day"],
+        set_={column: table.c[column] + stmt.excluded[column] for column in ("error_sum", "error_count")}
+    )
+
+
+_UPSERT = _build_upsert()
+
+
+def add(db: DBSession, task_category: str, made_at: datetime, error_delta: float, count_delta: int):
+    """
+    Add to a category's error totals for the day a prediction was made and all time.
+
+    Args:
+        db: Session whose transaction the prediction change belongs to
+        task_category: The prediction's category
+        made_at: When the prediction was made
+        error_delta: Change in the sum of absolute percentage errors
+        count_delta: Change in the number of predictions with an actual duration
+    """
+    if not error_delta and not count_delta:
+        return
+    db.execute(_UPSERT, [
+        {"task_category": task_category, "day": day, "error_sum": error_delta, "error_count": count_delta}
+        for day in (day_key(made_at), ALL_TIME)
+    ])
+
+
+def error_totals(
+    db: DBSession,
+    task_category: Optional[str] = None,
+    since: Optional[datetime] = None
+) -> tuple[float, int]:
+    """
+    (sum of absolute percentage errors, number of predictions) with an actual duration.
+
+    Args:
+        task_category: Only this category's predictions (all when None)
+        since: Only predictions made on or after this moment's UTC day
+            (all time when None)
+    """
+    if task_category is None:
+        error_sum, error_count, day = (
+            DailyStats.prediction_error_sum, DailyStats.prediction_error_count, DailyStats.day
+        )
+        query = select(func.sum(error_sum), func.sum(error_count))
+    else:
+        error_sum, error_count, day = (
+            PredictionAccuracy.error_sum, PredictionAccuracy.error_count, PredictionAccuracy.day
+        )
+        query = select(func.sum(error_sum), func.sum(error_count)).where(
+            PredictionAccuracy.task_category == task_category
+        )
+
+    if since is None:
+        query = query.where(day == ALL_TIME)
+    else:
+        query = query.where(day >= day_key(since), day != ALL_TIME)
+    total, count = db.execute(query).one()
+    return total or 0.0, count or 0
@@ -0,0 +1,137 @@
+"""
+Prediction Cache - In-process LRU of PredictionEngine.predict results.
+
+The dashboard and chat tools ask for the same few categories over and
+over, and a prediction only changes when the duration sketch of a
+matching session category changes. Results are cached by (normalized
+category, conservativity), at most `PREDICTION_CACHE_SIZE` entries, least
+recently used evicted first.
+
+Invalidation is driven by the writes themselves: duration_sketch.record
+stages every category whose sketch it changes on the DB session, and when
+that session commits, each cached query contained in one of those
+categories (the substring rule predict() matches with) is dropped. A
+rollback discards the staged categories.
+
+A prediction computed from a snapshot taken before a concurrent commit
+must not be stored after that commit's invalidation has run, so every
+invalidation bumps a generation counter and a result is only cached if
+the generation is unchanged since its computation started.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable
+from sqlalchemy import event
+from sqlalchemy.orm import Session as DBSession
+
+from config import settings
+from database import SessionLocal, session_category
+from models import PredictionResponse
+
+
+class PredictionCache:
+    """Bounded LRU of predictions with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, float], PredictionResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_compute(
+        self,
+        task_category: str,
+        conservativity: float,
+        compute: Callable[[], PredictionResponse]
+    ) -> PredictionResponse:
+        """Cached prediction for the query, or compute() stored for next time."""
+        return self.get_many_or_compute(
+            [task_category], conservativity, lambda missing: {task_category: compute()}
+        )[task_category]
+
+    def get_many_or_compute(
+        self,
+        task_categories: list[str],
+        conservativity: float,
+        compute_many: Callable[[list[str]], dict[str, PredictionResponse]]
+    ) -> dict[str, PredictionResponse]:
+        """
+        Cached predictions for several categories; the misses are computed
+        together by one compute_many(categories) call.
+        """
+        results: dict[str, PredictionResponse] = {}
+        missing: dict[tuple[str, float], str] = {}
+        with self._lock:
+            for task_category in task_categories:
+                key = (session_category(task_category), conservativity)
+                cached = self._entries.get(key)
+                if cached is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    results[task_category] = cached
+                elif key not in missing:
+                    self.misses += 1
+                    missing[key] = task_category
+            generation = self._generation
+
+        if missing:
+            computed = compute_many(list(missing.values()))
+            with self._lock:
+                if generation == self._generation and self.maxsize > 0:
+                    for key, task_category in missing.items():
+                        self._entries[key] = computed[task_category]
+                        self._entries.move_to_end(key)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            for task_category in task_categories:
+                if task_category not in results:
+                    key = (session_category(task_category), conservativity)
+                    results[task_category] = computed[missing[key]]
+        return results
+
+    def stage_invalidation(self, db: DBSession, category: str):
+        """Drop predictions matching `category` once `db` commits."""
+        db.info.setdefault("changed_categories", set()).add(category)
+
+    def invalidate(self, categories: set[str]):
+        """Drop every cached query that is a substring of one of `categories`."""
+        with self._lock:
+            self._generation += 1
+            stale = [key for key in self._entries if any(key[0] in category for category in categories)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_size": self.maxsize,
+            }
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_changed_categories(db: DBSession):
+    changed = db.info.pop("changed_categories", None)
+    if changed:
+        prediction_cache.invalidate(changed)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_changed_categories(db: DBSession):
+    db.info.pop("changed_categories", None)
+
+
+prediction_cache = PredictionCache(maxsize=settings.prediction_cache_size)
@@ -8,15 +8,21 @@ Conservativity:
 - 0.0 (Aggressive): Uses median duration - assumes task will go smoothly
 - 1.0 (Conservative): Uses 90th percentile - accounts for unexpected delays
 - 0.5 (Balanced): Midpoint between median and p90
+
+Duration statistics come from the per-category quantile sketches in
+services/duration_sketch.py: percentiles are within 1% of the exact
+values, and nothing is loaded or sorted per call. Predictions are cached
+until a matching session changes (services/prediction_cache.py).
 """
 
+from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy.orm import Session as DBSession
-from sqlalchemy import func
-import statistics
 
-from database import Session, Prediction
+from database import Prediction
 from models import PredictionResponse
+from services import daily_stats, duration_sketch, prediction_accuracy
+from services.prediction_cache import prediction_cache
 
 
 class PredictionEngine:
@@ -37,8 +43,8 @@ class PredictionEngine:
         Predict duration for a task category.
 
         Algorithm:
-        1. Query historical sessions for this category
-        2. Calculate median and 90th percentile durations
+        1. Merge the duration sketches of task names matching this category
+        2. Read the median and 90th percentile durations from the sketch
         3. Apply conservativity: result = median + (p90 - median) * conservativity
         4. Return prediction with confidence based on sample size
 
@@ -49,41 +55,67 @@ class PredictionEngine:
         Returns:
             PredictionResponse with prediction details
         """
-        # Query historical sessions matching the category
-        sessions = self.db.query(Session).filter(
-            Session.task_name.ilike(f"%{task_category}%"),
-            Session.total_duration_ms.isnot(None),
-            Session.total_duration_ms > 0
-        ).all()
-
-        if not sessions:
-            return PredictionResponse(
-                predicted_minutes=self.DEFAULT_PREDICTION,
-                confidence="low",
-                based_on_sessions=0,
-                explanation=f"No historical data for '{task_category}'. Using default estimate of {self.DEFAULT_PREDICTION} minutes."
-            )
+        return prediction_cache.get_or_compute(
+            task_category, conservativity, lambda: self._predict(task_category, conservativity)
+        )
 
-        # Calculate durations in minutes
-        durations = [s.total_duration_ms / (1000 * 60) for s in sessions]
-        durations = [d for d in durations if d > 0]  # Filter out zero durations
+    def predict_many(
+        self,
+        task_categories: list[str],
+        conservativity: float = 0.5
+    ) -> dict[str, PredictionResponse]:
+        """
+        Predict durations for several task categories at once.
+
+        Same predictions as predict(), but the categories that are not
+        cached are summarized together (duration_sketch.summarize_many),
+        so the cost in queries does not grow with the number of categories.
+
+        Args:
+            task_categories: Categories of tasks (duplicates are fine)
+            conservativity: 0=aggressive (median), 1=conservative (p90)
+
+        Returns:
+            PredictionResponse for each of `task_categories`, keyed as given
+        """
+        return prediction_cache.get_many_or_compute(
+            task_categories, conservativity, lambda missing: self._predict_many(missing, conservativity)
+        )
 
-        if not durations:
+    def _predict(self, task_category: str, conservativity: float) -> PredictionResponse:
+        """Compute a prediction without the cache."""
+        # Merged duration sketch of the sessions matching the category
+        summary = duration_sketch.summarize(self.db, task_category)
+        return self._prediction(task_category, conservativity, summary)
+
+    def _predict_many(self, task_categories: list[str], conservativity: float) -> dict[str, PredictionResponse]:
+        """Compute predictions without the cache."""
+        summaries = duration_sketch.summarize_many(self.db, task_categories)
+        return {
+            task_category: self._prediction(task_category, conservativity, summary)
+            for task_category, summary in summaries.items()
+        }
+
+    def _prediction(
+        self,
+        task_category: str,
+        conservativity: float,
+        summary: duration_sketch.DurationSummary
+    ) -> PredictionResponse:
+        if not summary.count:
             return PredictionResponse(
                 predicted_minutes=self.DEFAULT_PREDICTION,
                 confidence="low",
                 based_on_sessions=0,
-                explanation="No valid duration data found. Using default estimate."
+                explanation=f"No historical data for '{task_category}'. Using default estimate of {self.DEFAULT_PREDICTION} minutes."
             )
 
-        # Calculate statistics
-        median = statistics.median(durations)
+        # Calculate statistics (in minutes): median and 90th percentile
+        median_ms, p90_ms = summary.median_and_percentile_ms(0.9)
+        median = median_ms / (1000 * 60)
 
-        if len(durations) >= 2:
-            # Calculate 90th percentile
-            sorted_durations = sorted(durations)
-            p90_index = int(len(sorted_durations) * 0.9)
-            p90 = sorted_durations[min(p90_index, len(sorted_durations) - 1)]
+        if summary.count >= 2:
+            p90 = p90_ms / (1000 * 60)
         else:
             # Estimate p90 if not enough data
             p90 = median * 1.5
@@ -98,9 +130,9 @@ class PredictionEngine:
         predicted = max(1, predicted)
 
         # Determine confidence based on sample size
-        if len(sessions) >= 20:
+        if summary.count >= 20:
             confidence = "high"
-        elif len(sessions) >= 5:
+        elif summary.count >= 5:
             confidence = "medium"
         else:
             confidence = "low"
@@ -108,7 +140,7 @@ class PredictionEngine:
         # Build explanation
         conservativity_label = "aggressive" if conservativity < 0.3 else "conservative" if conservativity > 0.7 else "balanced"
         explanation = (
-            f"Based on {len(sessions)} similar sessions. "
+            f"Based on {summary.count} similar sessions. "
             f"Median: {median:.0f}min, 90th percentile: {p90:.0f}min. "
             f"With {conservativity_label} setting ({conservativity:.0%}): {predicted:.0f}min."
         )
@@ -116,7 +148,7 @@ class PredictionEngine:
         return PredictionResponse(
             predicted_minutes=int(round(predicted)),
             confidence=confidence,
-            based_on_sessions=len(sessions),
+            based_on_sessions=summary.count,
             explanation=explanation
         )
 
@@ -143,9 +175,12 @@ class PredictionEngine:
             conservativity=conservativity
         )
         self.db.add(prediction)
+        self.db.flush()
+        prediction_id = prediction.id
+        # Read the ID before committing: refreshing afterwards would check the
+        # writer connection out again and hold it until the session closes
         self.db.commit()
-        self.db.refresh(prediction)
-        return prediction.id
+        return prediction_id
 
     def update_actual_duration(
         self,
@@ -163,42 +198,42 @@ class PredictionEngine:
             Prediction.id == prediction_id
         ).first()
         if prediction:
+            old_error = daily_stats.prediction_error(prediction.predicted_minutes, prediction.actual_minutes)
+            new_error = daily_stats.prediction_error(prediction.predicted_minutes, actual_minutes)
             prediction.actual_minutes = actual_minutes
+            error_delta = (new_error or 0) - (old_error or 0)
+            count_delta = (new_error is not None) - (old_error is not None)
+            daily_stats.add(self.db, (prediction.created_at, {
+                "prediction_error_sum": error_delta,
+                "prediction_error_count": count_delta,
+            }))
+            if prediction.task_category is not None:
+                prediction_accuracy.add(self.db, prediction.task_category, prediction.created_at, error_delta, count_delta)
             self.db.commit()
 
-    def get_accuracy(self, task_category: Optional[str] = None) -> float:
+    def get_accuracy(self, task_category: Optional[str] = None, days: Optional[int] = None) -> float:
         """
         Calculate prediction accuracy using MAPE.
 
+        Reads the running error totals (services/prediction_accuracy.py),
+        so the cost does not grow with the number of predictions.
+
         Args:
             task_category: Optional category filter
+            days: Optional window: only predictions made in the last `days`
+                UTC days, today included
 
         Returns:
             Accuracy as percentage (0-100)
         """
-        query = self.db.query(Prediction).filter(
-            Prediction.actual_minutes.isnot(None),
-            Prediction.actual_minutes > 0
-        )
-        if task_category:
-            query = query.filter(Prediction.task_category == task_category)
-
-        predictions = query.all()
+        since = None if days is None else datetime.utcnow() - timedelta(days=days - 1)
+        error_sum, count = prediction_accuracy.error_totals(self.db, task_category, since)
 
-        if not predictions:
+        if not count:
             return 0.0
 
         # Calculate Mean Absolute Percentage Error
-        errors = []
-        for p in predictions:
-            if p.actual_minutes and p.actual_minutes > 0:
-                error = abs(p.predicted_minutes - p.actual_minutes) / p.actual_minutes
-                errors.append(error)
-
-        if not errors:
-            return 0.0
-
-        mape = sum(errors) / len(errors)
+        mape = error_sum / count
 
         # Convert to accuracy (0-100)
         accuracy = max(0, (1 - mape) * 100)
@@ -214,26 +249,16 @@ class PredictionEngine:
         Returns:
             Dict with statistics
         """
-        sessions = self.db.query(Session).filter(
-            Session.task_name.ilike(f"%{task_category}%"),
-            Session.total_duration_ms.isnot(None),
-            Session.total_duration_ms > 0
-        ).all()
-
-        if not sessions:
-            return {"count": 0}
-
-        durations = [s.total_duration_ms / (1000 * 60) for s in sessions]
-        durations = [d for d in durations if d > 0]
-
-        if not durations:
+        summary = duration_sketch.summarize(self.db, task_category)
+        if not summary.count:
             return {"count": 0}
 
+        minutes = 1000 * 60
         return {
-            "count": len(sessions),
-            "min_minutes": round(min(durations), 1),
-            "max_minutes": round(max(durations), 1),
-            "median_minutes": round(statistics.median(durations), 1),
-            "mean_minutes": round(statistics.mean(durations), 1),
-            "std_dev": round(statistics.stdev(durations), 1) if len(durations) > 1 else 0
+            "count": summary.count,
+            "min_minutes": round(summary.min_ms() / minutes, 1),
+            "max_minutes": round(summary.max_ms() / minutes, 1),
+            "median_minutes": round(summary.median_ms() / minutes, 1),
+            "mean_minutes": round(summary.mean_ms() / minutes, 1),
+            "std_dev": round(summary.stdev_ms() / minutes, 1)
         }
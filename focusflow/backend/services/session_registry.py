@@ -0,0 +1,151 @@
+"""
+Session Registry - Process-local index of currently open work sessions.
+
+Every activity upload either extends the task's session from the last
+hour or opens a new one. Rather than querying `sessions` on each upload,
+the registry keeps the most recent session per task in memory (warmed
+from the database at startup), so merging an upload is a single UPDATE
+by primary key. Sessions that started more than an hour ago can no
+longer be extended and are evicted.
+
+Changes made inside a transaction are staged on the DB session and only
+become visible to other sessions after commit; a rollback discards them.
+Per-task asyncio locks serialize concurrent uploads for the same task so
+they cannot both open a new session.
+
+The registry assumes this process is the only writer of `sessions`
+(a single uvicorn worker), which is how FocusFlow is deployed.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session as DBSession
+
+from database import SessionLocal, Session
+
+
+@dataclass(frozen=True)
+class OpenSession:
+    """Registry snapshot of a session row."""
+    id: int
+    start_time: datetime
+    end_time: datetime
+    focus_score: Optional[float]
+    tab_switches: int
+    total_duration_ms: int
+
+
+class SessionRegistry:
+    """Most recent session per task name, kept in sync by ActivityIngestor."""
+
+    # Only sessions this recent can be extended; older ones need no tracking
+    WARM_WINDOW = timedelta(hours=1)
+
+    def __init__(self):
+        self._sessions: dict[str, OpenSession] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._lock_users: dict[str, int] = {}
+        self._warmed = False
+
+    def warm(self, db: DBSession):
+        """Load the latest recent session of every task from the database."""
+        window_start = datetime.utcnow() - self.WARM_WINDOW
+        rows = db.execute(
+            select(Session).where(Session.start_time >= window_start).order_by(Session.start_time)
+        ).scalars()
+        self._sessions = {row.task_name: _snapshot(row) for row in rows}
+        self._warmed = True
+
+    def get(self, db: DBSession, task_name: str) -> Optional[OpenSession]:
+        """Latest session for a task, including changes staged in `db`."""
+        staged = _staged(db)
+        if task_name in staged:
+            return staged[task_name]
+        if not self._warmed:
+            self.warm(db)
+        session = self._sessions.get(task_name)
+        if session is not None and session.start_time < datetime.utcnow() - self.WARM_WINDOW:
+            del self._sessions[task_name]
+            return None
+        return session
+
+    def stage(self, db: DBSession, task_name: str, session: OpenSession):
+        """Record a session write; published when `db` commits."""
+        _staged(db)[task_name] = session
+        self._evict_stale()
+
+    def _evict_stale(self):
+        """Forget sessions too old to be extended, so tasks seen once do not stay forever."""
+        window_start = datetime.utcnow() - self.WARM_WINDOW
+        stale = [name for name, session in self._sessions.items() if session.start_time < window_start]
+        for name in stale:
+            del self._sessions[name]
+
+    def lock(self, task_name: str):
+        """Hold the lock serializing session merges for one task."""
+        return self.locked([task_name])
+
+    @asynccontextmanager
+    async def locked(self, task_names: Iterable[str]):
+        """
+        Hold the locks of several tasks (acquired in sorted order).
+
+        A task's lock exists only while someone holds or waits on it, so
+        the registry does not keep one for every task name ever uploaded.
+        """
+        names = sorted(set(task_names))
+        for name in names:
+            if name not in self._locks:
+                self._locks[name] = asyncio.Lock()
+                self._lock_users[name] = 0
+            self._lock_users[name] += 1
+        held = 0
+        try:
+            for name in names:
+                await self._locks[name].acquire()
+                held += 1
+            yield
+        finally:
+            for name in reversed(names[:held]):
+                self._locks[name].release()
+            for name in names:
+                self._lock_users[name] -= 1
+                if not self._lock_users[name]:
+                    del self._locks[name], self._lock_users[name]
+
+    def _publish(self, staged: dict[str, OpenSession]):
+        self._sessions.update(staged)
+
+
+def _snapshot(row: Session) -> OpenSession:
+    return OpenSession(
+        id=row.id,
+        start_time=row.start_time,
+        end_time=row.end_time,
+        focus_score=row.focus_score,
+        tab_switches=row.tab_switches or 0,
+        total_duration_ms=row.total_duration_ms or 0,
+    )
+
+
+def _staged(db: DBSession) -> dict[str, OpenSession]:
+    return db.info.setdefault("staged_sessions", {})
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_staged_sessions(db: DBSession):
+    staged = db.info.pop("staged_sessions", None)
+    if staged:
+        session_registry._publish(staged)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_staged_sessions(db: DBSession):
+    db.info.pop("staged_sessions", None)
+
+
+session_registry = SessionRegistry()
@@ -0,0 +1,145 @@
+"""
+Write-Behind Queue - Coalesces activity uploads into batched transactions.
+
+When `ACTIVITY_WRITE_BEHIND` is enabled, POST /api/activity validates the
+upload, enqueues it here and responds immediately. A single background
+writer drains the queue and applies every upload collected during a flush
+window (activities plus their session upserts) in one SQLite transaction,
+so concurrent clients no longer serialize on the writer lock per request.
+
+The queue is bounded: when it is full, `submit` raises `asyncio.QueueFull`
+and the router answers 503 with a Retry-After hint. `stop()` drains and
+flushes everything still queued, so a graceful shutdown loses nothing.
+"""
+
+import asyncio
+import time
+from typing import Callable, Optional
+from sqlalchemy.orm import Session as DBSession
+
+from config import settings
+from database import SessionLocal, run_write_db
+from services.activity_ingestor import ActivityBatch, ActivityIngestor
+from services.session_registry import session_registry
+
+
+class ActivityWriteBehindQueue:
+    """Bounded in-process queue with a single batching writer."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], DBSession] = SessionLocal,
+        max_size: int = 1000,
+        flush_interval_ms: int = 500,
+        max_batch: int = 500
+    ):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        # Uploads taken off the queue but not yet handed to a flush
+        self._collecting: list[ActivityBatch] = []
+        self._inflight: Optional[asyncio.Future] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether uploads should be routed through the queue."""
+        return self._writer is not None and not self._writer.done()
+
+    async def start(self):
+        """Create the queue and launch the background writer."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._writer = asyncio.create_task(self._run())
+        print(f"🗃️  Activity write-behind enabled (queue={self.max_size}, flush={self.flush_interval * 1000:.0f}ms)")
+
+    async def stop(self):
+        """Stop the writer and flush everything still queued."""
+        if self._writer is None:
+            return
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+        if self._inflight is not None:
+            await self._inflight
+
+        remaining, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        for start in range(0, len(remaining), self.max_batch):
+            await self._flush_locked(remaining[start:start + self.max_batch])
+        print(f"🗃️  Activity write-behind stopped ({len(remaining)} uploads flushed on shutdown)")
+
+    def submit(self, request: ActivityBatch):
+        """
+        Enqueue a validated upload without waiting for the database.
+
+        Raises:
+            asyncio.QueueFull: If the queue is at capacity (apply backpressure)
+        """
+        self._queue.put_nowait(request)
+
+    async def _run(self):
+        """Writer loop: wait for an upload, collect the window, flush."""
+        while True:
+            self._collecting.append(await self._queue.get())
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(self._collecting) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    self._collecting.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            batch, self._collecting = self._collecting, []
+            # Shielded so that cancellation from stop() waits for this
+            # flush instead of abandoning a batch already off the queue.
+            self._inflight = asyncio.ensure_future(self._flush_locked(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    async def _flush_locked(self, batch: list[ActivityBatch]):
+        """Flush on a worker thread while holding the batch's session locks."""
+        async with session_registry.locked(request.task_name for request in batch):
+            await run_write_db(self._flush, batch)
+
+    def _flush(self, batch: list[ActivityBatch]):
+        """Apply a window of uploads in a single transaction."""
+        db = self.session_factory()
+        try:
+            ingestor = ActivityIngestor(db)
+            for request in batch:
+                ingestor.ingest(request)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Write-behind flush of {len(batch)} uploads failed ({e}); retrying individually")
+            self._flush_individually(db, batch)
+        finally:
+            db.close()
+
+    def _flush_individually(self, db: DBSession, batch: list[ActivityBatch]):
+        """Fallback so one bad upload cannot discard the rest of its window."""
+        for request in batch:
+            try:
+                ActivityIngestor(db).ingest(request)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Dropped activity upload for '{request.task_name}': {e}")
+
+
+# Process-wide queue; only started when ACTIVITY_WRITE_BEHIND is enabled
+activity_queue = ActivityWriteBehindQueue(
+    max_size=settings.activity_queue_size,
+    flush_interval_ms=settings.activity_flush_interval_ms,
+)
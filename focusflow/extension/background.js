@@ -512,10 +512,18 @@ async function sendTaskToAPI(task, focusScore, siteTimeProcessed) {
       focus_score: focusScore
     };
 
+    const body = encodeActivityColumnar(payload);
+    const headers = { 'Content-Type': ACTIVITY_COLUMNAR_TYPE };
+    let requestBody = body;
+    if (body.byteLength >= GZIP_MIN_BYTES) {
+      requestBody = await gzipBytes(body);
+      headers['Content-Encoding'] = 'gzip';
+    }
+
     const response = await fetch('http://localhost:8000/api/activity', {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify(payload)
+      headers,
+      body: requestBody
     });
 
     if (response.ok) {
@@ -528,3 +536,88 @@ async function sendTaskToAPI(task, focusScore, siteTimeProcessed) {
     console.error('Error sending task data:', error);
   }
 }
+
+// ============================================================================
+// COMPACT UPLOAD ENCODING
+// ============================================================================
+
+// Columnar binary layout understood by the backend
+// (see backend/services/activity_codec.py for the byte layout).
+// Each distinct string is sent once; activities are fixed-width columns.
+const ACTIVITY_COLUMNAR_TYPE = 'application/x-focusflow-activity';
+
+function encodeActivityColumnar(payload) {
+  const strings = [];
+  const index = new Map();
+  const intern = (value) => {
+    if (!index.has(value)) {
+      index.set(value, strings.length);
+      strings.push(value);
+    }
+    return index.get(value);
+  };
+
+  const activities = payload.activities;
+  const n = activities.length;
+  const taskIndex = intern(payload.task_name);
+  const urls = activities.map(a => intern(a.url));
+  const domains = activities.map(a => intern(a.domain));
+  const titles = activities.map(a => intern(a.title));
+
+  const encoder = new TextEncoder();
+  const encoded = strings.map(s => encoder.encode(s));
+  const stringBytes = encoded.reduce((total, bytes) => total + bytes.length, 0);
+
+  const buffer = new ArrayBuffer(24 + 4 * encoded.length + stringBytes + 32 * n);
+  const view = new DataView(buffer);
+  const bytes = new Uint8Array(buffer);
+
+  bytes.set(encoder.encode('FFA1'), 0);
+  view.setFloat32(4, payload.focus_score, true);
+  view.setUint32(8, payload.tab_switches, true);
+  view.setUint32(12, n, true);
+  view.setUint32(16, encoded.length, true);
+  view.setUint32(20, taskIndex, true);
+
+  let offset = 24;
+  for (const str of encoded) {
+    view.setUint32(offset, str.length, true);
+    offset += 4;
+  }
+  for (const str of encoded) {
+    bytes.set(str, offset);
+    offset += str.length;
+  }
+
+  const writeU32Column = (values) => {
+    for (const value of values) {
+      view.setUint32(offset, value, true);
+      offset += 4;
+    }
+  };
+  const writeI64Column = (values) => {
+    for (const value of values) {
+      view.setBigInt64(offset, BigInt(Math.round(value)), true);
+      offset += 8;
+    }
+  };
+
+  writeU32Column(urls);
+  writeU32Column(domains);
+  writeU32Column(titles);
+  writeU32Column(activities.map(a => Math.round(a.duration_ms)));
+  writeI64Column(activities.map(a => a.start_time));
+  writeI64Column(activities.map(a => a.end_time));
+
+  return buffer;
+}
+
+// Uploads smaller than this are sent uncompressed (gzip framing alone is ~20 bytes)
+const GZIP_MIN_BYTES = 1024;
+
+// Gzip a request body with the browser's built-in CompressionStream;
+// the backend decompresses any body sent with Content-Encoding: gzip.
+async function gzipBytes(bytes) {
+  const stream = new Blob([bytes]).stream().pipeThrough(new CompressionStream('gzip'));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}
@@ -24,7 +24,7 @@ export interface ActivityRequest {
 }
 
 export interface ActivityResponse {
-  status: "logged";
+  status: "logged" | "queued";
   count: number;
 }
 